@@ -5,12 +5,9 @@ Created on Sat Mar  5 10:46:28 2022
 
 @author: travis
 """
-import os
-
 import dash
 
 from dash import dcc, html
-from flask_caching import Cache
 
 from drip.app.pages.main.view import LAYOUT
 from drip.app.layouts.navbar import NAVBAR
@@ -22,17 +19,6 @@ app = dash.Dash(
     serve_locally=True
 )
 server = app.server
-cache = Cache(
-    config={
-        "CACHE_TYPE": "filesystem",
-        "CACHE_DIR": os.path.join(
-                          os.path.dirname(__file__),
-                          "data/cache1",
-                      ),
-        "CACHE_THRESHOLD": 10
-    }
-)
-cache.init_app(server)
 
 app.layout = html.Div([
     NAVBAR,
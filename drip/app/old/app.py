@@ -161,7 +161,7 @@ default_1 = "spei6"
 default_2 = "pdsi"
 default_date = "1980 - {}".format(max_year)
 default_basemap = "dark"
-default_location = '["all", "y", "x", "Contiguous United States", 0]'
+default_location = '["all", "all", "Contiguous United States", 0]'
 default_years = [1980, max_year]
 default_extent = {"mapbox.center": {"lon": -92, "lat": 40},
                   "mapbox.zoom": 2.2, "mapbox.bearing": 0, "mapbox.pitch": 0}
@@ -417,7 +417,7 @@ RdWhBu = [[0.00, "rgb(115,0,0)"], [0.10, "rgb(230,0,0)"],
 # Get spatial dimensions from the sample data set above
 admin = Admin_Elements(resolution)
 [state_array, county_array, grid, mask,
- source, albers_source, crdict, admin_df] = admin.getElements()  # <----------- remove albers source here (carefully)
+ source, crdict, admin_df] = admin.getElements()
 
 # Date options
 years = [int(y) for y in range(min_year, max_year + 1)]
@@ -1317,7 +1317,7 @@ def retrieveData(signal, function, choice, location):
         signal = [[[2000, 2017], [1, 12], [ 4, 5, 6, 7]], 'Viridis', 'no']
         choice = 'pdsi'
         function = 'omean'
-        location = ["all", "y", "x", "Contiguous United States", 0]
+        location = ["all", "all", "Contiguous United States", 0]
     '''
 
     # Retrieve signal elements
@@ -1655,8 +1655,8 @@ for i in range(1, 3):
                 location = selector.chooseRecent()
 
                 # What is this about?
-                if 'shape' in location[0] and location[3] is None:
-                    location =  ['all', 'y', 'x', 'Contiguous United States']
+                if 'shape' in location[0] and location[2] is None:
+                    location =  ['all', 'all', 'Contiguous United States']
                 try:
                     location.append(triggering_element)
                 except:
@@ -1693,8 +1693,8 @@ for i in range(1, 3):
                 location = selector.chooseRecent()
 
                 # What is this about?
-                if 'shape' in location[0] and location[3] is None:
-                    location =  ['all', 'y', 'x', 'Contiguous United States']
+                if 'shape' in location[0] and location[2] is None:
+                    location =  ['all', 'all', 'Contiguous United States']
 
                 # Add the triggering element key to prevent updates later
                 try:
@@ -2152,20 +2152,16 @@ for i in range(1, 3):
             amin = limit * -1
 
         # Filter for state filters
-        flag, y, x, label, idx = location
-        if flag == 'state' or flag == 'county':
+        flag, mask_id, label, idx = location
+        y, x = crdict.masks.indices(mask_id)
+        if flag == 'state' or flag == 'county' or flag == 'shape':
             array = array * data.mask
-        elif flag == 'shape':
-            y = np.array(json.loads(y))
-            x = np.array(json.loads(x))
-            gridids = grid[y, x]
-            array[~np.isin(grid, gridids)] = np.nan
 
         # If it is a correlation recreate the map array
         if 'corr' in function and flag != 'all':
-            y = np.array(json.loads(y))
-            x = np.array(json.loads(x))
             gridid = grid[y, x]
+            if len(gridid) == 1:
+                gridid = gridid[0]
             amin = -1
             amax = 1
             if type(gridid) is np.ndarray:
@@ -2198,13 +2194,14 @@ for i in range(1, 3):
         to_bin = lambda x: np.floor(x / step) * step
         pdf["latbin"] = pdf.index.get_level_values('y').map(to_bin)
         pdf["lonbin"] = pdf.index.get_level_values('x').map(to_bin)
-        pdf['gridx'] = pdf['lonbin'].map(crdict.londict)
-        pdf['gridy'] = pdf['latbin'].map(crdict.latdict)
+        pdf['gridx'] = crdict.lonToCol(pdf['lonbin'].values, strict=False)
+        pdf['gridy'] = crdict.latToRow(pdf['latbin'].values, strict=False)
+        pdf = pdf.dropna(subset=['gridx', 'gridy'])
 
         # For hover information
         grid2 = np.copy(grid)
         grid2[np.isnan(grid2)] = 0
-        pdf['grid'] = grid2[pdf['gridy'], pdf['gridx']]
+        pdf['grid'] = grid2[pdf['gridy'].astype(int), pdf['gridx'].astype(int)]
         pdf = pd.merge(pdf, admin_df, how='inner')
         pdf['data'] = pdf['data'].astype(float)
         pdf['printdata'] = (pdf['place'] + "<br>  lat/lon: "
@@ -2297,7 +2294,7 @@ for i in range(1, 3):
             signal = [[[2000, 2017], [1, 12], [5, 6, 7, 8]], 'Viridis', 'no']
             choice = 'pdsi'
             function = 'oarea'
-            location =  ['all', 'y', 'x', 'Contiguous United States', 0]
+            location =  ['all', 'all', 'Contiguous United States', 0]
         '''
         # Temporary, split location up
         location = json.loads(location)
@@ -2350,7 +2347,7 @@ for i in range(1, 3):
         area_store = json.loads(area_store)
 
         # If the function is oarea, we plot five overlapping timeseries
-        label = location[3]
+        label = location[2]
         nonindices = ['tdmean', 'tmean', 'tmin', 'tmax', 'ppt',  'vpdmax',
                       'vpdmin', 'vpdmean']
         if function != 'oarea' or choice in nonindices:
@@ -2374,7 +2371,7 @@ for i in range(1, 3):
 
         else:
             bar_type = 'overlay'
-            label = location[3]
+            label = location[2]
 
             # I cannot get this thing to cache! We are storing it in a Div
             if area_store_key == area_store[0]:
@@ -2569,7 +2566,7 @@ def make_csv(arg):
     dates = [pd.to_datetime(str(d)).strftime('%Y-%m') for d in dates]
 
     # If the function is oarea, we plot five overlapping timeseries
-    label = location[3]
+    label = location[2]
     nonindices = ['tdmean', 'tmean', 'tmin', 'tmax', 'ppt',  'vpdmax',
                   'vpdmin', 'vpdmean']
 
@@ -2590,7 +2587,7 @@ def make_csv(arg):
         df = pd.DataFrame(columns)
 
     else:
-        label = location[3]
+        label = location[2]
         ts_series, ts_series_ninc, dsci = data.getArea(crdict)
 
         # Save to file for download option
@@ -1,32 +1,41 @@
 # -*- coding: utf-8 -*-
 """Old functions from the first DrIP."""
 import datetime as dt
+import functools
 import gc
+import hashlib
+import io
 import json
 import os
 import sys
+import threading
 import warnings
 
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dateutil.relativedelta import relativedelta
 from glob import glob
 
-import dask.array as da
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import rasterio as rio
 import xarray as xr
 
 from dash.exceptions import PreventUpdate
-from osgeo import gdal, ogr, osr
-from matplotlib.animation import FuncAnimation
 from netCDF4 import Dataset
-from numba import jit
-from scipy.stats import rankdata
-from tqdm import tqdm
 
 from drip import Paths
+from drip.downloaders.benchmarks import chunk_layout
+from drip.downloaders.bundle import read_bundle, write_bundle
+from drip.downloaders.area import (
+    AREA_CHUNK,
+    category_areas,
+    category_counts,
+    category_edges,
+    coverage
+)
+from drip.downloaders.catalog import catalog_entry
+from drip.downloaders.land import Land_Pixels, cell_areas
 
 warnings.filterwarnings("ignore")
 
@@ -102,8 +111,16 @@ TYPE_PATHS = {
     "correlation_o": "",
     "correlation_p": "_percentile",
     "percentile": "_percentile",
-    "projected": "_projected"
 }
+SERIES_PIXEL_LIMIT = 2000  # Largest selection read from the pixel-major file
+SERIES_CHUNK = 120  # Time steps per block when gathering regional series
+POOL_SIZE = 16  # Most data sets kept open by each worker
+RESULT_BUDGET = 256 * 1024 ** 2  # Bytes of computed results kept per worker
+CORR_CHUNK = 120  # Time steps per block when correlating
+CORR_WORKERS = min(8, os.cpu_count() or 1)  # Threads per correlation field
+MASK_SIZE = 64  # Most resolved location masks kept by each worker
+COORD_TOLERANCE = 0.01  # Fraction of a cell a coordinate may be off the grid
+BUNDLE_VERSION = 2  # Administrative bundles of another version are rebuilt
 FUNCTION_TYPES = {
     "omean": "original",
     "omin": "original",
@@ -113,7 +130,9 @@ FUNCTION_TYPES = {
     "pmax": "percentile",
     "oarea": "area",
     "ocorr": "correlation_o",
-    "pcorr": "correlation_p"
+    "oxcorr": "correlation_o",
+    "pcorr": "correlation_p",
+    "pxcorr": "correlation_p"
 }
 UNIT_MAP = {
     "noaa": "%",
@@ -170,20 +189,83 @@ UNIT_MAP = {
 }
 
 
-@jit(nopython=True)
-def correlationField(ts, arrays):
+def colorScale(choice_type, color_class="Default"):
     """
-    Create a 2d array of pearson correlation coefficient between the time
-    series at the location of the grid id and every other grid in a 3d array
+    Return the plotly color scale for a color class name. The color can be a
+    string pointing to a predefined scale, or "Default" for the scale of the
+    choice type.
     """
-    # Apply that to each cell
-    one_field = np.zeros((arrays.shape[1], arrays.shape[2]))
-    for i in range(arrays.shape[1]):
-        for j in range(arrays.shape[2]):
-            lst = arrays[:, i, j]
-            cor = np.corrcoef(ts, lst)[0, 1]
-            one_field[i, j] = cor
-    return one_field
+    from drip.app.options.colors import COLORS
+
+    # Default color schemes
+    defaults = {
+        "percentile": COLORS["RdWhBu"],
+        "original":  COLORS["BrGn (cb)"],
+        "area": COLORS["RdWhBu"],
+        "correlation_o": COLORS["Viridis"],
+        "correlation_p": COLORS["Viridis"]
+    }
+
+    if color_class == "Default":
+        scale = defaults[choice_type]
+    else:
+        scale = COLORS[color_class]
+
+    return scale
+
+
+def correlationField(ts, read, ntime, workers=CORR_WORKERS):
+    """
+    Create a vector of pearson correlation coefficients between a reference
+    time series and every pixel of a (time, pixel) data set. The data set is
+    streamed in blocks of CORR_CHUNK time steps, read with read(start, stop),
+    and the blocks are reduced in parallel threads to the sums each
+    coefficient needs. Each pixel uses the time steps where both it and the
+    reference have values.
+
+    ts = reference time series with ntime values
+    read = function returning the (time, pixel) block for start:stop
+    ntime = number of time steps to read
+    workers = number of threads
+    """
+    # Standardize the reference once, this does not change the coefficients
+    ts = np.asarray(ts, dtype="f8")
+    ts = (ts - np.nanmean(ts)) / (np.nanstd(ts) or 1)
+
+    def sums(start):
+        stop = min(start + CORR_CHUNK, ntime)
+        x = ts[start:stop]
+        y = np.asarray(read(start, stop), dtype="f8")
+        valid = np.isfinite(y) & np.isfinite(x)[:, np.newaxis]
+        x = np.where(np.isfinite(x), x, 0)
+        y = np.where(valid, y, 0)
+        valid = valid.astype("f8")
+        return np.stack([
+            valid.sum(axis=0),
+            x @ valid,
+            (x ** 2) @ valid,
+            y.sum(axis=0),
+            (y ** 2).sum(axis=0),
+            x @ y
+        ])
+
+    starts = range(0, max(ntime, 1), CORR_CHUNK)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        n, sx, sxx, sy, syy, sxy = sum(pool.map(sums, starts))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        field = cov / np.sqrt(var)
+    field[(n < 2) | ~(var > 0)] = np.nan
+
+    return field
+
+
+@functools.lru_cache()
+def indexRanges():
+    """Return the table of value ranges of each index."""
+    return pd.read_csv(Paths.paths["tables"].joinpath("index_ranges.csv"))
 
 
 def datePrint(y1, y2, m1, m2, month_filter, monthmarks):
@@ -214,6 +296,7 @@ def im(array):
     """
     This just plots an array as an image
     """
+    import matplotlib.pyplot as plt
     fig = plt.imshow(array)
     fig.figure.canvas.raise_()
 
@@ -240,6 +323,8 @@ def movie(array, titles=None, axis=0, na=-9999):
     axis is not 0, specify which it is. Just a heads up, some functions
     organize along different axes; consider np.dstack vs np.array.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
     if "netCDF" in str(type(array)):
         if titles is None:
             titles = array.variables["time"]
@@ -305,6 +390,25 @@ def meanNC(minsrc="data/indices/vpdmin.nc",
 
 
 # For making outlines...move to css, maybe
+def nanMean(values, weights=None):
+    """
+    Return the mean of each row of a (time, cell) array, skipping missing
+    values and weighting each cell by weights if given.
+
+    values = 2D array of (time, cell) values
+    weights = 1D array of cell weights (e.g. areas)
+    """
+    values = np.asarray(values, dtype="f8")
+    if weights is None:
+        return np.nanmean(values, axis=1)
+    valid = np.isfinite(values)
+    weights = np.broadcast_to(np.asarray(weights, dtype="f8"), values.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.where(valid, values * weights, 0).sum(axis=1)
+        mean = total / np.where(valid, weights, 0).sum(axis=1)
+    return mean
+
+
 def outLine(color, width):
     string = ("-{1}px -{1}px 0 {0}, {1}px -{1}px 0 {0}, " +
               "-{1}px {1}px 0 {0}, {1}px {1}px 0 {0}").format(color, width)
@@ -315,6 +419,7 @@ def percentileArrays(arrays):
     """
     arrays = a list of 2d numpy arrays or one 3d numpy array
     """
+    from scipy.stats import rankdata
     def percentiles(lst):
         """
         lst = single time series of numbers as a list
@@ -342,6 +447,7 @@ def readRaster(rasterpath, band, navalue=-9999):
       array (numpy), spatial geometry (gdal object),
                                       coordinate reference system (gdal object)
     """
+    from osgeo import gdal
     raster = gdal.Open(str(rasterpath))
     geometry = raster.GetGeoTransform()
     arrayref = raster.GetProjection()
@@ -369,6 +475,8 @@ def readRasters(files, navalue=-9999):
 
     The file naming convention required is: "INDEXNAME_YYYYMM.tif"
     """
+    from osgeo import gdal
+    from tqdm import tqdm
     print("Converting raster to numpy array...")
     files = [f for f in files if os.path.isfile(f)]
     names = [os.path.basename(files[i]) for i in range(len(files))]
@@ -402,6 +510,7 @@ def shapeReproject(src, dst, src_epsg, dst_epsg):
     dst_epsg = 4326
 
     """
+    from osgeo import ogr, osr
     # Get the shapefile driver
     driver = ogr.GetDriverByName("ESRI Shapefile")
 
@@ -503,6 +612,7 @@ def toNetCDFSingle(file, ncfile, savepath, index, epsg=4326, wmode="w"):
     """
     Take an individual tif and either write or append to netcdf.
     """
+    from osgeo import gdal, osr
     # For attributes
     todays_date = dt.datetime.today()
     today = np.datetime64(todays_date)
@@ -615,6 +725,7 @@ def toNetCDF(tfiles, ncfiles, savepath, index, year1, month1, year2, month2,
         percentiles=False
         wmode="w"
     """
+    from osgeo import gdal, osr
     # For attributes
     todays_date = dt.datetime.today()
     today = np.datetime64(todays_date)
@@ -782,6 +893,7 @@ def toNetCDFAlbers(tfiles, ncfiles, savepath, index, year1, month1,
         percentiles=False
         wmode="w"
     """
+    from osgeo import gdal, osr
     # For attributes
     todays_date = dt.datetime.today()
     today = np.datetime64(todays_date)
@@ -935,6 +1047,7 @@ def toNetCDF3(tfile, ncfile, savepath, index, epsg=102008, percentiles=False,
 
     Still need to parameterize grid mapping and coordinate names.
     """
+    from osgeo import gdal, osr
     # For attributes
     todays_date = dt.datetime.today()
     today = np.datetime64(todays_date)
@@ -1105,6 +1218,7 @@ def toRaster(array, path, geometry, srs, navalue=-9999):
     path = target path
     srs = spatial reference system
     """
+    from osgeo import gdal
     xpixels = array.shape[1]
     ypixels = array.shape[0]
     path = path.encode("utf-8")
@@ -1125,6 +1239,8 @@ def toRasters(arraylist, path, geometry, srs):
     geometry = gdal geometry object
     srs = spatial reference system object
     """
+    from osgeo import gdal
+    from tqdm import tqdm
     if path[-2:] == "\\":
         path = path
     else:
@@ -1141,42 +1257,6 @@ def toRasters(arraylist, path, geometry, srs):
         image.GetRasterBand(1).WriteArray(ray[1])
 
 
-def wgsToAlbers(proj_data, masked_arrays, crdict):
-    """
-    Takes an xarray dataset in WGS 84 (epsg: 4326) with a specified mask and
-    returns that mask projected to Alber's North American Equal Area Conic
-    (epsg: 102008).
-    """
-    from rasterio.enums import Resampling
-
-    # Get single dataset from masked arrays
-    wgs = masked_arrays.isel(time=0)
-    wgs = wgs.rio.write_crs("epsg:4326")
-    wgs.value.data[np.isnan(wgs.value.data)] = -9999
-
-    # Get the shape of the projected data
-    albers_shape = proj_data.dataset.value[0].shape
-    albers_proj = (
-        "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 "
-        "+ellps=GRS80 +datum=NAD83 +units=m +no_defs"
-    )
-
-    # Reproject wgs array with rio xarray to build projected mask
-    mask = wgs.rio.reproject(
-        albers_proj,
-        shape=albers_shape,
-        resampling=Resampling.bilinear,
-        nodata=-9999
-    )
-    mask.value.data[mask.value.data > -9999] = 1
-    mask.value.data[mask.value.data == -9999] = np.nan
-
-    # Mask projected data with projected mask
-    proj_data.dataset_interval.value.data *= mask.value.data
-
-    return proj_data
-
-
 class Admin_Elements(Paths):
     def __init__(self, resolution):
         self.resolution = resolution
@@ -1198,6 +1278,7 @@ class Admin_Elements(Paths):
                        extent=[-130, 50, -55, 20])
 
     def buildAdminDF(self):
+        from osgeo import gdal
         resolution = self.resolution
         res_str = str(round(resolution, 3))
         res_ext = "_" + res_str.replace(".", "_")
@@ -1255,10 +1336,76 @@ class Admin_Elements(Paths):
 
         df.to_csv(admin_path, index=False)
 
+    def buildBundle(self):
+        """
+        Compile every resolution dependent administrative element (state,
+        county, and grid id arrays, the source array and its coordinates, and
+        the administrative table) into one memory-mappable file, so workers
+        do not read rasters or format FIPS codes when they start.
+        """
+        paths = self.pathRequest()
+        [grid_path, gradient_path, county_path, state_path,
+         source_path, admin_path] = paths
+
+        # Read the rasters
+        def readArray(path):
+            with rio.open(path) as src:
+                array = src.read(1).astype("f8")
+            array[array == -9999] = np.nan
+            return array
+
+        states = readArray(state_path)
+        cnty = readArray(county_path)
+        grid = readArray(grid_path)
+
+        # Full state-county fips (e.g. 006 + 037 -> 6037) to use as ids
+        cnty = np.where(np.isfinite(states) & np.isfinite(cnty),
+                        np.floor(states) * 1000 + np.floor(cnty), np.nan)
+
+        # The source array and its geometry
+        with xr.open_dataarray(source_path) as data:
+            source = data.load()
+
+        arrays = {
+            "states": states,
+            "counties": cnty,
+            "grid": grid,
+            "source": source.values,
+            "source_band": source.coords["band"].values,
+            "source_y": source.coords["y"].values,
+            "source_x": source.coords["x"].values
+        }
+
+        # Store each administrative table column
+        admin_df = pd.read_csv(admin_path)
+        for column in admin_df.columns:
+            arrays[f"admin_{column}"] = admin_df[column].values
+
+        attrs = {
+            "resolution": self.resolution,
+            "source_name": source.name,
+            "source_attrs": {
+                key: np.asarray(value).tolist()
+                for key, value in source.attrs.items()
+            },
+            "admin_columns": list(admin_df.columns),
+            "inputs": {path: os.path.getmtime(path) for path in paths},
+            "version": BUNDLE_VERSION
+        }
+
+        write_bundle(self.bundle_path, arrays, attrs)
+
+    @property
+    def bundle_path(self):
+        """Return the path to the administrative element bundle."""
+        res_str = str(round(self.resolution, 3)).replace(".", "_")
+        return self.paths["rasters"].joinpath(f"admin_bundle_{res_str}.bin")
+
     def buildGrid(self):
         """
         Use the county raster to build this.
         """
+        from osgeo import gdal
         resolution = self.resolution
         res_str = str(round(resolution, 3))
         res_ext = "_" + res_str.replace(".", "_")
@@ -1298,6 +1445,7 @@ class Admin_Elements(Paths):
         all this will do is reproject an existing "NA" raster to the specified
         resolution.
         """
+        from osgeo import gdal
         res = self.resolution
         res_print = str(res).replace(".", "_")
         src_path = "data/rasters/na_banner.tif"
@@ -1311,6 +1459,7 @@ class Admin_Elements(Paths):
         take a single band raster and convert it to a data array for use as a
         source. Make one of these for each resolution you might need.
         """
+        from osgeo import gdal
         resolution = self.resolution
         res_str = str(round(resolution, 3))
         res_ext = "_" + res_str.replace(".", "_")
@@ -1342,52 +1491,102 @@ class Admin_Elements(Paths):
         wgs_path = "data/rasters/source_array" + res_ext + ".nc"
         data.to_netcdf(wgs_path)
 
-        # We also need a source data set for Alber"s projection geometry
-        grid_path = "data/rasters/grid" + res_ext + ".tif"
-        albers_path = "data/rasters/source_albers" + res_ext + ".tif"
-        ds = gdal.Warp(albers_path, grid_path, dstSRS="EPSG:102008")
-        del ds
-
     def getElements(self):
         """
-        I want to turn this into a class that handles all resolution dependent
-        objects, but for now I"m just tossing this together for a meeting.
+        Return the resolution dependent administrative elements: the state
+        fips, full county fips, and grid id arrays, a mask of the grid, the
+        source array, the coordinate dictionary, and the administrative
+        table. These are memory-mapped from the bundle file, which is
+        compiled the first time, whenever one of its inputs changes, and
+        when it was written by another BUNDLE_VERSION.
         """
-        # Get paths
-        [grid_path, gradient_path, county_path, state_path,
-         source_path, albers_path, admin_path] = self.pathRequest()
-
-        # Read in/create objects
-        states = gdal.Open(state_path).ReadAsArray()
-        states[states==-9999] = np.nan
-        cnty = gdal.Open(county_path).ReadAsArray()
-        cnty[cnty==-9999] = np.nan
-        grid = gdal.Open(grid_path).ReadAsArray()
-        grid[grid == -9999] = np.nan
+        # Compile the bundle if needed
+        path = self.bundle_path
+        arrays = None
+        if path.exists():
+            arrays, attrs = read_bundle(path)
+            if attrs.get("version") != BUNDLE_VERSION:
+                arrays = None
+            for input_path, mtime in attrs["inputs"].items():
+                if (not os.path.exists(input_path)
+                        or os.path.getmtime(input_path) != mtime):
+                    arrays = None
+                    break
+        if arrays is None:
+            self.buildBundle()
+            arrays, attrs = read_bundle(path)
+
+        # Read in objects
+        states = arrays["states"]
+        cnty = arrays["counties"]
+        grid = arrays["grid"]
         mask = grid * 0 + 1
-        cd = Coordinate_Dictionaries(source_path, grid)
-        admin_df = pd.read_csv(admin_path)
-        albers_source = gdal.Open(albers_path)
-        with xr.open_dataarray(source_path) as data:
-            source = data.load()
+        source = xr.DataArray(
+            data=arrays["source"],
+            name=attrs["source_name"],
+            coords=(("band", arrays["source_band"]),
+                    ("y", arrays["source_y"]),
+                    ("x", arrays["source_x"])),
+            attrs=attrs["source_attrs"]
+        )
+        cd = Coordinate_Dictionaries(source, grid)
+        admin_df = pd.DataFrame(OrderedDict(
+            (column, arrays[f"admin_{column}"])
+            for column in attrs["admin_columns"]
+        ))
 
-        # We actually want full state-county fips for counties
-        state_counties = np.stack([states, cnty])
+        # Missing text was stored as empty strings, restore it as NaN
+        for column in attrs["admin_columns"]:
+            if arrays[f"admin_{column}"].dtype.kind == "U":
+                admin_df[column] = admin_df[column].replace("", np.nan)
 
-        # Format fips as 3-digit strings with leading zeros
-        def formatFIPS(lst):
-            try:
-                fips1 = "{:03d}".format(int(lst[0]))
-                fips2 = "{:03d}".format(int(lst[1]))
-                fips = float(fips1 + fips2)
-            except:
-                fips = np.nan
-            return fips
+        # Locations are resolved to cells through the coordinate dictionary
+        cd.masks = Mask_Registry(cd, states, cnty)
 
-        # Get a field of full fips to use as location ids
-        cnty = np.apply_along_axis(formatFIPS, 0, state_counties)
+        return states, cnty, grid, mask, source, cd, admin_df
 
-        return states, cnty, grid, mask, source, albers_source, cd, admin_df
+    def getPixelTable(self, lats, lons, grid, crdict, admin_df):
+        """
+        Build a table of every mappable cell for a grid of index values. Each
+        row holds the cell's row and column in the index grid, its binned
+        coordinates, grid id, place name and the start of its hover label,
+        so a map only needs to gather values by row and column.
+
+        lats = latitude coordinates of the index grid
+        lons = longitude coordinates of the index grid
+        grid = grid id array
+        crdict = coordinate dictionary
+        admin_df = administrative data frame from getElements
+        """
+        # Bin coordinates to the grid resolution
+        step = crdict.res
+        rows, cols = np.meshgrid(np.arange(len(lats)), np.arange(len(lons)),
+                                 indexing="ij")
+        df = pd.DataFrame({"row": rows.ravel(), "col": cols.ravel()})
+        df["latbin"] = np.floor(np.asarray(lats) / step)[df["row"]] * step
+        df["lonbin"] = np.floor(np.asarray(lons) / step)[df["col"]] * step
+        df["gridx"] = crdict.lonToCol(df["lonbin"].values, strict=False)
+        df["gridy"] = crdict.latToRow(df["latbin"].values, strict=False)
+        df = df.dropna(subset=["gridx", "gridy"])
+
+        # Attach grid ids and place names
+        grid2 = np.copy(grid)
+        grid2[np.isnan(grid2)] = 0
+        df["grid"] = grid2[df["gridy"].astype(int), df["gridx"].astype(int)]
+        df = pd.merge(df, admin_df[["grid", "place"]], how="inner")
+        df = df.drop_duplicates(subset=["latbin", "lonbin"])
+
+        # Everything in the hover label but the value
+        df["hover"] = (
+            df["place"] + "<br>  lat/lon: "
+            + df["latbin"].apply(str) + ", "
+            + df["lonbin"].astype(str) + "<br>     <b>"
+        )
+
+        columns = ["row", "col", "lonbin", "latbin", "grid", "place", "hover"]
+        df = df[columns].reset_index(drop=True)
+
+        return df
 
     def pathRequest(self):
         # Set paths to each element then make sure they exist
@@ -1399,7 +1598,6 @@ class Admin_Elements(Paths):
         county_path = self.paths["rasters"].joinpath(f"us_counties{res_ext}.tif")
         state_path = self.paths["rasters"].joinpath(f"us_states{res_ext}.tif")
         source_path = self.paths["rasters"].joinpath(f"source_array{res_ext}.nc")
-        albers_path = self.paths["rasters"].joinpath(f"source_albers{res_ext}.tif")
         admin_path = self.paths["tables"].joinpath(f"admin_df{res_ext}.csv")
         na_path = self.paths["rasters"].joinpath(f"na_banner{res_ext}.tif")
 
@@ -1407,7 +1605,7 @@ class Admin_Elements(Paths):
             self.buildAdmin()
         if not grid_path.exists() or not gradient_path.exists():
             self.buildGrid()
-        if not source_path.exists() or not albers_path.exists():
+        if not source_path.exists():
             self.buildSource()
         if not admin_path.exists():
             self.buildAdminDF()
@@ -1416,7 +1614,7 @@ class Admin_Elements(Paths):
 
         # Return everything at once
         posix_package = [grid_path, gradient_path, county_path, state_path,
-                         source_path, albers_path, admin_path]
+                         source_path, admin_path]
         path_package = [str(posix) for posix in posix_package]
 
         return path_package
@@ -1427,6 +1625,7 @@ class Admin_Elements(Paths):
         It seems to be unreasonably involved to do this in Python compared to
         the command line.
         """
+        from osgeo import gdal, ogr, osr
         resolution = self.resolution
 
         # Open shapefile, retrieve the layer
@@ -1489,16 +1688,352 @@ class Cacher:
         return cacher
 
 
+class Dataset_Pool:
+    """
+    A process-wide pool of open xarray data sets. Opening an index file
+    means an HDF5 open and a metadata parse, so each worker keeps up to
+    `maxsize` data sets open and closes the least recently used one when a
+    new one is needed. A data set is reopened if its file has changed on
+    disk since it was opened. Keys are usually (index, choice_type), with a
+    third item for companion files.
+    """
+    def __init__(self, maxsize=POOL_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (f"<Dataset_Pool size={len(self._datasets)}/{self.maxsize} "
+                f"hits={self.hits} misses={self.misses}>")
+
+    def get(self, key, path, chunks=None):
+        """
+        Return the open data set for a key, opening path if needed.
+
+        key = hashable key, e.g. ("pdsi", "percentile")
+        path = path to the NetCDF file
+        chunks = dask chunks to open the file with, None to not use dask
+        """
+        key = (*key, json.dumps(chunks))
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            if key in self._datasets:
+                dataset, opened = self._datasets[key]
+                if opened == mtime:
+                    self._datasets.move_to_end(key)
+                    self.hits += 1
+                    return dataset
+                del self._datasets[key]
+                dataset.close()
+
+            self.misses += 1
+            if chunks is None:
+                dataset = xr.open_dataset(path)
+            else:
+                dataset = xr.open_dataset(path, chunks=chunks)
+            self._datasets[key] = (dataset, mtime)
+
+            while len(self._datasets) > self.maxsize:
+                _, (oldest, _) = self._datasets.popitem(last=False)
+                oldest.close()
+
+        return dataset
+
+    def info(self):
+        """Return hit and miss counts and the number of open data sets."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._datasets), "maxsize": self.maxsize}
+
+    def clear(self):
+        """Close every open data set."""
+        with self._lock:
+            for dataset, _ in self._datasets.values():
+                dataset.close()
+            self._datasets.clear()
+
+
+DATASET_POOL = Dataset_Pool()
+
+
+class Result_Cache:
+    """
+    A process-wide cache of computed arrays (map fields, time series, and
+    drought area series). Arrays are kept as raw .npy bytes rather than
+    pickled objects, and the least recently used entries are dropped once
+    the total size passes `budget` bytes. Each worker keeps its own cache.
+    """
+    def __init__(self, budget=RESULT_BUDGET):
+        self.budget = budget
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (f"<Result_Cache entries={len(self._results)} "
+                f"nbytes={self.nbytes}/{self.budget} hits={self.hits} "
+                f"misses={self.misses}>")
+
+    def get(self, key):
+        """Return the cached array for a key, or None."""
+        with self._lock:
+            blob = self._results.get(key)
+            if blob is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+        return np.load(io.BytesIO(blob), allow_pickle=False)
+
+    def set(self, key, array):
+        """Store an array under a key, evicting old entries if needed."""
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(array), allow_pickle=False)
+        blob = buffer.getvalue()
+        if len(blob) > self.budget:
+            return
+        with self._lock:
+            if key in self._results:
+                self.nbytes -= len(self._results.pop(key))
+            self._results[key] = blob
+            self.nbytes += len(blob)
+            while self.nbytes > self.budget:
+                _, oldest = self._results.popitem(last=False)
+                self.nbytes -= len(oldest)
+
+    def fetch(self, key, function):
+        """
+        Return the cached array for a key, or compute it with function,
+        store, and return it.
+        """
+        array = self.get(key)
+        if array is None:
+            array = np.asarray(function())
+            self.set(key, array)
+        return array
+
+    def info(self):
+        """Return hit and miss counts and the size of the cache."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._results), "nbytes": self.nbytes,
+                    "budget": self.budget}
+
+    def clear(self):
+        """Drop every cached array."""
+        with self._lock:
+            self._results.clear()
+            self.nbytes = 0
+
+
+RESULT_CACHE = Result_Cache()
+
+
+@functools.lru_cache(maxsize=POOL_SIZE)
+def landPixels(path, mtime):
+    """
+    Return the land pixel positions of a land-pixel file. The modification
+    time is only part of the cache key, so rebuilt files are read again.
+    """
+    with xr.open_dataset(path) as store:
+        pixels = Land_Pixels(store["row"].values, store["col"].values,
+                             store["latitude"].values,
+                             store["longitude"].values)
+    return pixels
+
+
+class Mask_Registry:
+    """
+    Resolve compact location mask ids to cell indices on the server, so that
+    locations never carry lists of array indices through the browser.
+
+    Mask ids are the location flag and a description of the cells:
+        "all"                       every cell in the grid
+        "state:6,41"                sorted state FIPS codes
+        "county:6037"               full county FIPS code
+        "grid:10,243"               row and column of one cell
+        "bbox:10,12,241,244"        first and last row and column
+        "grids:10.243-243,11.242-244"   runs of columns in each row
+        "shape:<sha1>"              hash of an uploaded shape's mask
+
+    All but shape masks are derived from the id itself. Shape masks are
+    registered with their contents and saved to disk so that every worker
+    can find them. Every mask only holds cells of the grid, the same cells
+    as the data set's Land_Pixels, so a location selects the same cells
+    whether its series is read from the pixel-major or land-pixel file.
+    """
+    def __init__(self, crdict, state_array, county_array, size=MASK_SIZE):
+        self.crdict = crdict
+        self.shape = crdict.grid.shape
+        self.size = size
+        self.land = np.isfinite(crdict.grid).ravel()
+        self._indices = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Group the cells of each state and county once
+        self.regions = {
+            "state": self._groupCells(state_array),
+            "county": self._groupCells(county_array)
+        }
+
+    def __repr__(self):
+        return (f"<Mask_Registry shape={self.shape} "
+                f"entries={len(self._indices)}>")
+
+    def _groupCells(self, array):
+        """Return a dictionary of the flat cell indices of each code."""
+        array = np.asarray(array, dtype="f8").ravel()
+        array = np.where(np.isfinite(self.crdict.grid.ravel()), array, np.nan)
+        cells = np.where(np.isfinite(array))[0]
+        codes = array[cells].astype("int64")
+        order = np.argsort(codes, kind="stable")
+        codes, starts = np.unique(codes[order], return_index=True)
+        groups = np.split(cells[order], starts[1:])
+        return dict(zip(codes.tolist(), groups))
+
+    @property
+    def directory(self):
+        """Return the directory of saved shape masks."""
+        path = Paths.paths["shapefiles"].joinpath("masks")
+        path.mkdir(exist_ok=True)
+        return path
+
+    def stateId(self, fips):
+        """Return the mask id of a set of state FIPS codes."""
+        codes = sorted({int(code) for code in fips})
+        return "state:" + ",".join(str(code) for code in codes)
+
+    def countyId(self, fips):
+        """Return the mask id of a full county FIPS code."""
+        return f"county:{int(fips)}"
+
+    def gridId(self, y, x):
+        """Return the mask id of a single cell."""
+        return f"grid:{int(y)},{int(x)}"
+
+    def bboxId(self, y1, y2, x1, x2):
+        """Return the mask id of the cells from rows y1 to y2, x1 to x2."""
+        return f"bbox:{int(y1)},{int(y2)},{int(x1)},{int(x2)}"
+
+    def gridsId(self, ys, xs):
+        """Return the mask id of a set of cells as runs of columns by row."""
+        cells = np.unique(np.ravel_multi_index((ys, xs), self.shape))
+        ys, xs = np.unravel_index(cells, self.shape)
+        breaks = np.where((np.diff(ys) != 0) | (np.diff(xs) != 1))[0] + 1
+        starts = np.concatenate([[0], breaks])
+        stops = np.concatenate([breaks, [len(cells)]]) - 1
+        runs = [f"{ys[i]}.{xs[i]}-{xs[j]}" for i, j in zip(starts, stops)]
+        return "grids:" + ",".join(runs)
+
+    def register(self, flag, mask):
+        """
+        Register a mask that can not be derived from its id, like a shape,
+        and return its id.
+
+        flag = location flag (e.g. "shape")
+        mask = 2D array, 1 (or True) for included cells
+        """
+        mask = np.asarray(mask)
+        with np.errstate(invalid="ignore"):
+            inside = np.nan_to_num(mask) != 0
+        cells = np.where(inside.ravel() & self.land)[0]
+        digest = hashlib.sha1(cells.astype("<i8").tobytes()).hexdigest()
+        mask_id = f"{flag}:{digest[:16]}"
+        path = self.directory.joinpath(mask_id.replace(":", "_") + ".npy")
+        if not path.exists():
+            np.save(path, cells)
+        self._store(mask_id, cells)
+        return mask_id
+
+    def _store(self, mask_id, cells):
+        """Keep the flat indices of a mask id."""
+        with self._lock:
+            self._indices[mask_id] = cells
+            self._indices.move_to_end(mask_id)
+            while len(self._indices) > self.size:
+                self._indices.popitem(last=False)
+
+    def _build(self, mask_id):
+        """Return the flat indices of the cells a mask id describes."""
+        flag, _, spec = mask_id.partition(":")
+        grid = np.isfinite(self.crdict.grid)
+        nlon = self.shape[1]
+        if flag == "all":
+            cells = np.where(grid.ravel())[0]
+        elif flag in self.regions:
+            groups = self.regions[flag]
+            codes = [int(code) for code in spec.split(",")]
+            cells = [groups[code] for code in codes if code in groups]
+            if cells:
+                cells = np.sort(np.concatenate(cells))
+            else:
+                cells = np.array([], dtype="int64")
+        elif flag == "grid":
+            y, x = [int(i) for i in spec.split(",")]
+            cells = np.array([y * nlon + x])
+            cells = cells[self.land[cells]]
+        elif flag == "bbox":
+            y1, y2, x1, x2 = [int(i) for i in spec.split(",")]
+            inside = np.zeros(self.shape, dtype=bool)
+            inside[y1:y2, x1:x2] = grid[y1:y2, x1:x2]
+            cells = np.where(inside.ravel())[0]
+        elif flag == "grids":
+            cells = []
+            for run in spec.split(","):
+                y, xs = run.split(".")
+                x1, x2 = [int(x) for x in xs.split("-")]
+                cells.append(int(y) * nlon + np.arange(x1, x2 + 1))
+            cells = np.concatenate(cells)
+            cells = cells[grid.ravel()[cells]]
+        else:
+            path = self.directory.joinpath(mask_id.replace(":", "_") + ".npy")
+            if not path.exists():
+                raise KeyError(f"Unknown location mask: {mask_id}")
+            cells = np.load(path)
+            cells = cells[self.land[cells]]
+        return np.asarray(cells, dtype="int64")
+
+    def cells(self, mask_id):
+        """Return the flat grid indices of the cells a mask id selects."""
+        with self._lock:
+            cells = self._indices.get(mask_id)
+            if cells is not None:
+                self._indices.move_to_end(mask_id)
+                return cells
+        cells = self._build(mask_id)
+        self._store(mask_id, cells)
+        return cells
+
+    def indices(self, mask_id):
+        """Return the row and column indices of a mask id's cells."""
+        return np.unravel_index(self.cells(mask_id), self.shape)
+
+    def mask(self, mask_id):
+        """Return a grid of 1s in a mask id's cells and NaN elsewhere."""
+        mask = np.full(self.shape, np.nan)
+        mask.ravel()[self.cells(mask_id)] = 1
+        return mask
+
+
 class Coordinate_Dictionaries:
     """
     This translates cartesian coordinates to geographic coordinates and back.
     It also provides information about the coordinate system used in the
     source data set, and methods to translate grid ids to plotly point objects
-    and back.
+    and back. Coordinates are converted to array indices with the source
+    geotransform, so whole arrays of points convert at once.
     """
-    def __init__(self, source_path, grid):
-        # Source Data Array
-        self.source = xr.open_dataarray(source_path)
+    def __init__(self, source, grid):
+        # Source Data Array, or the path to one
+        if isinstance(source, xr.DataArray):
+            self.source = source
+        else:
+            with xr.open_dataarray(source) as data:
+                self.source = data.load()
 
         # Geometry
         self.x_length = self.source.shape[2]
@@ -1511,12 +2046,60 @@ class Coordinate_Dictionaries:
         self.lons = [self.lon_min + self.res*x for x in self.xs]
         self.lats = [self.lat_max - self.res*y for y in self.ys]
 
-        # Dictionaires with coordinates and array index positions
+        # Dense lookup of each grid id's flat array index, -1 if missing
         self.grid = grid
-        self.londict = dict(zip(self.lons, self.xs))
-        self.latdict = dict(zip(self.lats, self.ys))
-        self.londict_rev = {y: x for x, y in self.londict.items()}
-        self.latdict_rev = {y: x for x, y in self.latdict.items()}
+        finite = np.isfinite(grid)
+        ids = np.asarray(grid)[finite].astype("int64")
+        self.grid_cells = np.full(ids.max() + 1 if len(ids) else 0, -1,
+                                  dtype="int64")
+        self.grid_cells[ids] = np.flatnonzero(finite)
+
+    def _toIndex(self, values, origin, step, size, strict):
+        """
+        Convert coordinates to array indices from the geotransform, snapping
+        values within COORD_TOLERANCE of a cell to it.
+        """
+        scalar = np.ndim(values) == 0
+        position = (np.asarray(values, dtype="f8") - origin) / step
+        index = np.rint(position)
+        found = ((np.abs(position - index) <= COORD_TOLERANCE)
+                 & (index >= 0) & (index < size))
+        if strict:
+            if not found.all():
+                missing = np.asarray(values)[~found]
+                raise KeyError(f"Coordinates off the grid: {missing[:5]}")
+            index = index.astype("int64")
+        else:
+            index = np.where(found, index, np.nan)
+        return index.item() if scalar else index
+
+    def latToRow(self, lats, strict=True):
+        """
+        Return the row index of one or many latitudes. Latitudes off the grid
+        raise a KeyError, or are NaN if strict is False.
+        """
+        return self._toIndex(lats, self.lat_max, -self.res, self.y_length,
+                             strict)
+
+    def lonToCol(self, lons, strict=True):
+        """
+        Return the column index of one or many longitudes. Longitudes off the
+        grid raise a KeyError, or are NaN if strict is False.
+        """
+        return self._toIndex(lons, self.lon_min, self.res, self.x_length,
+                             strict)
+
+    def gridToCell(self, gridids):
+        """
+        Return the row and column indices of one or many grid ids.
+        """
+        ids = np.asarray(gridids, dtype="f8")
+        valid = np.isfinite(ids) & (ids >= 0) & (ids < len(self.grid_cells))
+        cells = np.full(ids.shape, -1, dtype="int64")
+        cells[valid] = self.grid_cells[ids[valid].astype("int64")]
+        if (cells < 0).any():
+            raise KeyError(f"Unknown grid ids: {ids[cells < 0][:5]}")
+        return np.unravel_index(cells, self.grid.shape)
 
     def pointToGrid(self, point):
         """
@@ -1524,8 +2107,8 @@ class Coordinate_Dictionaries:
         """
         lon = point["points"][0]["longitude"]
         lat = point["points"][0]["latitude"]
-        x = self.londict[lon]
-        y = self.latdict[lat]
+        x = self.lonToCol(lon)
+        y = self.latToRow(lat)
         gridid = self.grid[y, x]
         return gridid
 
@@ -1534,9 +2117,9 @@ class Coordinate_Dictionaries:
         """
         Takes in a grid ID and outputs a plotly point dictionary
         """
-        y, x = np.where(self.grid == gridid)
-        lon = self.londict_rev[int(x[0])]
-        lat = self.latdict_rev[int(y[0])]
+        y, x = self.gridToCell(gridid)
+        lon = self.lons[int(x)]
+        lat = self.lats[int(y)]
         point = {"points": [{"longitude": lon, "latitude": lat}]}
         return point
 
@@ -1577,7 +2160,6 @@ class Index_Maps(Paths):
         self.reverse = False
         self.setData()
         self.setReverse()
-        self.index_ranges = pd.read_csv(self.paths["tables"].joinpath("index_ranges.csv"))
         self.time_data = time_data  # This updates info but cannot be accessed  # <-- Help
 
     @property
@@ -1595,6 +2177,7 @@ class Index_Maps(Paths):
         in all of the calculations and updates an xarray reference called
         "dataset_interval".
         """
+        import dask.array as da
         # Get the full data set
         dataset = self.dataset
 
@@ -1613,7 +2196,8 @@ class Index_Maps(Paths):
         data = data.sel(time=np.in1d(data["time.month"], month_filter))
 
         # If this filters all of the data out, return a special "NA" data set
-        if len(data.time) == 0:
+        self.empty = len(data.time) == 0
+        if self.empty:
 
             # Get the right resolution file
             res = data.crs.GeoTransform[0]
@@ -1651,9 +2235,15 @@ class Index_Maps(Paths):
             self.data_min = 0
             self.data_max = 100
         else:
-            ranges = self.index_ranges
-            minimum = ranges["min"][ranges["index"] == self.choice].values[0]
-            maximum = ranges["max"][ranges["index"] == self.choice].values[0]
+            minimum = self.catalog["value_min"]
+            maximum = self.catalog["value_max"]
+
+            # Catalog entries built while the app runs have no value range
+            if minimum is None or maximum is None:
+                ranges = indexRanges()
+                ranges = ranges[ranges["index"] == self.choice]
+                minimum = ranges["min"].values[0]
+                maximum = ranges["max"].values[0]
 
             # For index values we want them to be centered on zero
             nonindices = ["tdmean", "tmean", "tmin", "tmax", "ppt",  "vpdmax",
@@ -1673,22 +2263,7 @@ class Index_Maps(Paths):
         a predefined plotly color scale, or an actual color scale, which is
         a list.
         """
-        from drip.app.options.colors import COLORS
-
-        # Default color schemes
-        defaults = {
-            "percentile": COLORS["RdWhBu"],
-            "original":  COLORS["BrGn (cb)"],
-            "area": COLORS["RdWhBu"],
-            "correlation_o": COLORS["Viridis"],
-            "correlation_p": COLORS["Viridis"]
-        }
-
-        if value == "Default":
-            scale = defaults[self.choice_type]
-        else:
-            scale = COLORS[value]
-
+        scale = colorScale(self.choice_type, value)
         self.color_scale = scale
 
     def setData(self):
@@ -1703,43 +2278,55 @@ class Index_Maps(Paths):
             f"{self.choice}{TYPE_PATHS[self.choice_type]}.nc"
         )
         if self.chunk:
-            dataset = xr.open_dataset(file_path, chunks=100)  # <------------------ Best chunk size/shape?
+            chunks = chunk_layout(file_path.stem)["dask"]
         else:
-            dataset = xr.open_dataset(file_path)
+            chunks = None
+        key = (self.choice, self.choice_type)
+        dataset = DATASET_POOL.get(key, file_path, chunks)
 
         # Set this as an attribute for easy retrieval
         self.dataset = dataset
+        self.file_path = file_path
+
+    @property
+    def catalog(self):
+        """Return the index catalog entry of the original values."""
+        return catalog_entry(self.choice)
+
+    @property
+    def area_path(self):
+        """Return the path to the region drought area table."""
+        stem = self.file_path.stem
+        return self.file_path.parent.joinpath(f"{stem}_area.nc")
+
+    @property
+    def land_path(self):
+        """Return the path to the land-pixel copy of the data set."""
+        stem = self.file_path.stem
+        return self.file_path.parent.joinpath(f"{stem}_land.nc")
+
+    @property
+    def prefix_path(self):
+        """Return the path to the monthly prefix sums of the data set."""
+        stem = self.file_path.stem
+        return self.file_path.parent.joinpath(f"{stem}_prefix.nc")
+
+    @property
+    def series_path(self):
+        """Return the path to the pixel-major copy of the data set."""
+        stem = self.file_path.stem
+        return self.file_path.parent.joinpath(f"{stem}_series.nc")
 
     def setMask(self, location, crdict):
         """
         Take a location object and the coordinate dictionary to create an
         xarray for masking the dask datasets without pulling into memory.
 
-        location = location from Location_Builder or 1d array
-        crdict = coordinate dictionary
+        location = location from Location_Builder
+        crdict = coordinate dictionary with a Mask_Registry
         """
-        # Get x, y coordinates from location
-        flag, y, x, label, idx = location
-        mask = crdict.grid.copy()
-
-        # Create mask array
-        if flag not in ["all", "bbox", "shape"]:
-            y = json.loads(y)
-            x = json.loads(x)
-            gridids = crdict.grid[y, x]
-            mask[~np.isin(crdict.grid, gridids)] = np.nan
-        elif flag == "shape":
-            with rio.open(location[3]) as r:
-                mask = r.read(1)
-            mask[mask == 0] = np.nan
-        elif flag == "bbox":
-            y = json.loads(y)
-            x = json.loads(x)
-            gridids = crdict.grid[y[0]:y[-1], x[0]:x[-1]].flatten()
-            mask[~np.isin(crdict.grid, gridids)] = np.nan
-
-        # Invert mask so that 1's represent included area
-        mask = mask * 0 + 1
+        # Look up the cells of the location's mask id
+        mask = crdict.masks.mask(location[1])
 
         # Set up grid info from coordinate dictionary
         geom = crdict.source.transform
@@ -1774,7 +2361,7 @@ class Index_Maps(Paths):
             self.reverse = False
 
     def getTime(self):
-        # Now read in the corrollary albers data set
+        """Return the time_data list that selects the current dates."""
         dates = pd.DatetimeIndex(self.dataset_interval.time[:].values)
         year1 = min(dates.year)
         year2 = max(dates.year)
@@ -1786,178 +2373,408 @@ class Index_Maps(Paths):
         return time_data
 
     def getMean(self):
-        return self.dataset_interval.value.mean(dim="time", skipna=True)
+        mean = self.getPrefixMean()
+        if mean is None:
+            land = self.getLand()
+            if land is not None:
+                mean = self.toGrid(np.nanmean(land, axis=0))
+            else:
+                mean = self.dataset_interval.value.mean(dim="time",
+                                                        skipna=True)
+        return mean
+
+    def getLand(self):
+        """
+        Return the selected dates of the land-pixel copy of the data set as a
+        (time, pixel) array and set the "land_pixels" attribute used to place
+        them back on the grid. Returns None if that file is missing or does
+        not cover the selected dates, so the caller can fall back to the
+        full data set.
+        """
+        selection = self.getLandSelection()
+        if selection is None:
+            return None
+        values, tidx = selection
+        return values[tidx].values
+
+    def getLandSelection(self):
+        """
+        Return the lazy value variable of the land-pixel copy of the data set
+        and the time indices (a slice for consecutive months) of the selected
+        dates, and set the "land_pixels" attribute. Returns None if that file
+        is missing or does not cover the selected dates.
+        """
+        if self.empty or not self.land_path.exists():
+            return None
+
+        key = (self.choice, self.choice_type, "land")
+        store = DATASET_POOL.get(key, self.land_path)
+        times = self.dataset_interval.time.values
+        tidx = np.where(np.isin(store.time.values, times))[0]
+        if len(tidx) != len(times):
+            return None
+
+        # A run of consecutive months is a single read
+        if tidx[-1] - tidx[0] + 1 == len(tidx):
+            tidx = slice(tidx[0], tidx[-1] + 1)
+
+        mtime = os.path.getmtime(self.land_path)
+        self.land_pixels = landPixels(str(self.land_path), mtime)
+
+        return store["value"], tidx
+
+    def toGrid(self, array):
+        """
+        Place a 2D array, or a vector of land pixels, on the data set's
+        latitude and longitude coordinates.
+        """
+        if array.ndim == 1:
+            array = self.land_pixels.scatter(array)
+        data = self.dataset_interval
+        array = xr.DataArray(
+            array,
+            coords={
+                "latitude": data.coords["latitude"].data,
+                "longitude": data.coords["longitude"].data
+            },
+            dims=("latitude", "longitude"),
+            name="value"
+        )
+        return array
+
+    def getPrefixMean(self):
+        """
+        Return the mean over the selected dates from the monthly prefix sums.
+        For each selected calendar month this reads the cumulative sum and
+        count at either end of its year range, so the cost depends on the
+        number of months selected and not on the number of years. Returns
+        None if the prefix sums are missing or do not cover the selection,
+        so the caller can fall back to reducing the data set.
+        """
+        if self.empty or not self.prefix_path.exists():
+            return None
+
+        dates = pd.DatetimeIndex(self.dataset_interval.time.values)
+        key = (self.choice, self.choice_type, "prefix")
+        store = DATASET_POOL.get(key, self.prefix_path)
+        first = int(store.year[0])
+        nyears = store.year.size
+        total = 0
+        count = 0
+        for month in np.unique(dates.month):
+            years = dates.year[dates.month == month]
+            i1 = years.min() - first
+            i2 = years.max() - first + 1
+            if i1 < 0 or i2 >= nyears or i2 - i1 != len(years):
+                return None
+            sums = store["sums"][month - 1, [i1, i2]].values
+            counts = store["counts"][month - 1, [i1, i2]].values
+            total += sums[1] - sums[0]
+            count += counts[1] - counts[0]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+
+        return self.toGrid(mean)
 
     def getMin(self):
+        land = self.getLand()
+        if land is not None:
+            return self.toGrid(np.nanmin(land, axis=0))
         return self.dataset_interval.value.min(dim="time", skipna=True)
 
     def getMax(self):
+        land = self.getLand()
+        if land is not None:
+            return self.toGrid(np.nanmax(land, axis=0))
         return self.dataset_interval.value.max(dim="time", skipna=True)
 
-    def getSeries(self, location, crdict):
+    def getSeries(self, location, crdict, weighted=False):
         """
         This uses the mask to get a monthly time series of values at a
-        specified location.
+        specified location. Only the masked cells are read and reduced, so
+        the time this takes scales with the size of the location rather than
+        the grid.
+
+        location = location from Location_Builder
+        crdict = coordinate dictionary
+        weighted = weight each cell by its area on the WGS84 ellipsoid
         """
-        # Get filtered dataset
-        data = self.dataset_interval
+        # Get the selected cells
+        flag = location[0]
+        ys, xs = np.where(self.mask.data == 1)
+        weights = None
+        if weighted:
+            lats = self.dataset_interval.latitude.values
+            weights = cell_areas(lats)[ys]
+
+        # Points and small areas are read from the pixel-major file
+        timeseries = None
+        if flag != "all" and 0 < len(ys) <= SERIES_PIXEL_LIMIT:
+            timeseries = self.getPixelSeries(ys, xs, weights)
+
+        # Larger areas are gathered from the land pixel or full grid files
+        if timeseries is None:
+            timeseries = self.getGatherSeries(ys, xs, weights)
 
-        # Get the location coordinates
-        flag, y, x, label, idx = location
+        return timeseries
 
-        # Filter if needed and generate timeseries
-        if flag == "all":
-            timeseries = data.value.mean(dim=("latitude", "longitude"), skipna=True)
-            timeseries = timeseries.values
+    def getGatherSeries(self, ys, xs, weights=None):
+        """
+        Return the mean time series of a set of cells gathered, in blocks of
+        SERIES_CHUNK time steps, from the land-pixel copy of the data set, or
+        from the rows and columns that hold them in the main data set if
+        that copy is not available.
+
+        ys = array of row indices
+        xs = array of column indices
+        weights = array of cell weights
+        """
+        ntime = len(self.dataset_interval.time)
+        if len(ys) == 0:
+            return np.full(ntime, np.nan)
+
+        selection = self.getLandSelection()
+        if selection is not None:
+            values, tidx = selection
+            if isinstance(tidx, slice):
+                tidx = np.arange(tidx.start, tidx.stop)
+
+            # Find the land pixel of each cell, the rest have no values
+            pixels = self.land_pixels
+            ncols = pixels.shape[1]
+            pflat = pixels.rows * ncols + pixels.cols
+            order = np.argsort(pflat)
+            pos = np.searchsorted(pflat, ys * ncols + xs, sorter=order)
+            pos = np.minimum(pos, len(pflat) - 1)
+            found = pflat[order[pos]] == ys * ncols + xs
+            pix = order[pos[found]]
+            if weights is not None:
+                weights = weights[found]
+            if len(pix) == 0:
+                return np.full(ntime, np.nan)
+
+            # Land pixels are in row order, so a region is one span
+            p1 = pix.min()
+            p2 = pix.max() + 1
+
+            def read(start, stop):
+                idx = tidx[start:stop]
+                if idx[-1] - idx[0] + 1 == len(idx):
+                    idx = slice(idx[0], idx[-1] + 1)
+                return values[idx, p1:p2].values[:, pix - p1]
         else:
-            y = json.loads(y)
-            x = json.loads(x)
-            if flag == "grid":
-                timeseries = data.value[:, y, x].values
-            else:
-                data = data.where(self.mask == 1)
-                timeseries = data.value.mean(dim=("latitude", "longitude"), skipna=True)
-                timeseries = timeseries.values
+            values = self.dataset_interval.value
+            y1, y2 = ys.min(), ys.max() + 1
+            x1, x2 = xs.min(), xs.max() + 1
+
+            def read(start, stop):
+                block = values[start:stop, y1:y2, x1:x2].values
+                return block[:, ys - y1, xs - x1]
+
+        timeseries = []
+        for start in range(0, ntime, SERIES_CHUNK):
+            stop = min(start + SERIES_CHUNK, ntime)
+            timeseries.append(nanMean(read(start, stop), weights))
+        timeseries = np.concatenate(timeseries)
+
+        return timeseries
+
+    def getPixelSeries(self, ys, xs, weights=None):
+        """
+        Return the mean time series of a set of cells read from the
+        pixel-major copy of the data set. Each row of cells is one contiguous
+        read. Returns None if that file is missing or does not cover the
+        selected dates, so the caller can fall back to the main data set.
+
+        ys = array of row indices
+        xs = array of column indices
+        weights = array of cell weights
+        """
+        if not self.series_path.exists():
+            return None
+
+        times = self.dataset_interval.time.values
+        key = (self.choice, self.choice_type, "series")
+        store = DATASET_POOL.get(key, self.series_path)
+        tidx = np.where(np.isin(store.time.values, times))[0]
+        if len(tidx) != len(times):
+            return None
+
+        # Read the span of each row that holds selected cells
+        values = []
+        row_weights = []
+        for y in np.unique(ys):
+            in_row = ys == y
+            row_xs = xs[in_row]
+            x1 = row_xs.min()
+            x2 = row_xs.max() + 1
+            block = store.value[y, x1:x2].values
+            values.append(block[row_xs - x1][:, tidx])
+            if weights is not None:
+                row_weights.append(weights[in_row])
+
+        values = np.concatenate(values)
+        if weights is not None:
+            weights = np.concatenate(row_weights)
+        timeseries = nanMean(values.T, weights)
 
-        # print("Area fitlering complete.")
         return timeseries
 
-    def getCorr(self, location, crdict):
+    def getCorr(self, location, crdict, reference=None):
         """
         Create a field of pearson"s correlation coefficients with any one
-        selection.
+        selection. If reference is another Index_Maps object, its time
+        series at the selection is used instead, over the dates both share,
+        for a cross-index correlation map.
         """
-        ts = self.getSeries(location, crdict)
-        arrays = self.dataset_interval.value.values
-        array = correlationField(ts, arrays)
+        if reference is None:
+            reference = self
+        ts = reference.getSeries(location, crdict)
+
+        # Line the reference series up with the dates of this data set
+        times = self.dataset_interval.time.values
+        ref_times = reference.dataset_interval.time.values
+        common = np.intersect1d(times, ref_times)
+        ts = np.asarray(ts)[np.isin(ref_times, common)]
+        keep = np.where(np.isin(times, common))[0]
+
+        # Stream the land pixels if available, otherwise the full grid
+        selection = self.getLandSelection()
+        if selection is not None:
+            values, tidx = selection
+            if isinstance(tidx, slice):
+                tidx = np.arange(tidx.start, tidx.stop)
+            tidx = tidx[keep]
+
+            def read(start, stop):
+                idx = tidx[start:stop]
+                if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+                    idx = slice(idx[0], idx[-1] + 1)
+                return values[idx].values
+
+            field = correlationField(ts, read, len(tidx))
+            array = self.land_pixels.scatter(field)
+        else:
+            values = self.dataset_interval.value
+
+            def read(start, stop):
+                block = values[keep[start:stop]].values
+                return block.reshape(block.shape[0], -1)
+
+            field = correlationField(ts, read, len(keep))
+            array = field.reshape(values.shape[1:])
+
         template = self.mask.copy()
         template.data = array
 
         return template
 
-    def getArea(self, crdict):
+    def getArea(self, crdict, regions=None):
         """
-        This will take in a time series of arrays and a drought severity
-        category and mask out all cells with values above or below the category
-        thresholds. If inclusive is "True" it will only mask out all cells that
-        fall above the chosen category.
-
-        This should be cached with functools, and will be calculated only once
-        in the app if the Index_Maps object is properly cached with flask
-        caching.
+        Bin each masked cell at each time step into the drought severity
+        categories (D0 - D4) and return the inclusive and non-inclusive
+        percent area of each category and the Drought Severity Coverage Index
+        (DSCI). The data is read and binned in blocks of AREA_CHUNK time
+        steps, so this is one pass over the data with bounded memory.
+
+        There is some question about the Drought Severity Coverage Index.
+        The NDMC does not use inclusive drought categories though NIDIS
+        appeared to in the "Historical Character of US Northern Great
+        Plains Drought" study. In an effort to match NIDIS" sample chart,
+        we are using the inclusive method for now. It would be fine either
+        way as long as the index is compared to other values with the same
+        calculation, but we should really defer to NDMC. We could also add
+        an option to display inclusive vs non-inclusive drought severity
+        coverages.
 
         For now this requires original values, percentiles even out too
         quickly.
+
+        regions = region codes (0 for CONUS, state FIPS, or full county FIPS)
+                  that make up the mask, if it is made of whole regions
         """
+        # Use the region area table if the location is made of whole regions
+        if regions is not None:
+            area = self.getRegionArea(regions)
+            if area is not None:
+                return area
+
         # Specify choice in case it needs to be inverse for eddi
         choice = self.choice
         data = self.dataset_interval
 
-        # Now read in the corrollary albers data set
-        time_data = self.getTime()
-        choice_type = "projected"
-        proj_data = Index_Maps(choice, choice_type, time_data, "RdWhBu",
-                               chunk=True)
-
-        # Filter data by the mask (should be set already)
-        masked_arrays = data.where(self.mask == 1)
-        proj_data = wgsToAlbers(proj_data, masked_arrays, crdict)
-        arrays = proj_data.dataset_interval.value
-
-        # Flip if this is EDDI
-        if "eddi" in choice:
-            arrays = arrays * -1
-
-        # Drought Categories
-        drought_cats = {
-            "sp": {
-                0: [-0.5, -0.8],
-                1: [-0.8, -1.3],
-                2: [-1.3, -1.5],
-                3: [-1.5, -2.0],
-                4: [-2.0, -999]
-            },
-            "eddi": {
-                0: [-0.5, -0.8],
-                1: [-0.8, -1.3],
-                2: [-1.3, -1.5],
-                3: [-1.5, -2.0],
-                4: [-2.0, -999]
-            },
-            "pdsi": {
-                0: [-1.0, -2.0],
-                1: [-2.0, -3.0],
-                2: [-3.0, -4.0],
-                3: [-4.0, -5.0],
-                4: [-5.0, -999]
-            },
-            "scpdsi": {
-                0: [-1.0, -2.0],
-                1: [-2.0, -3.0],
-                2: [-3.0, -4.0],
-                3: [-4.0, -5.0],
-                4: [-5.0, -999]
-            },
-            "pzi": {
-                0: [-1.0, -2.0],
-                1: [-2.0, -3.0],
-                2: [-3.0, -4.0],
-                3: [-4.0, -5.0],
-                4: [-5.0, -999]
-            },
-            "leri": {
-                0: [-0.5, -0.8],
-                1: [-0.8, -1.3],
-                2: [-1.3, -1.5],
-                3: [-1.5, -2.0],
-                4: [-2.0, -999]
-            }
-        }
+        # Use the masked land pixels if available, weighting by cell area
+        selection = self.getLandSelection()
+        if selection is not None:
+            values, tidx = selection
+            inmask = self.land_pixels.pack(self.mask.data) == 1
+            weights = self.land_pixels.weights[inmask]
+            if isinstance(tidx, slice):
+                tidx = np.arange(tidx.start, tidx.stop)
 
-        # Choose a set of categories
-        cat_key = [key for key in drought_cats.keys() if key in choice][0]
-        cats = drought_cats[cat_key]
+            def block(i):
+                idx = tidx[i: i + AREA_CHUNK]
+                if idx[-1] - idx[0] + 1 == len(idx):
+                    idx = slice(idx[0], idx[-1] + 1)
+                return values[idx].values[:, inmask]
 
-        def catFilter(arrays, d, inclusive=False):
-            """
-            There is some question about the Drought Severity Coverage Index.
-            The NDMC does not use inclusive drought categories though NIDIS
-            appeared to in the "Historical Character of US Northern Great
-            Plains Drought" study. In an effort to match NIDIS" sample chart,
-            we are using the inclusive method for now. It would be fine either
-            way as long as the index is compared to other values with the same
-            calculation, but we should really defer to NDMC. We could also add
-            an option to display inclusive vs non-inclusive drought severity
-            coverages.
-            """
-            totals = arrays.where(~np.isnan(arrays)).count(dim=("latitude", "longitude"))
-            if inclusive:
-                counts = arrays.where(arrays<d[0]).count(dim=("latitude", "longitude"))
-            else:
-                counts = arrays.where((arrays<d[0]) &
-                                      (arrays>=d[1])).count(dim=("latitude", "longitude"))
-            ratios = counts / totals
-            pcts = ratios.compute().data * 100
-            return pcts
+            ntime = len(tidx)
 
-        # Calculate non-inclusive percentages # <------------------------------ parallelizing with delayed speeds it up but takes just a bit too much memory for the virtual machine to handle the full time series
-#        pnincs = [dask.delayed(catFilter)(arrays, cats[i]) for i in range(5)]
-#        pnincs = np.array(dask.compute(*pnincs))
-        pnincs =  np.array([catFilter(arrays, cats[i]) for i in range(5)])
+        # Otherwise use the masked cells of the full grid
+        else:
+            arrays = data.value
+            inmask = self.mask.data.ravel() == 1
+            lats = data.coords["latitude"].data
+            lons = data.coords["longitude"].data
+            resolution = abs(lons[1] - lons[0])
+            areas = np.repeat(cell_areas(lats, resolution), len(lons))
+            weights = areas[inmask]
+
+            def block(i):
+                values = arrays[i: i + AREA_CHUNK].values
+                return values.reshape(values.shape[0], -1)[:, inmask]
+
+            ntime = arrays.shape[0]
+
+        # Count each category at each time step in one pass
+        edges = category_edges(choice)
+        counts = []
+        for i in range(0, ntime, AREA_CHUNK):
+            chunk = block(i)
+            if "eddi" in choice:
+                chunk = chunk * -1
+            counts.append(category_counts(chunk, edges, weights))
+        areas, totals = category_areas(np.concatenate(counts))
+        pincs, pnincs, DSCI = coverage(areas, totals)
+
+        # Return the list of five layers
+        return pincs, pnincs, DSCI
 
-        # Use the noninclusive percentages to create the inclusive percentages
-        pincs = [np.sum(pnincs[i:], axis=0) for i in range(len(pnincs))]
+    def getRegionArea(self, regions):
+        """
+        Return the inclusive and non-inclusive drought category percentages
+        and the DSCI for a set of whole regions from the region area table,
+        summing region areas before taking percentages. Returns None if the
+        table is missing or does not cover the regions or selected dates, so
+        the caller can compute them from the data set.
+        """
+        if self.empty or not self.area_path.exists():
+            return None
 
-        # Also use the noninclusive arrays to get the DSCI
-        pnacc = np.array([pnincs[i]*(i+1) for i in range(5)])
-        DSCI = list(np.nansum(pnacc, axis=0))
+        key = (self.choice, self.choice_type, "area")
+        store = DATASET_POOL.get(key, self.area_path)
+        ridx = np.where(np.isin(store.region.values, regions))[0]
+        times = self.dataset_interval.time.values
+        tidx = np.where(np.isin(store.time.values, times))[0]
+        if len(ridx) != len(set(regions)) or len(tidx) != len(times):
+            return None
 
-        # To store these in a div they need to work with json
-        pincs = [list(a) for a in pincs]
-        pnincs = [list(p) for p in pnincs]
+        selection = store.isel(region=ridx, time=tidx)
+        areas = selection["area"].values.sum(axis=0)
+        totals = selection["total"].values.sum(axis=0)
 
-        # Return the list of five layers
-        return pincs, pnincs, DSCI
+        return coverage(areas, totals)
 
     def getFunction(self, function):
         """
@@ -1972,7 +2789,9 @@ class Index_Maps(Paths):
             "pmax": self.getMax,
             "oarea": self.getMean,  # <------------------------------- Note that this is returning the mean for now (skipped,  performed in app for now)
             "ocorr": self.getMean,
-            "pcorr": self.getMean
+            "oxcorr": self.getMean,
+            "pcorr": self.getMean,
+            "pxcorr": self.getMean
         }
         function = functions[function]
 
@@ -2045,6 +2864,10 @@ class Location_Builder:
             "county_2.value",
             "state_1.value",
             "state_2.value"
+
+        The location is [flag, mask id, label], where the mask id is
+        resolved to cells by the coordinate dictionary's Mask_Registry only
+        when the data are masked.
         """
         # Unpack elements
         trig_id = self.trig_id
@@ -2052,33 +2875,33 @@ class Location_Builder:
         admin_df = self.admin_df
         states_df = self.states_df
         crdict = self.crdict
-        county_array = self.county_array
-        state_array = self.state_array
+        masks = crdict.masks
 
         # 1: Selection is a county selection
         if "county" in trig_id:
             county = admin_df["place"][admin_df.fips == trig_val].unique()[0]
-            y, x = np.where(county_array == trig_val)
-            location = ["county", str(list(y)), str(list(x)), county]
+            mask_id = masks.countyId(trig_val)
+            location = ["county", mask_id, county]
 
         # 2: Selection is a single grid IDs
         elif "clickData" in trig_id:
             lon = trig_val["points"][0]["lon"]
             lat = trig_val["points"][0]["lat"]
-            x = crdict.londict[lon]
-            y = crdict.latdict[lat]
+            x = crdict.lonToCol(lon)
+            y = crdict.latToRow(lat)
             gridid = crdict.grid[y, x]
             counties = admin_df["place"][admin_df.grid == gridid]
             county = counties.unique()
             label = county[0] + " (Grid " + str(int(gridid)) + ")"
-            location = ["grid", str(y), str(x), label]
+            mask_id = masks.gridId(y, x)
+            location = ["grid", mask_id, label]
 
         # 3: Selection is a set of grid IDs
         elif "selectedData" in trig_id:
             if trig_val is not None:
                 selections = trig_val["points"]
-                y = list([crdict.latdict[d["lat"]] for d in selections])
-                x = list([crdict.londict[d["lon"]] for d in selections])
+                y = crdict.latToRow([d["lat"] for d in selections])
+                x = crdict.lonToCol([d["lon"] for d in selections])
                 counties = np.array([d["text"][:d["text"].index("<")] for
                                      d in selections])
                 local_df = admin_df[admin_df["place"].isin(
@@ -2090,7 +2913,8 @@ class Location_Builder:
                 SE = local_df["place"][
                     local_df["gradient"] == max(local_df["gradient"])].item()
                 label = NW + " to " + SE
-                location = ["grids", str(y), str(x), label]
+                mask_id = masks.gridsId(y, x)
+                location = ["grids", mask_id, label]
             else:
                 raise PreventUpdate
 
@@ -2098,15 +2922,15 @@ class Location_Builder:
         elif "update" in trig_id:
             # Selection is the default "all"
             if type(trig_val) is str:
-                location = ["all",  "y", "x", "Contiguous United States"]
+                location = ["all", "all", "Contiguous United States"]
 
             # Empty list, default to CONUS
             elif len(trig_val) == 0:
-                location = ["all",  "y", "x", "Contiguous United States"]
+                location = ["all", "all", "Contiguous United States"]
 
             # A selection of "all" within a list
             elif len(trig_val) == 1 and trig_val[0] == "all":
-                location = ["all",  "y", "x", "Contiguous United States"]
+                location = ["all", "all", "Contiguous United States"]
 
             # Single or multiple, not "all" or empty, state or list of states
             elif len(trig_val) >= 1:
@@ -2118,23 +2942,19 @@ class Location_Builder:
                     state = [states_df["state"][
                              states_df["state_abbr"]==s].item() for s in state]
                 states = ", ".join(state)
-                y, x = np.where(np.isin(state_array, trig_val))
 
                 # And return the location information
-                location = ["state", str(list(y)), str(list(x)), states]
+                mask_id = masks.stateId(trig_val)
+                location = ["state", mask_id, states]
 
         # 3: location is the basename of a shapefile saved as temp.shp
         elif "shape" in trig_id:
-            # We don"t have the x,y values just yet
+            # Parse_Shape registered the upload's mask and named it
             try:
-                src = str(Paths.paths["shapefiles"].joinpath("temp/temp1.tif"))
-                shp = gdal.Open(src).ReadAsArray()
-                shp = shp[::-1]
-                shp[shp == -9999] = np.nan
-                y, x = np.where(~np.isnan(shp))
-                location = ["shape", str(list(y)), str(list(x)), trig_val]
+                mask_id, label = json.loads(trig_val)
+                location = ["shape", mask_id, label]
             except:
-                location = ["all", "y", "x", "Contiguous United States"]
+                location = ["all", "all", "Contiguous United States"]
 
         # 4: A bounding box was entered        
         elif "bbox" in trig_id:
@@ -2142,13 +2962,10 @@ class Location_Builder:
             minlon, minlat, maxlon, maxlat = self.bbox_filter(trig_val)
 
             # Convert coordinates to array indices
-            xmin = crdict.londict[minlon]
-            ymin = crdict.latdict[maxlat] # Inverse y-axis here
-            xmax = crdict.londict[maxlon]
-            ymax = crdict.latdict[minlat]
-
-            y = [y for y in range(ymin, ymax + 1)]
-            x = [x for x in range(xmin, xmax + 1)]
+            xmin = crdict.lonToCol(minlon)
+            ymin = crdict.latToRow(maxlat) # Inverse y-axis here
+            xmax = crdict.lonToCol(maxlon)
+            ymax = crdict.latToRow(minlat)
 
             # Convert indices to gridids
             gridids = crdict.grid[ymin:ymax, xmin:xmax].flatten()
@@ -2160,14 +2977,15 @@ class Location_Builder:
             SE = local_df["place"][
                 local_df["gradient"] == max(local_df["gradient"])].item()
             label = NW + " to " + SE
-            location = ["bbox", str(y), str(x), label]
+            mask_id = masks.bboxId(ymin, ymax, xmin, xmax)
+            location = ["bbox", mask_id, label]
 
 
         # 5: A reset button was clicked
         elif "reset_map" in trig_id:
-            location = ["all", "y", "x", "Contiguous United States"]
+            location = ["all", "all", "Contiguous United States"]
 
         else:
-            location = ["all", "y", "x", "Contiguous United States"]
+            location = ["all", "all", "Contiguous United States"]
 
         return location
@@ -1,13 +1,9 @@
 """Drip main page options."""
-import datetime as dt
-import dateutil.parser
 import pandas as pd
-import xarray as xr
-
-from netCDF4 import Dataset
 
 from drip.app.options.colors import COLORS
 from drip.app.options.indices import INDEX_NAMES, INDEX_OPTIONS
+from drip.downloaders.catalog import catalog_entry
 from drip.loggers import init_logger, set_handler
 from drip.paths import Paths
 
@@ -38,8 +34,7 @@ DEFAULT_SIGNAL = [
 ]
 DEFAULT_CHOICE = "spi1"
 DEFAULT_FUNCTION = "omean"
-DEFAULT_LOCATION = ["grids", "[10, 11, 11, 11, 12, 12, 12, 12]",
-                    "[243, 242, 243, 244, 241, 242, 243, 244]",
+DEFAULT_LOCATION = ["grids", "grids:10.243-243,11.242-244,12.241-244",
                     "Aroostook County, ME to Aroostook County, ME", 2]
 
 
@@ -97,27 +92,30 @@ class Options(Paths):
             options.append({"label": row["place"], "value": row["fips"]})
         return options
 
+    @property
+    def catalog(self):
+        """Return the index catalog entry for the index file."""
+        return catalog_entry(self.index_path.stem)
+
     @property
     def dates(self):
         """Return minimum and maxmium dates in sample dataset."""
-        base = dateutil.parser.parse("19000101")
-        with Dataset(self.index_path) as data:
-            min_date = base + dt.timedelta(days=data["time"][:].min())
-            max_date = base + dt.timedelta(days=data["time"][:].max())
+        entry = self.catalog
         dates = {}
-        dates["max_year"] = pd.Timestamp(max_date).year
-        dates["min_year"] = pd.Timestamp(min_date).year + 1  # for 12 month indices
-        dates["max_month"] = pd.Timestamp(max_date).month
+        dates["max_year"] = entry["max_year"]
+        dates["min_year"] = entry["min_year"] + 1  # for 12 month indices
+        dates["max_month"] = entry["max_month"]
         dates["years"] = list(range(dates["min_year"], dates["max_year"] + 1))
         return dates
 
     @property
     def date_marks(self):
         """Return slider tick marks for year sliders."""
-        min_year = self.dates["min_year"]
-        max_year = self.dates["max_year"]
+        dates = self.dates
+        min_year = dates["min_year"]
+        max_year = dates["max_year"]
         years = {}
-        for i, y in enumerate(self.dates["years"]):
+        for i, y in enumerate(dates["years"]):
             ymark = str(y)
             if y % 5 != 0 and y != min_year and y != max_year:  
                 ymark = ""
@@ -152,13 +150,15 @@ class Options(Paths):
             {"label": "Maximum", "value": "omax"},
             {"label": "Minimum", "value": "omin"},
             {"label": "Drought Severity Area", "value":"oarea"},
-            {"label": "Correlation", "value": "ocorr"}
+            {"label": "Correlation", "value": "ocorr"},
+            {"label": "Cross-Index Correlation", "value": "oxcorr"}
         ]
         percentile = [
             {"label": "Mean", "value": "pmean"},
             {"label": "Maximum", "value": "pmax"},
             {"label": "Minimum", "value": "pmin"},
-            {"label": "Correlation", "value": "pcorr"}
+            {"label": "Correlation", "value": "pcorr"},
+            {"label": "Cross-Index Correlation", "value": "pxcorr"}
         ]
         functions = {"main": main, "percentile": percentile}
         return functions
@@ -176,7 +176,9 @@ class Options(Paths):
             "omin": "Minimum Values",
             "oarea": "Average Values",
             "pcorr": "Pearson's Correlation ",
-            "ocorr": "Pearson's Correlation "
+            "ocorr": "Pearson's Correlation ",
+            "pxcorr": "Cross-Index Pearson's Correlation ",
+            "oxcorr": "Cross-Index Pearson's Correlation "
         }
         return names
 
@@ -239,6 +241,4 @@ class Options(Paths):
     @property
     def transform(cls):
         """Return geotransform of sample dataset."""
-        with xr.open_dataset(cls.sample_path) as data:
-            transform = data.crs.GeoTransform
-        return transform
+        return catalog_entry(cls.sample_path.stem)["transform"]
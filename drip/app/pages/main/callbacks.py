@@ -2,13 +2,15 @@
 import copy
 import gc
 import json
-import os
 import psutil
+import threading
+import urllib.parse
 
 from pathlib import Path
 
 import dash
 import datetime as dt
+import flask
 import numpy as np
 import pandas as pd
 import xarray as xr
@@ -18,13 +20,15 @@ from dash import dash_table, dcc, html, Input, Output, State
 from dash.exceptions import PreventUpdate
 
 from drip import calls, Paths
-from drip.app.app import app, cache
+from drip.app.app import app
 from drip.app.layouts.mapbox import DEFAULT_MAP_EXTENT, MAPBOX_LAYOUT
 from drip.app.old.functions import (
     Admin_Elements,
     Index_Maps,
+    colorScale,
     Location_Builder,
     FUNCTION_TYPES,
+    RESULT_CACHE,
     TYPE_PATHS,
     UNIT_MAP
 )
@@ -32,7 +36,19 @@ from drip.app.options.options import Options
 from drip.app.options.indices import INDEX_NAMES
 from drip.app.options.options import Options
 from drip.app.options.styles import ON_COLOR, OFF_COLOR, STYLES
+from drip.app.pages.main.export import (
+    NONINDICES,
+    Export_Task,
+    SERIES_FORMATS,
+    clipMap,
+    iterCSVs,
+    iterIndexTables,
+    seriesColumns,
+    writeMap,
+    writeTables
+)
 from drip.app.pages.main.model import Parse_Shape
+from drip.downloaders.area import CONUS
 from drip.loggers import init_logger, set_handler
 
 logger = init_logger(__name__)
@@ -43,37 +59,44 @@ set_handler(logger, Paths.log_directory.joinpath("callbacks.log"))
 resolution = Options.transform[0]
 admin = Admin_Elements(resolution)
 [state_array, county_array, grid, mask,
- source, albers_source, crdict, admin_df] = admin.getElements()  # <----------- remove albers ource here (carefully)
+ source, crdict, admin_df] = admin.getElements()
+
+# Static map information for every mappable cell of the index grid
+with xr.open_dataset(Options.sample_path) as sample:
+    PIXEL_TABLE = admin.getPixelTable(sample["latitude"].values,
+                                      sample["longitude"].values, grid,
+                                      crdict, admin_df)
+PIXEL_ROWS = PIXEL_TABLE["row"].values
+PIXEL_COLS = PIXEL_TABLE["col"].values
+PIXEL_LONS = PIXEL_TABLE["lonbin"].values
+PIXEL_LATS = PIXEL_TABLE["latbin"].values
+PIXEL_HOVER = PIXEL_TABLE["hover"].values
+
+# Recent data objects by request key
+DATA_CACHE = OrderedDict()
+DATA_LOCK = threading.Lock()
+DATA_SIZE = 8
 
 
 FUNCTION_OPTIONS_PERC = [
     {"label": "Mean", "value": "pmean"},
     {"label": "Maximum", "value": "pmax"},
     {"label": "Minimum", "value": "pmin"},
-    {"label": "Correlation", "value": "pcorr"}
+    {"label": "Correlation", "value": "pcorr"},
+    {"label": "Cross-Index Correlation", "value": "pxcorr"}
 ]
 FUNCTION_OPTIONS_ORIG = [
     {"label": "Mean", "value": "omean"},
     {"label": "Maximum", "value": "omax"},
     {"label": "Minimum", "value": "omin"},
     {"label": "Drought Severity Area", "value":"oarea"},
-    {"label": "Correlation", "value": "ocorr"}
+    {"label": "Correlation", "value": "ocorr"},
+    {"label": "Cross-Index Correlation", "value": "oxcorr"}
 ]
-FUNCTION_NAMES = {
-    "pmean": "Average Percentiles",
-    "pmax": "Maxmium Percentiles",
-    "pmin": "Minimum Percentiles",
-    "omean": "Average Values",
-    "omax": "Maximum Values",
-    "omin": "Minimum Values",
-    "oarea": "Average Values",
-    "pcorr": "Pearson's Correlation ",
-    "ocorr": "Pearson's Correlation "
-}
 
 
-def makeCSV(arg):
-    """Make a single summary CSV of the time series plot."""
+def makeColumns(arg):
+    """Make the table columns of the time series plot."""
     # Unpack arguments, retrieve data, and format dates
     index, signal, function, location, crdict = arg
     data = retrieveData(signal, function, index, location)
@@ -81,75 +104,88 @@ def makeCSV(arg):
     dates = [pd.to_datetime(str(d)).strftime("%Y-%m") for d in dates]
 
     # If the function is oarea, we plot five overlapping timeseries
-    label = location[3]
-    nonindices = ["tdmean", "tmean", "tmin", "tmax", "ppt",  "vpdmax",
-                  "vpdmin", "vpdmean"]
-    if function != "oarea" or index in nonindices:
-        # Get the time series from the data object
-        try:
-            timeseries = data.getSeries(location, crdict)
-        except Exception as e:
-            print(e)
-            
-        # Create data frame as string for download option
-        columns = OrderedDict(
-            {
-                "month": dates,
-                "value": list(timeseries),
-                "function": FUNCTION_NAMES[function],  # <-- This doesn"t always make sense
-                "location": location[-2],
-                "index": INDEX_NAMES[index]
-            }
-        )
-        df = pd.DataFrame(columns)
-
+    label = location[2]
+    if function != "oarea" or index in NONINDICES:
+        timeseries = cachedSeries(signal, function, index, location, data)
+        columns = seriesColumns(dates, index, function, label,
+                                timeseries=timeseries)
     else:
-        label = location[3]
-        ts_series, ts_series_ninc, dsci = data.getArea(crdict)
-
-        # Save to file for download option
-        columns = OrderedDict(
-            {
-                "month": dates,
-                "d0": ts_series_ninc[0],
-                "d1": ts_series_ninc[1],
-                "d2": ts_series_ninc[2],
-                "d3": ts_series_ninc[3],
-                "d4": ts_series_ninc[4],
-                "dsci": dsci,
-                "function": "Percent Area",
-                "location":  label,
-                "index": INDEX_NAMES[index]
-            }
-        )
-        df = pd.DataFrame(columns)
+        area = cachedArea(signal, function, index, location, data)
+        columns = seriesColumns(dates, index, function, label, area=area)
+
+    return columns
+
 
-    return df
+def makeCSV(arg):
+    """Make a single summary CSV of the time series plot."""
+    return pd.DataFrame(makeColumns(arg))
 
-def makeCSVs(signal, function, location):
-    """Take a path with query information and save a csv."""
-    # Get data
-    dfs = []
-    args = []
+
+def exportTasks(signal, function, location):
+    """Build an export task for every available index."""
+    indices = []
     data_dir = Paths.paths["indices"]
     for i in INDEX_NAMES:
         ftype = FUNCTION_TYPES[function]
         fpath = data_dir.joinpath(i, f"{i}{TYPE_PATHS[ftype]}.nc")
         if fpath.exists():
-            args.append((i, signal, function, location, crdict))
+            indices.append(i)
+
+    # There is nothing to export without any index files
+    if not indices:
+        raise PreventUpdate
 
-    # crdict isn't working in multiprocess
-    # with mp.Pool(mp.cpu_count() - 1) as pool:
-    #     for df in pool.imap(makeCSV, args):
-    #         dfs.append(df)
+    # The mask only depends on the location
+    mask = retrieveData(signal, function, indices[0], location).mask
+    regions = regionCodes(location)
+    tasks = [Export_Task(i, function, signal[0], location, mask, regions)
+             for i in indices]
 
-    for arg in args:
-        df = makeCSV(arg)
-        if df is not None:
-            dfs.append(df)
-    df = pd.concat(dfs)
+    return tasks
+
+
+@app.server.route("/download/timeseries")
+def downloadAll():
+    """
+    Stream the time series of every available index as CSV, Parquet, or
+    Arrow. They are extracted in the export process pool and each index's
+    rows are sent as it finishes, so the response starts before the last
+    index is done and is never held in memory whole.
+
+    The query holds the JSON "signal" and "location", the "function", the
+    "fmt", and the panel "key", as set by setDownloadAll.
+    """
+    args = flask.request.args
+    try:
+        signal = json.loads(args["signal"])
+        location = json.loads(args["location"])
+        function = args["function"]
+        key = int(args.get("key", 1))
+    except (KeyError, ValueError):
+        flask.abort(400)
+    fmt = args.get("fmt", "csv")
+    if fmt not in SERIES_FORMATS:
+        flask.abort(400)
+
+    try:
+        tasks = exportTasks(signal, function, location)
+    except PreventUpdate:
+        flask.abort(404)
+
+    if fmt == "csv":
+        chunks = iterCSVs(tasks)
+        mimetype = "text/csv"
+    else:
+        chunks = iterIndexTables(tasks, fmt)
+        mimetype = "application/octet-stream"
+
+    dst = f"drip_timeseries_all_{key}.{fmt}"
+    return flask.Response(
+        flask.stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={dst}"}
+    )
 
-    return df
 
 @app.callback(
     Output("month_start_print_1", "children"),
@@ -196,36 +232,150 @@ def optionsFunctions(function_type):
         return Options.functions["main"], "omean"
 
 
-@cache.memoize()
+def maskId(location):
+    """
+    Return the mask id of a location. Locations that select the same cells
+    share an id regardless of their label or which element triggered them.
+    """
+    return location[1]
+
+
+def requestKey(signal, function, choice, location):
+    """
+    Return the data key of a request: the index, choice type, years, months,
+    month filter, and location mask id. Presentation options in the signal
+    (color scale and reverse) are left out so they never cause a recompute.
+    """
+    [year1, year2], [month1, month2], month_filter = signal[0]
+    key = [
+        choice,
+        FUNCTION_TYPES[function],
+        [int(year1), int(year2)],
+        [int(month1), int(month2)],
+        sorted({int(month) for month in month_filter}),
+        maskId(location)
+    ]
+    return json.dumps(key)
+
+
 @calls.log
 def retrieveData(signal, function, choice, location):
     """
     This takes the user defined signal and uses the Index_Map class to filter"
-    by the selected dates and return the singular map, the 3d timeseries array,
-    and the colorscale.
+    by the selected dates and masks to the selected location. Recent data
+    objects are kept by request key, so only data options affect reuse. The
+    color scale is applied by the caller with colorScale.
 
     sample arguments:
         signal = [[[2000, 2017], [1, 12], [ 4, 5, 6, 7]], "Viridis", "no"]
         choice = "pdsi"
         function = "omean"
-        location = ["all", "y", "x", "Contiguous United States", 0]
+        location = ["all", "all", "Contiguous United States", 0]
     """
-    # Retrieve signal elements
-    time_data = signal[0]
-    colorscale = signal[1]
-
-    # Determine the choice_type based on function
-    choice_type = FUNCTION_TYPES[function]
+    key = requestKey(signal, function, choice, location)
+    with DATA_LOCK:
+        if key in DATA_CACHE:
+            DATA_CACHE.move_to_end(key)
+            return DATA_CACHE[key]
 
     # Retrieve data package
-    data = Index_Maps(choice, choice_type, time_data, colorscale)
+    choice_type = FUNCTION_TYPES[function]
+    data = Index_Maps(choice, choice_type, signal[0])
 
     # Set mask (also sets coordinate dictionary)
     data.setMask(location, crdict)
 
+    with DATA_LOCK:
+        DATA_CACHE[key] = data
+        while len(DATA_CACHE) > DATA_SIZE:
+            DATA_CACHE.popitem(last=False)
+
     return data
 
 
+def resultKey(product, signal, function, choice, location, detail=None):
+    """
+    Return the result cache key for a computed product, the request key
+    plus any detail that changes the product (e.g. the function for map
+    fields).
+    """
+    key = [product, detail, requestKey(signal, function, choice, location)]
+    return json.dumps(key)
+
+
+def regionCodes(location):
+    """
+    Return the region area table codes that make up a location, or None if
+    it is not made of whole regions (grids, bounding boxes, and shapes).
+    """
+    flag, mask_id = location[:2]
+    if flag == "all":
+        return [CONUS]
+    if flag in ["state", "county"]:
+        codes = mask_id.partition(":")[2].split(",")
+        return [int(code) for code in codes]
+    return None
+
+
+def cachedFunction(signal, function, choice, location, data=None):
+    """Return the map field of a function, computing it on a cache miss."""
+    def compute():
+        source = data
+        if source is None:
+            source = retrieveData(signal, function, choice, location)
+        return source.getFunction(function)
+    key = resultKey("function", signal, function, choice, location,
+                    function)
+    return RESULT_CACHE.fetch(key, compute)
+
+
+def cachedCorr(signal, function, choice, location, data=None,
+               reference=None):
+    """
+    Return the correlation field, computing it on a cache miss. If a
+    reference index is given, the field correlates this index with the
+    reference index's series at the location.
+    """
+    def compute():
+        source = data
+        if source is None:
+            source = retrieveData(signal, function, choice, location)
+        other = None
+        if reference is not None:
+            other = retrieveData(signal, function, reference, location)
+        return source.getCorr(location, crdict, other)
+    key = resultKey("corr", signal, function, choice, location, reference)
+    return RESULT_CACHE.fetch(key, compute)
+
+
+def cachedSeries(signal, function, choice, location, data=None):
+    """Return the location time series, computing it on a cache miss."""
+    def compute():
+        source = data
+        if source is None:
+            source = retrieveData(signal, function, choice, location)
+        return source.getSeries(location, crdict)
+    key = resultKey("series", signal, function, choice, location)
+    return RESULT_CACHE.fetch(key, compute)
+
+
+def cachedArea(signal, function, choice, location, data=None):
+    """
+    Return the inclusive and non-inclusive drought category series and the
+    DSCI as lists, computing them on a cache miss.
+    """
+    def compute():
+        source = data
+        if source is None:
+            source = retrieveData(signal, function, choice, location)
+        regions = regionCodes(location)
+        pincs, pnincs, dsci = source.getArea(crdict, regions)
+        return np.vstack([pincs, pnincs, [dsci]])
+    key = resultKey("area", signal, function, choice, location)
+    area = RESULT_CACHE.fetch(key, compute)
+    return area[:5].tolist(), area[5:10].tolist(), area[10].tolist()
+
+
 # Output list of all index choices for syncing
 @app.callback(
     Output("choice_store", "children"),
@@ -463,13 +613,8 @@ for i in range(1, 3):
     )
     def adjust_end_month(index, year):
         """Adjust end month if only the last year in dataset is selected."""
-        # Find the files of the last year
-        file = Paths.paths["indices"].joinpath(f"{index}/{index}.nc")
-        with xr.open_dataset(file) as ds:
-            time = ds["time"].data[-1]
-
-        # Convert to datetime
-        month = pd.to_datetime(time).month
+        # Find the last month on record
+        month = Options(index).dates["max_month"]
 
         return month
 
@@ -487,15 +632,10 @@ for i in range(1, 3):
         """This fills or empties the month filter boxes with/of checks"""
         # Adjust options if only one year
         options = Options(index)
-        if years[0] == years[-1]:
+        dates = options.dates
+        if years[0] == years[-1] and years[0] == dates["max_year"]:
             # If this is the last year on file, adjust the ending month
-            file = Paths.paths["indices"].joinpath(f"{index}/{index}.nc")
-            with xr.open_dataset(file) as ds:
-                time = ds["time"].data[:]
-            time = [pd.to_datetime(date) for date in time]
-            time = [date for date in time if date.year == years[0]]
-            time = time[-1]
-            last_month = time.month + 1
+            last_month = dates["max_month"] + 1
         else:
             last_month = 13
         month_options = list(range(1, last_month))
@@ -539,13 +679,9 @@ for i in range(1, 3):
 
         if n_clicks % 2 != 0:
             label = "Historical"
-            file = Paths.paths["indices"].joinpath(f"{index}/{index}.nc")
-            with xr.open_dataset(file) as ds:
-                time = ds["time"].data[:]
-            time = [pd.to_datetime(date) for date in time]
-            time = time[-1]
-            month1 = month2 = time.month
-            year = [time.year, time.year]
+            dates = Options(index).dates
+            month1 = month2 = dates["max_month"]
+            year = [dates["max_year"], dates["max_year"]]
         else:
             label = "Latest"
             date_store = json.loads(date_store)
@@ -582,8 +718,9 @@ for i in range(1, 3):
         else:
             options = Options(choice)
 
-        max_year = options.dates["max_year"]
-        min_year = options.dates["min_year"]
+        dates = options.dates
+        max_year = dates["max_year"]
+        min_year = dates["min_year"]
         marks = options.date_marks["years"]
 
         return min_year, max_year, marks
@@ -723,7 +860,7 @@ for i in range(1, 3):
                     tv = trigger_value["points"][int(plen/2):]
                     trigger_value["points"] = tv
                 else:
-                    location =  ["all", "y", "x", "Contiguous United States"]
+                    location =  ["all", "all", "Contiguous United States"]
 
             # Two cases, if syncing return a copy, if not split
             if "On" in sync:
@@ -754,8 +891,8 @@ for i in range(1, 3):
                 location = selector.chooseRecent()
 
                 # What is this about? Must be some error condition
-                if "shape" in location[0] and location[3] is None:
-                    location =  ["all", "y", "x", "Contiguous United States"]
+                if "shape" in location[0] and location[2] is None:
+                    location =  ["all", "all", "Contiguous United States"]
 
                 # Add the triggering element key to prevent updates later
                 try:
@@ -794,8 +931,8 @@ for i in range(1, 3):
                 location = selector.chooseRecent()
 
                 # What is this about?
-                if "shape" in location[0] and location[3] is None:
-                    location =  ["all", "y", "x", "Contiguous United States"]
+                if "shape" in location[0] and location[2] is None:
+                    location =  ["all", "all", "Contiguous United States"]
 
                 # Add the triggering element key to prevent updates later
                 try:
@@ -805,23 +942,6 @@ for i in range(1, 3):
 
             return json.dumps(location)
 
-    @app.callback(
-        Output(f"download_chart_{i}", "data"),
-        Input(f"download_path_store_{i}", "children"),
-        prevent_initial_call=True,
-    )
-    @calls.log
-    def download(download_info):
-        """Download csv file."""
-        info = json.loads(download_info)
-        if info is None:
-            raise PreventUpdate
-        src = info["tmp_path"]
-        dst = info["dst"]
-        df = pd.read_csv(src)
-        os.remove(src)
-        return dcc.send_data_frame(df.to_csv, dst, index=False)
-
     @app.callback(
         Output("county_div_{}".format(i), "style"),
         Output("state_div_{}".format(i), "style"),
@@ -864,9 +984,9 @@ for i in range(1, 3):
         """Parse a shapefile object."""
         if not contents:
             raise PreventUpdate
-        parser = Parse_Shape(fpaths, contents)
-        basename = parser.main()
-        return basename
+        parser = Parse_Shape(fpaths, contents, crdict.masks)
+        shape = parser.main()
+        return shape
 
     @app.callback(
         Output("coverage_div_{}".format(i), "children"),
@@ -1002,14 +1122,10 @@ for i in range(1, 3):
         return style, children
 
     @app.callback(
-        Output(f"map_{i}", "figure"),
+        Output(f"map_data_{i}", "data"),
         Input("choice_1", "value"),
         Input("choice_2", "value"),
-        Input("map_type", "value"),
         Input("signal", "children"),
-        Input(f"point_size_{i}", "value"),
-        Input(f"color_min_{i}", "value"),
-        Input(f"color_max_{i}", "value"),
         Input(f"location_store_{i}", "children"),
         State("function_choice", "value"),
         State(f"key_{i}", "children"),
@@ -1020,10 +1136,14 @@ for i in range(1, 3):
         State(f"map_{i}", "relayoutData")
     )
     @calls.log
-    def makeMap(choice1, choice2, map_type, signal, point_size, color_min,
-                color_max, location, function, key, sync, date_sync,
-                date_print_1, date_print_2, map_extent):
-        """Build plotly scatter mapbox figure."""
+    def makeMap(choice1, choice2, signal, location, function, key, sync,
+                date_sync, date_print_1, date_print_2, map_extent):
+        """Build plotly scatter mapbox figure without cosmetic settings.
+
+        The point size, color limits, and basemap are applied in the browser
+        by styleMap, so changing them does not read any data. The value
+        range needed to set the color limits is kept in the layout's meta.
+        """
         # Catch Trigger
         trigger = dash.callback_context.triggered[0]["prop_id"]
 
@@ -1082,118 +1202,91 @@ for i in range(1, 3):
             reverse = not reverse
 
         # Pull array into memory
-        array = data.getFunction(function).compute()
+        array = cachedFunction(signal, function, choice, location, data)
 
-        # Individual array min/max
-        amin = np.nanmin(array)
-        amax = np.nanmax(array)
-        if color_min and not color_max:
-            amin = color_min        
-        if color_max and not color_min:
-            amax = color_max
-        if color_max and color_min:
-            amax = color_max
-            amin = color_min
+        # Individual array min/max, user color limits are set in styleMap
+        meta = {"amin": float(np.nanmin(array)),
+                "amax": float(np.nanmax(array)), "scale": "individual",
+                "corr": False}
 
         # Now, we want to use the same value range for colors for both maps
         nonindices = ["tdmean", "tmean", "tmin", "tmax", "ppt",  "vpdmax",
                       "vpdmin", "vpdmean"]
         if function == "pmean":
             # Get the data for the other panel for its value range
-            data2 = retrieveData(signal, function, choice2, location)
-            array2 = data2.getFunction(function).compute()
-            amax2 = np.nanmax(array2)
-            amin2 = np.nanmin(array2)
-            amax = np.nanmax([amax, amax2])
-            amin = np.nanmin([amin, amin2])
+            array2 = cachedFunction(signal, function, choice2, location)
+            meta["amax2"] = float(np.nanmax(array2))
+            meta["amin2"] = float(np.nanmin(array2))
+            meta["scale"] = "shared"
             del array2
         elif "min" in function or "max" in function:
-            amax = amax
-            amin = amin
+            pass
         elif choice in nonindices:
-            amax = amax
-            amin = amin
+            pass
         else:
-            limit = np.nanmax([abs(amin), abs(amax)])
-            amax = limit
-            amin = limit * -1
+            meta["scale"] = "symmetric"
 
         # Filter for state filters
-        flag, y, x, label, idx = location
+        flag = location[0]
         if flag in ["state", "county", "shape"]:
             array = array * data.mask
 
+        # Cross-index correlations name both indices
+        index_name = Options.index_names[choice]
+        if "xcorr" in function:
+            index_name += " vs. " + Options.index_names[choice2]
+
         # If it is a correlation recreate the map array
         if "corr" in function and flag != "all":
-            y = np.array(json.loads(y))
-            x = np.array(json.loads(x))
+            y, x = crdict.masks.indices(location[1])
             gridid = grid[y, x]
-            if not color_min:
-                amin = -1
-            if not color_max:    
-                amax = 1
+            if len(gridid) == 1:
+                gridid = gridid[0]
+            meta["corr"] = True
             if isinstance(gridid, np.ndarray):
                 grids = [np.nanmin(gridid), np.nanmax(gridid)]
-                title = (Options.index_names[choice] + "<br>" +
+                title = (index_name + "<br>" +
                          Options.function_names[function] + "With Grids " +
                          str(int(grids[0]))  + " to " + str(int(grids[1])) +
                          "  ("  + date_print + ")")
                 title_size = 15
             else:
-                title = (Options.index_names[choice] + "<br>" +
+                title = (index_name + "<br>" +
                          Options.function_names[function] + "With Grid " +
                          str(int(gridid))  + "  ("  + date_print + ")")
 
             # This is the only map interaction that alters the map
-            array = data.getCorr(location, crdict)  # <------------------------ Expected memory spike
+            reference = choice2 if "xcorr" in function else None
+            array = cachedCorr(signal, function, choice, location, data,
+                               reference)
             title_size = 20
         else:
-            title = (Options.index_names[choice] + "<br>" + Options.function_names[function] +
+            title = (index_name + "<br>" + Options.function_names[function] +
                      ": " + date_print)
             title_size = 20
 
-        # Create a data frame of coordinates, index values, labels, etc
-        dfs = xr.DataArray(array, name="value")
-        pdf = dfs.to_dataframe()
-        step = crdict.res
-        to_bin = lambda x: np.floor(x / step) * step
-        pdf["latbin"] = pdf.index.get_level_values("latitude").map(to_bin)
-        pdf["lonbin"] = pdf.index.get_level_values("longitude").map(to_bin)
-        pdf["gridx"] = pdf["lonbin"].map(crdict.londict)
-        pdf["gridy"] = pdf["latbin"].map(crdict.latdict)
-
-        # For hover information
-        grid2 = np.copy(grid)
-        grid2[np.isnan(grid2)] = 0
-        pdf["grid"] = grid2[pdf["gridy"], pdf["gridx"]]
-        pdf = pd.merge(pdf, admin_df, how="inner")
-        pdf["data"] = pdf["value"].astype(float)
-        pdf["printdata"] = (
-            pdf["place"] + "<br>  lat/lon: "
-            + pdf["latbin"].apply(str) + ", "
-            + pdf["lonbin"].astype(str) + "<br>     <b>"
-            + pdf["data"].round(3).apply(str) + "</b>"
-        )
-        df_flat = pdf.drop_duplicates(subset=["latbin", "lonbin"])
-        df = df_flat[np.isfinite(df_flat["data"])]
+        # Gather values for each mappable cell and label them
+        values = np.asarray(array, dtype=float)[PIXEL_ROWS, PIXEL_COLS]
+        finite = np.isfinite(values)
+        values = values[finite]
+        printdata = (PIXEL_HOVER[finite]
+                     + np.round(values, 3).astype(str).astype(object)
+                     + "</b>")
 
         # Create the scattermapbox object
-        colorscale = data.color_scale
+        colorscale = colorScale(data.choice_type, colorscale)
         d1 = dict(
             type="scattermapbox",
-            lon=df["lonbin"],
-            lat=df["latbin"],
-            text=df["printdata"],
+            lon=PIXEL_LONS[finite],
+            lat=PIXEL_LATS[finite],
+            text=printdata,
             hoverinfo="text",
             hovermode="closest",
             showlegend=False,
             marker=dict(
-                color=df["data"],
+                color=values,
                 colorscale=colorscale,
                 reversescale=reverse,
-                cmax=amax,
-                cmin=amin,
-                size=point_size,
                 colorbar=dict(
                     y=-.15,
                     textposition="bottom",
@@ -1225,9 +1318,9 @@ for i in range(1, 3):
 
         # Add shape if a single site is selected
         if location[0] == "grid":
-            site = location[3]
+            site = location[2]
             gridid = float(site[site.index("(Grid") + 6: site.index(")")])
-            row = df[df["grid"] == gridid]
+            row = PIXEL_TABLE[finite & (PIXEL_TABLE["grid"] == gridid)]
             # d3 = dict(
             #     type="scattermapbox",
             #     lon=row["lonbin"],
@@ -1248,15 +1341,13 @@ for i in range(1, 3):
                 hovermode="closest",
                 showlegend=False,
                 marker=dict(
-                    color="black",
-                    size=point_size * 2
+                    color="black"
                 )
             )
             data_list += [d4]
 
         # Set up layout
         layout_copy = copy.deepcopy(MAPBOX_LAYOUT)
-        layout_copy["mapbox"]["style"] = map_type
         layout_copy["mapbox"]["center"] = map_extent["mapbox.center"]
         layout_copy["mapbox"]["zoom"] = map_extent["mapbox.zoom"]
         layout_copy["mapbox"]["bearing"] = map_extent["mapbox.bearing"]
@@ -1269,6 +1360,8 @@ for i in range(1, 3):
             fontweight="bold"
         )
         layout_copy["title"] = title
+        layout_copy["meta"] = meta
+        layout_copy["uirevision"] = f"map_{key}"
         figure = dict(data=data_list, layout=layout_copy)
 
         # Clear memory space
@@ -1282,11 +1375,169 @@ for i in range(1, 3):
 
         return figure
 
+    app.clientside_callback(
+        """
+        function styleMap(figure, map_type, point_size, color_min,
+                          color_max) {
+            // Apply cosmetic settings to the figure from makeMap
+            if (!figure) {
+                return window.dash_clientside.no_update;
+            }
+            var meta = figure.layout.meta;
+            var amin = meta.amin;
+            var amax = meta.amax;
+            if (color_min && !color_max) {
+                amin = color_min;
+            }
+            if (color_max && !color_min) {
+                amax = color_max;
+            }
+            if (color_max && color_min) {
+                amax = color_max;
+                amin = color_min;
+            }
+            if (meta.scale === "shared") {
+                amax = Math.max(amax, meta.amax2);
+                amin = Math.min(amin, meta.amin2);
+            } else if (meta.scale === "symmetric") {
+                var limit = Math.max(Math.abs(amin), Math.abs(amax));
+                amax = limit;
+                amin = limit * -1;
+            }
+            if (meta.corr) {
+                if (!color_min) {
+                    amin = -1;
+                }
+                if (!color_max) {
+                    amax = 1;
+                }
+            }
+
+            // Copy only what changes, the data arrays are shared
+            var data = figure.data.map(function(trace, index) {
+                var marker = Object.assign({}, trace.marker);
+                if (index === 0) {
+                    marker.cmin = amin;
+                    marker.cmax = amax;
+                    marker.size = point_size;
+                } else {
+                    marker.size = point_size * 2;
+                }
+                return Object.assign({}, trace, {marker: marker});
+            });
+            var mapbox = Object.assign({}, figure.layout.mapbox,
+                                       {style: map_type});
+            var layout = Object.assign({}, figure.layout, {mapbox: mapbox});
+
+            return {data: data, layout: layout};
+        }
+        """,
+        Output(f"map_{i}", "figure"),
+        Input(f"map_data_{i}", "data"),
+        Input("map_type", "value"),
+        Input(f"point_size_{i}", "value"),
+        Input(f"color_min_{i}", "value"),
+        Input(f"color_max_{i}", "value")
+    )
+
+    @app.callback(
+        Output(f"download_map_{i}", "data"),
+        Input(f"download_map_link_{i}", "n_clicks"),
+        State("choice_1", "value"),
+        State("choice_2", "value"),
+        State("signal", "children"),
+        State(f"location_store_{i}", "children"),
+        State("function_choice", "value"),
+        State(f"key_{i}", "children"),
+        State("date_sync", "children"),
+        State(f"map_format_{i}", "value"),
+        prevent_initial_call=True
+    )
+    @calls.log
+    def downloadMap(click, choice1, choice2, signal, location, function, key,
+                    date_sync, fmt):
+        """Send the map array clipped to the selected location."""
+        location = json.loads(location)
+        signal = json.loads(signal)
+        key = int(key)
+        fmt = fmt or "nc"
+
+        # If we are syncing times, use the key to find the right signal
+        if "On" in date_sync:
+            signal = signal[0]
+        else:
+            signal = signal[key - 1]
+
+        # Figure which choice is this panel"s and which is the other
+        choices = [choice1, choice2]
+        choice = choices[key - 1]
+        choice2 = choices[2 - key]
+
+        # Correlation maps cover the whole grid, others only the location
+        data = retrieveData(signal, function, choice, location)
+        if "corr" in function and location[0] != "all":
+            reference = choice2 if "xcorr" in function else None
+            array = cachedCorr(signal, function, choice, location, data,
+                               reference)
+            mask = np.isfinite(array).astype("uint8")
+        else:
+            array = cachedFunction(signal, function, choice, location, data)
+            mask = np.asarray(data.mask)
+
+        # A shape or box outside of the grid leaves nothing to send
+        clipped = clipMap(array, mask, crdict.lats, crdict.lons)
+        if clipped is None:
+            raise PreventUpdate
+        values, lats, lons = clipped
+
+        [[year1, year2], [month1, month2], month_filter] = signal[0]
+        attrs = {
+            "index": INDEX_NAMES[choice],
+            "function": Options.function_names[function],
+            "location": location[2],
+            "dates": f"{year1}-{month1:02d} to {year2}-{month2:02d}",
+            "months": ", ".join(str(m) for m in month_filter)
+        }
+        if "xcorr" in function:
+            attrs["reference"] = INDEX_NAMES[choice2]
+
+        dst = f"drip_map_{choice}_{function}_{key}.{fmt}"
+        return dcc.send_bytes(
+            lambda file: writeMap(file, values, lats, lons, crdict.res, fmt,
+                                  attrs),
+            dst
+        )
+
+    @app.callback(
+        Output(f"download_all_link_{i}", "href"),
+        Input("signal", "children"),
+        Input(f"location_store_{i}", "children"),
+        Input("function_choice", "value"),
+        Input(f"download_format_{i}", "value"),
+        Input("date_sync", "children"),
+        State(f"key_{i}", "children")
+    )
+    def setDownloadAll(signal, location, function, fmt, date_sync, key):
+        """Point the all index download link at the current selections."""
+        key = int(key)
+        signal = json.loads(signal)
+        if "On" in date_sync:
+            signal = signal[0]
+        else:
+            signal = signal[key - 1]
+
+        query = urllib.parse.urlencode({
+            "signal": json.dumps(signal),
+            "location": location,
+            "function": function,
+            "fmt": fmt or "csv",
+            "key": key
+        })
+        return app.get_relative_path(f"/download/timeseries?{query}")
 
     @app.callback(
         Output(f"series_{i}", "figure"),
-        Output(f"area_store_{i}", "children"),
-        Output(f"download_path_store_{i}", "children"),
+        Output(f"download_chart_{i}", "data"),
         Input("submit", "n_clicks"),
         Input("signal", "children"),
         Input(f"choice_{i}", "value"),
@@ -1295,25 +1546,24 @@ for i in range(1, 3):
         Input(f"dsci_button_{i}", "n_clicks"),
         Input(f"color_min_{i}", "value"),
         Input(f"color_max_{i}", "value"),
-        Input(f"download_all_link_{i}", "n_clicks"),
         Input(f"download_link_{i}", "n_clicks"),
         State(f"key_{i}", "children"),
         State("click_sync", "children"),
         State("date_sync", "children"),
         State("function_choice", "value"),
-        State(f"area_store_{i}", "children")
+        State(f"download_format_{i}", "value")
     )
     @calls.log
     def makeSeries(submit, signal, choice, choice_store, location, show_dsci,
-                   color_min, color_max, download, download_all, key, sync,
-                   date_sync, function, area_store):
+                   color_min, color_max, download, key, sync, date_sync,
+                   function, fmt):
         """
         This makes the time series graph below the map.
         Sample arguments:
             signal = [[[2000, 2017], [1, 12], [5, 6, 7, 8]], "Viridis", "no"]
             choice = "pdsi"
             function = "oarea"
-            location =  ["all", "y", "x", "Contiguous United States", 0]
+            location =  ["all", "all", "Contiguous United States", 0]
         """
         # Prevent update from location unless it is a state filter
         trigger = dash.callback_context.triggered[0]["prop_id"]
@@ -1347,22 +1597,37 @@ for i in range(1, 3):
         verity = {"no": False, "yes": True}
         reverse = verity[reverse]
 
+        # Single index downloads are built in memory for this request alone,
+        # all index downloads are streamed from the downloadAll route
+        if "download_" in trigger:
+            fmt = fmt or "csv"
+            dst = f"drip_timeseries_{key}.{fmt}"
+            arg = (choice, signal, function, location, crdict)
+            if fmt == "csv":
+                df = makeCSV(arg)
+                download = dcc.send_data_frame(df.to_csv, dst, index=False)
+            else:
+                columns = makeColumns(arg)
+                download = dcc.send_bytes(
+                    lambda file: writeTables([columns], list(columns), file,
+                                             fmt),
+                    dst
+                )
+            return dash.no_update, download
+
         # Get/cache data
         data = retrieveData(signal, function, choice, location)
         choice_reverse = data.reverse
         if choice_reverse:
             reverse = not reverse
+        colorscale = colorScale(data.choice_type, colorscale)
         dates = data.dataset_interval.time.values
         dates = [pd.to_datetime(str(d)).strftime("%Y-%m") for d in dates]
         dmin = data.data_min
         dmax = data.data_max
 
-        # Now, before we calculate the time series, there is some area business
-        area_store_key = str(signal) + "_" + choice + "_" + str(location)
-        area_store = json.loads(area_store)
-
         # Create the label for the plots, so sorry this is so complex
-        label = location[3]
+        label = location[2]
         if location[0] == "shape":
             path = Path(label)
             ext = path.suffix
@@ -1373,69 +1638,22 @@ for i in range(1, 3):
                       "vpdmin", "vpdmean"]
         if function != "oarea" or choice in nonindices:
             # Get the time series from the data object
-            timeseries = data.getSeries(location, crdict)
-
-            # Create data frame as string for download option
-            columns = OrderedDict({
-                "month": dates,
-                "value": list(timeseries),
-                "function": FUNCTION_NAMES[function],  # <-- This doesn"t always make sense
-                "location": location[-2],
-                "index": INDEX_NAMES[choice]
-            })
-            df = pd.DataFrame(columns)
+            timeseries = cachedSeries(signal, function, choice, location,
+                                      data)
             bar_type = "bar"
-            area_store = ["", ""]
             if choice in nonindices and function == "oarea":
                 label = "(Drought Severity Categories Not Available)"
         else:
             bar_type = "overlay"
-            label = location[3]
+            label = location[2]
             if location[0] == "shape":
                 path = Path(label)
                 ext = path.suffix
                 label = path.name.replace(ext, "")
 
-            # I cannot get this thing to cache! We are storing it in a Div
-            if area_store_key == area_store[0]:
-                ts_series, ts_series_ninc, dsci = area_store[1]
-            else:
-                ts_series, ts_series_ninc, dsci = data.getArea(crdict)
-
-            # This needs to be returned either way
-            series = [ts_series, ts_series_ninc, dsci]
-            area_store = [area_store_key, series, dates]
-
-            # Save to file for download option
-            columns = OrderedDict({
-                "month": dates,
-                "d0": ts_series_ninc[0],
-                "d1": ts_series_ninc[1],
-                "d2": ts_series_ninc[2],
-                "d3": ts_series_ninc[3],
-                "d4": ts_series_ninc[4],
-                "dsci": dsci,
-                "function": "Percent Area",
-                "location":  label,
-                "index": INDEX_NAMES[choice]
-            })
-            df = pd.DataFrame(columns)
-
-        # Write to file for download
-        download_info = None
-        if "download_" in trigger:
-            tmp_path = "/tmp/drip_timeseries.csv"
-            if "all_link" in trigger:
-                dst = f"drip_timeseries_all_{key}.csv"
-                df = makeCSVs(signal, function, location)
-            else:
-                dst = f"drip_timeseries_{key}.csv"
-                df = makeCSV((choice, signal, function, location, crdict))
-            download_info = {
-                "dst": dst,
-                "tmp_path": tmp_path
-            }
-            df.to_csv(tmp_path, index=False)
+            ts_series, ts_series_ninc, dsci = cachedArea(signal, function,
+                                                         choice, location,
+                                                         data)
 
         # Set up y-axis depending on selection
         if function != "oarea" or choice in nonindices:
@@ -1444,10 +1662,8 @@ for i in range(1, 3):
             elif "o" in function:
                 yaxis = dict(range=[dmin, dmax], title=UNIT_MAP[choice])
 
-                # Center the color scale
-                xmask = data.mask
-                sd = data.dataset_interval.where(xmask == 1).std()
-                sd = float(sd.compute().value) # Sheesh
+                # Center the color scale on the selection's variability
+                sd = float(np.nanstd(timeseries))
                 if "eddi" in choice:
                     sd = sd * -1
                 dmin = 3 * sd
@@ -1486,7 +1702,7 @@ for i in range(1, 3):
                     y=timeseries,
                     marker=dict(
                         color=timeseries,
-                        colorscale=data.color_scale,
+                        colorscale=colorscale,
                         reversescale=reverse,
                         autocolorscale=False,
                         cmin=dmin,
@@ -1577,4 +1793,4 @@ for i in range(1, 3):
 
         figure = dict(data=data, layout=layout_copy)
 
-        return figure, json.dumps(area_store), json.dumps(download_info)
+        return figure, dash.no_update
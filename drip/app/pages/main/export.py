@@ -0,0 +1,385 @@
+"""Export methods for main page.
+
+Time series downloads are written as CSV, or as Parquet or Arrow tables if
+pyarrow is installed, and map downloads as NetCDF or GeoTIFF files clipped
+to the selected location.
+
+Time series downloads for every index ("download all") are extracted in a
+pool of worker processes. Each index is described by an `Export_Task`,
+which holds only picklable pieces of the request (index, function, dates,
+location list, and the location's mask array), so workers never need the
+app's coordinate dictionary. `iterCSVs` and `iterIndexTables` yield each
+index's rows as it finishes, and the "/download/timeseries" route streams
+them to the client, so the first rows arrive before the last index is done
+and the file is never held in memory whole.
+"""
+import functools
+import importlib.util
+import io
+import multiprocessing as mp
+import os
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+from rasterio.io import MemoryFile
+from rasterio.transform import from_origin
+
+from drip.app.old.functions import FUNCTION_TYPES, Index_Maps
+from drip.app.options.indices import INDEX_NAMES
+from drip.app.options.options import Options
+from drip.loggers import init_logger
+
+logger = init_logger(__name__)
+
+
+EXPORT_WORKERS = min(4, os.cpu_count() or 1)  # Processes for "download all"
+AREA_COLUMNS = ["month", "d0", "d1", "d2", "d3", "d4", "dsci", "function",
+                "location", "index"]
+SERIES_COLUMNS = ["month", "value", "function", "location", "index"]
+TEXT_COLUMNS = ["month", "function", "location", "index"]
+SERIES_FORMATS = {"csv": "CSV"}
+if importlib.util.find_spec("pyarrow") is not None:
+    SERIES_FORMATS.update({"parquet": "Parquet", "arrow": "Arrow"})
+MAP_FORMATS = {"nc": "NetCDF", "tif": "GeoTIFF"}
+NONINDICES = ["tdmean", "tmean", "tmin", "tmax", "ppt",  "vpdmax", "vpdmin",
+              "vpdmean"]
+
+
+class Export_Task:
+    """A picklable description of one index's time series export."""
+
+    def __init__(self, index, function, time_data, location, mask,
+                 regions=None):
+        """Initialize Export_Task object.
+
+        Parameters
+        ----------
+        index : str
+            DrIP index key.
+        function : str
+            Function key (e.g. "omean" or "oarea").
+        time_data : list
+            [[year1, year2], [month1, month2], month_filter]
+        location : list
+            Location list from Location_Builder.
+        mask : xarray.core.dataarray.DataArray
+            The location's mask, 1 for included cells.
+        regions : list
+            Region area table codes that make up the location, if any.
+        """
+        self.index = index
+        self.function = function
+        self.time_data = time_data
+        self.location = location
+        self.mask = mask
+        self.regions = regions
+
+    def __repr__(self):
+        """Return representation string."""
+        address = hex(id(self))
+        name = str(self.__class__).replace(">", f" at {address}>")
+        return (f"{name}\n  index={self.index}\n  function={self.function}"
+                f"\n  location={self.location[2]}")
+
+    @property
+    def area(self):
+        """Return True if this exports drought area series."""
+        return self.function == "oarea" and self.index not in NONINDICES
+
+
+def exportPool():
+    """Return the process pool shared by all exports in this worker."""
+    return _exportPool(os.getpid())
+
+
+@functools.lru_cache()
+def _exportPool(pid):
+    """Build the process pool, keyed by process id for forked servers."""
+    context = mp.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=EXPORT_WORKERS,
+                               mp_context=context)
+
+
+def seriesColumns(dates, index, function, label, timeseries=None, area=None):
+    """
+    Return the columns of one index's time series table.
+
+    dates = list of "YYYY-MM" strings
+    index = DrIP index key
+    function = function key
+    label = location label
+    timeseries = series of values, for everything but drought area
+    area = inclusive, non-inclusive, and DSCI series from getArea
+    """
+    if area is None:
+        columns = OrderedDict(
+            {
+                "month": dates,
+                "value": list(timeseries),
+                "function": Options.function_names[function],
+                "location": label,
+                "index": INDEX_NAMES[index]
+            }
+        )
+    else:
+        _, ninc, dsci = area
+        columns = OrderedDict(
+            {
+                "month": dates,
+                "d0": ninc[0],
+                "d1": ninc[1],
+                "d2": ninc[2],
+                "d3": ninc[3],
+                "d4": ninc[4],
+                "dsci": dsci,
+                "function": "Percent Area",
+                "location": label,
+                "index": INDEX_NAMES[index]
+            }
+        )
+    return columns
+
+
+def taskColumns(task):
+    """Extract the time series table columns of an export task."""
+    choice_type = FUNCTION_TYPES[task.function]
+    data = Index_Maps(task.index, choice_type, task.time_data)
+    data.mask = task.mask
+    dates = pd.DatetimeIndex(data.dataset_interval.time.values)
+    dates = list(dates.strftime("%Y-%m"))
+    label = task.location[2]
+    if task.area:
+        area = data.getArea(None, task.regions)
+        return seriesColumns(dates, task.index, task.function, label,
+                             area=area)
+    timeseries = data.getSeries(task.location, None)
+    return seriesColumns(dates, task.index, task.function, label,
+                         timeseries=timeseries)
+
+
+def taskCSV(task, header):
+    """Return an export task's rows as CSV text with header's columns."""
+    df = pd.DataFrame(taskColumns(task)).reindex(columns=header)
+    return df.to_csv(index=False, header=False)
+
+
+def clipMap(array, mask, lats, lons):
+    """
+    Return a map array and its coordinates clipped to the rows and columns
+    that hold a mask, with values outside of the mask set to NaN. Returns
+    None if the mask holds no cells.
+
+    array = 2D map array
+    mask = 2D array, 1 for included cells
+    lats = latitude of each row
+    lons = longitude of each column
+    """
+    inside = np.asarray(mask) == 1
+    if not inside.any():
+        return None
+    rows = np.where(inside.any(axis=1))[0]
+    cols = np.where(inside.any(axis=0))[0]
+    r1, r2 = rows[0], rows[-1] + 1
+    c1, c2 = cols[0], cols[-1] + 1
+    values = np.where(inside, np.asarray(array, dtype="f4"), np.nan)
+    return values[r1:r2, c1:c2], np.asarray(lats)[r1:r2], \
+        np.asarray(lons)[c1:c2]
+
+
+def columnArrays(columns, header):
+    """
+    Return the columns of a time series table as arrays for every column
+    in header, repeating single values and filling missing columns.
+    """
+    import pyarrow as pa
+
+    size = len(columns["month"])
+    arrays = OrderedDict()
+    for column in header:
+        values = columns.get(column)
+        if column in TEXT_COLUMNS:
+            if values is None or isinstance(values, str):
+                values = [values] * size
+            arrays[column] = pa.array(values, pa.string())
+        else:
+            if values is None:
+                values = np.full(size, np.nan)
+            arrays[column] = pa.array(np.asarray(values, dtype="f8"))
+    return arrays
+
+
+def exportHeader(tasks):
+    """Return the columns shared by every export task's table."""
+    # Drought area and value series share one table
+    header = []
+    for task in tasks:
+        columns = AREA_COLUMNS if task.area else SERIES_COLUMNS
+        header += [column for column in columns if column not in header]
+    return header
+
+
+def iterCSVs(tasks):
+    """
+    Extract every export task in the process pool and yield the CSV header
+    and then each index's rows as it finishes, in task order.
+
+    tasks = list of Export_Task objects
+    """
+    header = exportHeader(tasks)
+    yield ",".join(header) + "\n"
+
+    extract = functools.partial(taskCSV, header=header)
+    for task, text in zip(tasks, exportPool().map(extract, tasks)):
+        logger.info("Exported %s", task.index)
+        yield text
+
+
+def iterIndexTables(tasks, fmt="parquet"):
+    """
+    Extract every export task in the process pool and yield the bytes of a
+    Parquet or Arrow file as each index's table finishes, in task order.
+
+    tasks = list of Export_Task objects
+    fmt = "parquet" or "arrow"
+    """
+    header = exportHeader(tasks)
+    tables = exportPool().map(taskColumns, tasks)
+    return iterTables(tables, header, fmt)
+
+
+def writeMap(file, values, lats, lons, resolution, fmt="nc", attrs=None):
+    """
+    Write a clipped map array to an open binary file as NetCDF or GeoTIFF.
+
+    file = writable binary file
+    values = 2D map array from clipMap
+    lats = latitude of the top of each row
+    lons = longitude of the left of each column
+    resolution = cell size in decimal degrees
+    fmt = "nc" or "tif"
+    attrs = dictionary of descriptive attributes (index, dates, etc.)
+    """
+    attrs = attrs or {}
+    values = np.asarray(values, dtype="f4")
+    if fmt == "tif":
+        transform = from_origin(lons[0], lats[0], resolution, resolution)
+        profile = {
+            "driver": "GTiff",
+            "height": values.shape[0],
+            "width": values.shape[1],
+            "count": 1,
+            "dtype": "float32",
+            "crs": "epsg:4326",
+            "transform": transform,
+            "nodata": np.nan
+        }
+        with MemoryFile() as memfile:
+            with memfile.open(**profile) as dst:
+                dst.write(values, 1)
+                dst.update_tags(**attrs)
+            file.write(memfile.read())
+        return
+
+    nco = netCDF4.Dataset("map.nc", mode="w", format="NETCDF4",
+                          memory=values.nbytes)
+    nco.createDimension("latitude", len(lats))
+    nco.createDimension("longitude", len(lons))
+    latitudes = nco.createVariable("latitude", "f4", ("latitude",))
+    longitudes = nco.createVariable("longitude", "f4", ("longitude",))
+    variable = nco.createVariable("value", "f4", ("latitude", "longitude"),
+                                  zlib=True, fill_value=np.nan)
+    crs = nco.createVariable("crs", "c")
+    crs.spatial_ref = "epsg:4326"
+    crs.GeoTransform = " ".join(
+        str(v) for v in [lons[0], resolution, 0, lats[0], 0, -resolution]
+    )
+    variable.setncattr("grid_mapping", "crs")
+    latitudes.units = "degrees_north"
+    latitudes.long_name = "Latitude of the top of each cell"
+    longitudes.units = "degrees_east"
+    longitudes.long_name = "Longitude of the left of each cell"
+    nco.setncatts(attrs)
+    latitudes[:] = lats
+    longitudes[:] = lons
+    variable[:] = values
+    file.write(bytes(nco.close()))
+
+
+class _Chunks(io.RawIOBase):
+    """A write-only stream that hands back what was written in pieces."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        """Return and forget everything written since the last call."""
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def iterTables(tables, header, fmt="parquet"):
+    """
+    Yield the bytes of a Parquet or Arrow file of time series tables, one
+    row group or record batch per table, as each table is written and
+    without building data frames.
+
+    tables = iterable of column dictionaries from seriesColumns
+    header = column names of the file
+    fmt = "parquet" or "arrow"
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Writing Parquet or Arrow files requires pyarrow.")
+
+    fields = []
+    for column in header:
+        kind = pa.string() if column in TEXT_COLUMNS else pa.float64()
+        fields.append(pa.field(column, kind))
+    schema = pa.schema(fields)
+
+    sink = _Chunks()
+    if fmt == "arrow":
+        writer = pa.ipc.new_file(sink, schema)
+    else:
+        writer = pq.ParquetWriter(sink, schema)
+    with writer:
+        for columns in tables:
+            arrays = columnArrays(columns, header)
+            writer.write_table(pa.table(arrays, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def writeTables(tables, header, file, fmt="parquet"):
+    """
+    Write time series table columns to an open binary file as Parquet or
+    Arrow, one record batch or row group per table.
+
+    tables = iterable of column dictionaries from seriesColumns
+    header = column names of the file
+    file = writable binary file
+    fmt = "parquet" or "arrow"
+    """
+    for chunk in iterTables(tables, header, fmt):
+        file.write(chunk)
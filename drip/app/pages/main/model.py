@@ -1,20 +1,31 @@
-"""Data methods for main page."""
+"""Data methods for main page.
+
+GeoPandas and Fiona are only needed to read uploaded shapefiles, so they are
+imported when a shapefile is parsed rather than when the app starts.
+
+Uploads are read and rasterized in memory, never written to a shared
+directory, and the resulting mask is registered with the coordinate
+dictionary's Mask_Registry. Each upload is keyed by a hash of its file
+contents, so the same shape uploaded again (by anyone, in any worker) is
+resolved without reading it.
+"""
 import base64
+import functools
+import hashlib
+import io
+import json
 import os
-import tempfile
+import threading
 
+from collections import OrderedDict
 from pathlib import Path
 from zipfile import ZipFile
 
-import fiona
-import geopandas as gpd
 import rasterio as rio
 
-from osgeo import osr
 from rasterio.features import rasterize
 
 from drip import Paths
-from drip.app.old.functions import Admin_Elements
 from drip.app.options.options import Options
 from drip.loggers import init_logger, set_handler
 
@@ -23,14 +34,27 @@ set_handler(logger, Paths.log_directory.joinpath("model.log"))
 
 
 RESOLUTION = Options.transform[0]
-ADMIN = Admin_Elements(RESOLUTION)
+SHAPE_EXTENSIONS = [".shp", ".gpkg", ".geojson", ".json"]
+SHAPE_LOCK = threading.Lock()
+SHAPE_MASKS = OrderedDict()  # Mask ids of recent uploads by content hash
+SHAPE_SIZE = 64
 ZIP_EXTENSIONS = ["zip", "7z"]
 
 
+@functools.lru_cache()
+def templateProfile(resolution):
+    """Return the rasterio profile of the grid raster at a resolution."""
+    res_str = str(resolution).replace(".", "_")
+    template_fpath = Paths.paths["rasters"].joinpath(f"grid_{res_str}.tif")
+    with rio.open(template_fpath) as r:
+        profile = r.profile
+    return profile
+
+
 class Parse_Shape(Paths):
     """Methods for parsing and reformatting a user-provided shapefile."""
 
-    def __init__(self, fpaths, contents):
+    def __init__(self, fpaths, contents, masks):
         """Initialize Parse_Shape object.
 
         Parameters
@@ -39,9 +63,12 @@ class Parse_Shape(Paths):
             List of strings of filenames.
         contents : list
             List of strings containing shapefile data.
+        masks : drip.app.old.functions.Mask_Registry
+            Registry to add the rasterized shape's mask to.
         """
         self.fpaths = [Path(fpath) for fpath in fpaths]
         self.contents = contents
+        self.masks = masks
 
     def __repr__(self):
         """Return representation string for Parse_Shape object."""
@@ -65,109 +92,113 @@ class Parse_Shape(Paths):
         content_elements = [c.split(",") for c in self.contents]
         return [e[0] for e in content_elements]
 
-    def parse(self):
-        """Parse a multi-file shapefile format."""
-        for i in range(len(self.elements)):
-            decoded = base64.b64decode(self.elements[i])
-            fname = self.fpaths[i]
-            name, ext = os.path.splitext(fname)
-            temp_path = self.temp_dir.joinpath(f"temp{ext}")
-            with open(temp_path, "wb") as f:
-                f.write(decoded)
-        return temp_path  # Placeholder
-
-    def parse_zip(self):
-        """Parse a zipped shapefile."""
-        fpath = self.fpaths[0]
-        content_type, shp_element = self.contents[0].split(",")
-        decoded = base64.b64decode(shp_element)
-        with tempfile.TemporaryFile() as tmp:
-            tmp.write(decoded)
-            tmp.seek(0)
-            archive = ZipFile(tmp, "r")
-            for file in archive.filelist:
-                fname = file.filename
-                content = archive.read(fname)
-                name, ext = os.path.splitext(fname)
-                fname = "temp" + ext
-                fpath = self.temp_dir.joinpath(fname)
-                with open(fpath, "wb") as f:
-                    f.write(content)
-        return fpath
+    @functools.cached_property
+    def files(self):
+        """Return the decoded name and bytes of each file, unzipped."""
+        files = []
+        for fpath, element in zip(self.fpaths, self.elements):
+            decoded = base64.b64decode(element)
+            if any(e in fpath.name for e in ZIP_EXTENSIONS):
+                with ZipFile(io.BytesIO(decoded), "r") as archive:
+                    for file in archive.filelist:
+                        if not file.is_dir():
+                            name = Path(file.filename).name
+                            files.append((name, archive.read(file)))
+            else:
+                files.append((fpath.name, decoded))
+        return sorted(files)
+
+    @functools.cached_property
+    def digest(self):
+        """Return a hash of the uploaded file contents."""
+        sha = hashlib.sha1()
+        for name, content in self.files:
+            sha.update(os.path.splitext(name)[1].lower().encode())
+            sha.update(len(content).to_bytes(8, "little"))
+            sha.update(content)
+        return sha.hexdigest()
 
-    def rasterize(self, gdf):
-        """Rasterize geodataframe."""
-        # Make target path
-        dst = str(self.temp_dir.joinpath(f"{self.basename}.tif"))
+    @property
+    def record_path(self):
+        """Return the file recording the mask id of this upload."""
+        return self.masks.directory.joinpath(f"upload_{self.digest}.txt")
+
+    def read(self):
+        """Read the uploaded shapes into a geodataframe from memory."""
+        import geopandas as gpd
+
+        from fiona.io import ZipMemoryFile
+
+        # Read every file from one in-memory archive, so the parts of a
+        # multi-file shapefile are found together
+        names = [name for name, _ in self.files
+                 if os.path.splitext(name)[1].lower() in SHAPE_EXTENSIONS]
+        if not names:
+            raise ValueError("No shapefile, geopackage, or geojson found.")
+        buffer = io.BytesIO()
+        with ZipFile(buffer, "w") as archive:
+            for name, content in self.files:
+                archive.writestr(name, content)
+
+        with ZipMemoryFile(buffer.getvalue()) as memfile:
+            with memfile.open(names[0]) as src:
+                crs = src.crs_wkt or "epsg:4326"
+                gdf = gpd.GeoDataFrame.from_features(list(src), crs=crs)
+
+        return gdf
 
-        # Create array
+    def rasterize(self, gdf):
+        """Rasterize geodataframe into a mask of the grid."""
+        profile = templateProfile(RESOLUTION)
         shapes = [(geom, 1) for geom in gdf["geometry"].values]
         mask = rasterize(
             shapes=shapes,
-            out_shape=(120, 300),
-            transform=Options.transform[:6],
+            out_shape=(profile["height"], profile["width"]),
+            transform=profile["transform"],
             all_touched=True
         )
+        return mask
 
-        # Write to raster
-        with rio.open(dst, "w", **self.profile) as file:
-            file.write(mask, 1)
-
-        return dst
-
-    def reproject(self, gdf, fpath):
+    def reproject(self, gdf):
         """Reproject geodataframe to WGS 84."""
-        crs = gdf.crs
-        try:
-            epsg = crs.to_epsg()
-        except:
-            fshp = fiona.open(fpath)
-            crs_wkt = fshp.crs_wkt
-            crs_ref = osr.SpatialReference()
-            crs_ref.ImportFromWkt(crs_wkt)
-            crs_ref.AutoIdentifyEPSG()
-            epsg = crs_ref.GetAttrValue("AUTHORITY", 1)
-            epsg = int(epsg)
-            fshp.close()
-
-        if epsg != 4326:
+        if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
             gdf = gdf.to_crs("epsg:4326")
-
         return gdf
 
-    @property
-    def temp_dir(self):
-        """Return temporary file directory."""
-        return Paths.paths["shapefiles"].joinpath("temp")
-
-    @property
-    def profile(self):
-        """Return a rasterio profile from a template raster."""
-        res_str = str(RESOLUTION).replace(".", "_")
-        template_fpath = self.paths["rasters"].joinpath(f"grid_{res_str}.tif")
-        with rio.open(template_fpath) as r:
-            profile = r.profile
-        return profile
+    def maskId(self):
+        """Return the registered mask id of the upload, reading and
+        rasterizing it only if its contents are new."""
+        digest = self.digest
+        with SHAPE_LOCK:
+            mask_id = SHAPE_MASKS.get(digest)
+        if mask_id is None and self.record_path.exists():
+            mask_id = self.record_path.read_text().strip()
+
+        if mask_id is None:
+            gdf = self.reproject(self.read())
+            mask = self.rasterize(gdf)
+            mask_id = self.masks.register("shape", mask)
+            self.record_path.write_text(mask_id)
+            logger.info("Registered %s as %s.", self.basename, mask_id)
+
+        with SHAPE_LOCK:
+            SHAPE_MASKS[digest] = mask_id
+            SHAPE_MASKS.move_to_end(digest)
+            while len(SHAPE_MASKS) > SHAPE_SIZE:
+                SHAPE_MASKS.popitem(last=False)
+
+        return mask_id
 
     def main(self):
-        """Parse and rasterize shapefile contents."""
+        """Parse and rasterize shapefile contents.
+
+        Returns
+        -------
+        str
+            A JSON list of the registered mask id and the upload's name, for
+            `Location_Builder`.
+        """
         # Skip if empty
         if self.fpaths:
-            # Parse contents, write to file
-            if any(e in self.fpaths[0].name for e in ZIP_EXTENSIONS):
-                fpath = self.parse_zip()
-            else:
-                fpath = self.parse()
-
-            # Check CRS, reproject if needed
-            gdf = gpd.read_file(fpath)
-            gdf = self.reproject(gdf, fpath)
-
-            # Now let"s just rasterize it for a mask
-            fpath = self.temp_dir.joinpath("temp.gpkg")
-            gdf.to_file(fpath, "GPKG")
-
-            # Rasterize
-            dst = self.rasterize(gdf)
- 
-            return dst
+            mask_id = self.maskId()
+            return json.dumps([mask_id, Path(self.basename).name])
@@ -7,9 +7,12 @@ from dash import html, dcc
 from drip.app.pseudo_css import CSS
 from drip.app.options.options import Options, DEFAULT_LOCATION, DEFAULT_SIGNAL
 from drip.app.options.styles import STYLES
+from drip.app.pages.main.export import MAP_FORMATS, SERIES_FORMATS
 
 
 OPTIONS = Options("pdsi")
+DATES = OPTIONS.dates
+DATE_MARKS = OPTIONS.date_marks
 
 
 # Dynamic Elements
@@ -200,6 +203,7 @@ def divMaker(id_num, index="noaa"):
                 id="map_{}".format(id_num),
                 config={"showSendToCloud": True}
             ),
+            dcc.Store(id=f"map_data_{id_num}"),
             html.Div([
                 html.Div([
                     html.P(
@@ -360,16 +364,61 @@ def divMaker(id_num, index="noaa"):
                 "border-bottom-left-radius": "5px",
             },
         ),
-        html.Button(
+        html.A(
             id="download_all_link_{}".format(id_num),
-            children="Download Selected Data (All Indicators)",
+            href="",
+            children=html.Button(
+                children="Download Selected Data (All Indicators)",
+                title=(
+                    "This csv includes data for all available "
+                    "indices/indicators given the selections made for the "
+                    "element above and is titled "
+                    f"timeseries_all_{id_num}.csv. Rows arrive as each "
+                    "index is finished."
+                ),
+                style={}
+            )
+        ),
+        html.Div(
+            title="Select a file format for time series downloads",
+            style={"width": "110px", "display": "inline-block",
+                   "vertical-align": "middle"},
+            children=[
+                dcc.Dropdown(
+                    id="download_format_{}".format(id_num),
+                    options=[{"label": v, "value": k}
+                             for k, v in SERIES_FORMATS.items()],
+                    value="csv",
+                    clearable=False,
+                    searchable=False
+                )
+            ]
+        ),
+        html.Button(
+            id="download_map_link_{}".format(id_num),
+            children="Download Map",
             title=(
-                "This csv includes data for all available indices/indicators "
-                "given the selections made for the element above and is "
-                f"titled timeseries_all_{id_num}.csv. This can take a moment."
+                "This file holds the map above, clipped to the selected "
+                "location, and is titled drip_map_<index>_<function>_"
+                f"{id_num} with the chosen extension."
             ),
             style={}
         ),
+        html.Div(
+            title="Select a file format for map downloads",
+            style={"width": "110px", "display": "inline-block",
+                   "vertical-align": "middle"},
+            children=[
+                dcc.Dropdown(
+                    id="map_format_{}".format(id_num),
+                    options=[{"label": v, "value": k}
+                             for k, v in MAP_FORMATS.items()],
+                    value="nc",
+                    clearable=False,
+                    searchable=False
+                )
+            ]
+        ),
 
         # Storage
         html.Div(
@@ -505,12 +554,12 @@ LAYOUT = html.Div(
                         className="row",
                         children=dcc.RangeSlider(
                             id="year_slider_1",
-                            value=[1980, OPTIONS.dates["max_year"]],
-                            min=OPTIONS.dates["min_year"],
-                            max=OPTIONS.dates["max_year"],
+                            value=[1980, DATES["max_year"]],
+                            min=DATES["min_year"],
+                            max=DATES["max_year"],
                             updatemode="drag",
                             step=1,
-                            marks=OPTIONS.date_marks["years"]
+                            marks=DATE_MARKS["years"]
                         ),
                         style={"margin-bottom": "50px"}
                     ),
@@ -542,12 +591,12 @@ LAYOUT = html.Div(
                                 children=[
                                     dcc.RangeSlider(
                                         id="year_slider_2",
-                                        value=[1980, OPTIONS.dates["max_year"]],
-                                        min=OPTIONS.dates["min_year"],
-                                        max=OPTIONS.dates["max_year"],
+                                        value=[1980, DATES["max_year"]],
+                                        min=DATES["min_year"],
+                                        max=DATES["max_year"],
                                         step=1,
                                         updatemode="drag",
-                                        marks=OPTIONS.date_marks["years"]
+                                        marks=DATE_MARKS["years"]
                                     )
                                 ]
                             ),
@@ -572,7 +621,7 @@ LAYOUT = html.Div(
                          dcc.Slider(
                              id="month_slider_1a",
                              value=1,
-                             marks=OPTIONS.date_marks["months_slanted"],
+                             marks=DATE_MARKS["months_slanted"],
                              min=1,
                              max=12,
                              step=1,
@@ -590,7 +639,7 @@ LAYOUT = html.Div(
                          dcc.Slider(
                              id="month_slider_1b",
                              value=12,
-                             marks=OPTIONS.date_marks["months_slanted"],
+                             marks=DATE_MARKS["months_slanted"],
                              min=1,
                              max=12,
                              step=1,
@@ -610,7 +659,7 @@ LAYOUT = html.Div(
                                  className="check_blue",
                                  id="month_check_1",
                                  value=list(range(1, 13)),
-                                 options=OPTIONS.date_marks["months"],
+                                 options=DATE_MARKS["months"],
                                  labelStyle={"display": "inline-block"}
                              ),
                              html.Button(
@@ -661,7 +710,7 @@ LAYOUT = html.Div(
                          dcc.Slider(
                               id="month_slider_2a",
                               value=1,
-                              marks=OPTIONS.date_marks["months_slanted"],
+                              marks=DATE_MARKS["months_slanted"],
                               min=1,
                               max=12,
                               step=1,
@@ -678,7 +727,7 @@ LAYOUT = html.Div(
                         dcc.Slider(
                             id="month_slider_2b",
                             value=12,
-                            marks=OPTIONS.date_marks["months_slanted"],
+                            marks=DATE_MARKS["months_slanted"],
                             step=1,
                             min=1,
                             max=12,
@@ -699,7 +748,7 @@ LAYOUT = html.Div(
                             className="check_blue",
                             id="month_check_2",
                             value=list(range(1, 13)),
-                            options=OPTIONS.date_marks["months"],
+                            options=DATE_MARKS["months"],
                             labelStyle={"display": "inline-block"}
                         ),
                         html.Button(
@@ -862,12 +911,12 @@ LAYOUT = html.Div(
         ),
         html.Div(
           id="date_print_1",
-          children=f"1980 - {OPTIONS.dates['max_year']}",
+          children=f"1980 - {DATES['max_year']}",
           style={"display": "none"}
         ),
         html.Div(
           id="date_print_2",
-          children=f"1980 - {OPTIONS.dates['max_year']}",
+          children=f"1980 - {DATES['max_year']}",
           style={"display": "none"}
         ),
         html.Div(
@@ -884,24 +933,6 @@ LAYOUT = html.Div(
           id="choice_store",
           style={"display": "none"}
         ),
-        html.Div(
-          id="area_store_1",
-          children="[0, 0]",
-          style={"display": "none"}
-        ),
-        html.Div(
-          id="area_store_2",
-          children="[0, 0]",          
-          style={"display": "none"}
-        ),
-        html.Div(
-            id="download_path_store_1",
-            style={"display": "none"}
-        ),
-        html.Div(
-            id="download_path_store_2",
-            style={"display": "none"}
-        ),
         html.Div(
             id="date_store_1",
             style={"display": "none"}
@@ -916,5 +947,11 @@ LAYOUT = html.Div(
         dcc.Download(
             id="download_chart_2"
         ),
+        dcc.Download(
+            id="download_map_1"
+        ),
+        dcc.Download(
+            id="download_map_2"
+        ),
     ],
 )
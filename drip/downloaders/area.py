@@ -0,0 +1,293 @@
+"""Drought Area
+
+Drought severity categories (D0 - D4) for each index, a one-pass kernel that
+bins index values into those categories, and tables of the area in each
+category for every standard region.
+
+`NetCDF._assemble` writes <stem>_area.nc for the original values of each
+index. It holds the area (square kilometers) in each non-inclusive category
+and the area with valid values, by month, for the contiguous United States,
+each state, and each county. Areas rather than percentages are stored so
+that any set of regions can be summed before taking percentages, and
+`Index_Maps.getArea` reads these instead of the full grid when a location is
+made up of whole regions.
+
+Regions are keyed by integer codes: 0 for CONUS, the state FIPS code for
+states, and state FIPS * 1000 + county FIPS for counties.
+"""
+import numpy as np
+import rasterio as rio
+
+import drip
+
+from drip.downloaders.land import cell_areas
+
+
+AREA_CHUNK = 120  # Time steps per block when binning drought categories
+CONUS = 0  # Region code of the contiguous United States
+DROUGHT_CATEGORIES = {
+    "sp": {
+        0: [-0.5, -0.8],
+        1: [-0.8, -1.3],
+        2: [-1.3, -1.5],
+        3: [-1.5, -2.0],
+        4: [-2.0, -999]
+    },
+    "eddi": {
+        0: [-0.5, -0.8],
+        1: [-0.8, -1.3],
+        2: [-1.3, -1.5],
+        3: [-1.5, -2.0],
+        4: [-2.0, -999]
+    },
+    "pdsi": {
+        0: [-1.0, -2.0],
+        1: [-2.0, -3.0],
+        2: [-3.0, -4.0],
+        3: [-4.0, -5.0],
+        4: [-5.0, -999]
+    },
+    "scpdsi": {
+        0: [-1.0, -2.0],
+        1: [-2.0, -3.0],
+        2: [-3.0, -4.0],
+        3: [-4.0, -5.0],
+        4: [-5.0, -999]
+    },
+    "pzi": {
+        0: [-1.0, -2.0],
+        1: [-2.0, -3.0],
+        2: [-3.0, -4.0],
+        3: [-4.0, -5.0],
+        4: [-5.0, -999]
+    },
+    "leri": {
+        0: [-0.5, -0.8],
+        1: [-0.8, -1.3],
+        2: [-1.3, -1.5],
+        3: [-1.5, -2.0],
+        4: [-2.0, -999]
+    }
+}
+
+
+def category_edges(index):
+    """Return the ascending drought category edges for an index.
+
+    Parameters
+    ----------
+    index : str
+        DrIP index key (e.g. "pdsi" or "spei6").
+
+    Returns
+    -------
+    list | None
+        The lower edge of D4 followed by the upper edges of D4 through D0,
+        or None if the index has no drought categories.
+    """
+    keys = [key for key in DROUGHT_CATEGORIES if key in index]
+    if not keys:
+        return None
+    cats = DROUGHT_CATEGORIES[keys[0]]
+    return [cats[4][1]] + [cats[i][0] for i in range(4, -1, -1)]
+
+
+def category_counts(arrays, edges, weights=None, groups=None):
+    """Count the values in each drought category in one pass.
+
+    Every value of a (time, pixel) array is binned into the intervals
+    between ascending edges and the (weighted) count of each interval is
+    taken at each time step, and optionally for each group of pixels.
+
+    Parameters
+    ----------
+    arrays : np.ndarray
+        A (time, pixel) array of index values.
+    edges : list
+        Ascending category edges, from `category_edges`.
+    weights : np.ndarray
+        Weight (e.g. area) of each pixel. Each pixel counts once if not
+        given.
+    groups : np.ndarray
+        Group number (0, 1, ...) of each pixel.
+
+    Returns
+    -------
+    np.ndarray
+        A (time, len(edges) + 1) array, or (time, group, len(edges) + 1) if
+        groups are given. Column 0 holds values below the first edge and
+        column -1 values at or above the last edge. Missing values are not
+        counted, so the sums over the last axis are the valid totals.
+    """
+    arrays = np.asarray(arrays, dtype="f8")
+    ntime, npixel = arrays.shape
+    nbins = len(edges) + 2  # An extra bin for missing values
+    if weights is None:
+        weights = np.ones(npixel)
+    if groups is None:
+        ngroups = 1
+        offsets = np.zeros(npixel, dtype="int64")
+    else:
+        ngroups = int(groups.max()) + 1 if len(groups) else 1
+        offsets = np.asarray(groups, dtype="int64") * nbins
+
+    bins = np.digitize(arrays, edges)
+    bins[~np.isfinite(arrays)] = nbins - 1
+    bins += offsets
+    bins += np.arange(ntime)[:, np.newaxis] * ngroups * nbins
+    counts = np.bincount(
+        bins.ravel(),
+        weights=np.broadcast_to(weights, arrays.shape).ravel(),
+        minlength=ntime * ngroups * nbins
+    )
+    counts = counts.reshape(ntime, ngroups, nbins)[..., :-1]
+
+    if groups is None:
+        counts = counts[:, 0]
+
+    return counts
+
+
+def category_areas(counts):
+    """Split category counts into D0 - D4 areas and valid totals.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Output of `category_counts`.
+
+    Returns
+    -------
+    tuple
+        The non-inclusive D0 - D4 areas, with the categories on the last
+        axis, and the total area with valid values.
+    """
+    return counts[..., 5:0:-1], counts.sum(axis=-1)
+
+
+def coverage(areas, totals):
+    """Return drought coverage percentages and the DSCI.
+
+    Parameters
+    ----------
+    areas : np.ndarray
+        A (time, 5) array of non-inclusive D0 - D4 areas.
+    totals : np.ndarray
+        Area with valid values at each time step.
+
+    Returns
+    -------
+    tuple
+        Inclusive and non-inclusive D0 - D4 percentages as lists of five
+        lists, and the Drought Severity Coverage Index as a list.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pnincs = np.asarray(areas).T / totals * 100
+
+    # Use the noninclusive percentages to create the inclusive percentages
+    pincs = [np.sum(pnincs[i:], axis=0) for i in range(len(pnincs))]
+
+    # Also use the noninclusive arrays to get the DSCI
+    pnacc = np.array([pnincs[i] * (i + 1) for i in range(5)])
+    dsci = list(np.nansum(pnacc, axis=0))
+
+    # To store these in a div they need to work with json
+    pincs = [list(a) for a in pincs]
+    pnincs = [list(p) for p in pnincs]
+
+    return pincs, pnincs, dsci
+
+
+def region_grids(resolution=0.25):
+    """Return region code rasters for CONUS, states, and counties.
+
+    Parameters
+    ----------
+    resolution : float
+        Resolution of the package rasters in decimal degrees.
+
+    Returns
+    -------
+    list
+        Three float arrays of region codes on the full grid, NaN outside of
+        the grid raster's cells.
+    """
+    res_str = str(round(resolution, 3)).replace(".", "_")
+    rasters = drip.Paths.paths["rasters"]
+    arrays = []
+    for name in ["grid", "us_states", "us_counties"]:
+        with rio.open(rasters.joinpath(f"{name}_{res_str}.tif")) as src:
+            array = src.read(1).astype("f8")
+            if src.nodata is not None:
+                array[array == src.nodata] = np.nan
+        array[array == -9999] = np.nan
+        arrays.append(array)
+    grid, states, counties = arrays
+
+    inside = np.isfinite(grid)
+    conus = np.where(inside, CONUS, np.nan)
+    states = np.where(inside, states, np.nan)
+    counties = np.where(inside, states * 1000 + counties, np.nan)
+
+    return [conus, states, counties]
+
+
+def region_areas(array, lats, resolution, grids, index):
+    """Return D0 - D4 and valid areas for every region at every time step.
+
+    Parameters
+    ----------
+    array : np.ndarray | np.ma.core.MaskedArray
+        A 3D array of original index values ordered by time, latitude, and
+        longitude.
+    lats : list
+        Latitude coordinates of the array.
+    resolution : float
+        Cell size in decimal degrees.
+    grids : list
+        Region code rasters from `region_grids`.
+    index : str
+        DrIP index key, used to choose the drought categories.
+
+    Returns
+    -------
+    tuple
+        The region codes, a (region, time, 5) array of non-inclusive D0 -
+        D4 areas, and a (region, time) array of valid areas, in square
+        kilometers.
+    """
+    edges = category_edges(index)
+    ntime, nlat, nlon = array.shape
+    cell_area = np.repeat(cell_areas(lats, resolution), nlon)
+
+    # Give each level's regions group numbers
+    codes = []
+    levels = []
+    for grid in grids:
+        cells = np.where(np.isfinite(grid.ravel()))[0]
+        level_codes, groups = np.unique(grid.ravel()[cells],
+                                        return_inverse=True)
+        codes.append(level_codes.astype("int64"))
+        levels.append((cells, groups))
+    codes = np.concatenate(codes)
+
+    areas = np.zeros((len(codes), ntime, 5), dtype="f8")
+    totals = np.zeros((len(codes), ntime), dtype="f8")
+    for i in range(0, ntime, AREA_CHUNK):
+        block = np.ma.filled(np.ma.asarray(array[i: i + AREA_CHUNK],
+                                           dtype="f8"), np.nan)
+        block[block == -9999] = np.nan
+        block = block.reshape(block.shape[0], -1)
+        if "eddi" in index:
+            block = block * -1
+        start = 0
+        for cells, groups in levels:
+            counts = category_counts(block[:, cells], edges,
+                                     cell_area[cells], groups)
+            cats, total = category_areas(counts)
+            stop = start + counts.shape[1]
+            areas[start: stop, i: i + AREA_CHUNK] = cats.swapaxes(0, 1)
+            totals[start: stop, i: i + AREA_CHUNK] = total.T
+            start = stop
+
+    return codes, areas, totals
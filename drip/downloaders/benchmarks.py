@@ -0,0 +1,490 @@
+"""Storage Benchmarks
+
+Methods to time the app's data access patterns against different storage
+layouts for the index NetCDF files and record the fastest one for each file.
+
+The winning layouts are kept in data/tables/chunk_layouts.json, keyed by file
+stem (e.g. "pdsi" or "pdsi_percentile"). `Index_Maps.setData` uses them to set
+dask chunks and `NetCDF._assemble` uses them to set on-disk chunking.
+
+This also compares the default float32 storage against packed int16 storage
+(`NetCDF(packed=True)`), reporting file size, cold read time, and the decode
+overhead of the app's reductions.
+"""
+import datetime as dt
+import functools
+import json
+import os
+import tempfile
+import time
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+import drip
+
+from drip.loggers import init_logger
+
+logger = init_logger(__name__)
+
+
+# Chunk shapes to try, -1 spans the full dimension
+CANDIDATE_CHUNKS = [
+    {"time": 1, "latitude": -1, "longitude": -1},
+    {"time": 12, "latitude": -1, "longitude": -1},
+    {"time": 120, "latitude": -1, "longitude": -1},
+    {"time": 100, "latitude": 100, "longitude": 100},
+    {"time": 240, "latitude": 60, "longitude": 75},
+    {"time": -1, "latitude": 30, "longitude": 30},
+    {"time": -1, "latitude": 10, "longitude": 10}
+]
+DEFAULT_LAYOUT = {"disk": None, "dask": 100}
+DIMS = ["time", "latitude", "longitude"]
+LAYOUT_PATH = drip.Paths.paths["tables"].joinpath("chunk_layouts.json")
+PACKED_FILL = -32768
+PACKED_STEPS = 65532  # int16 steps used by packed values, less the fill value
+
+
+@functools.lru_cache()
+def chunk_layouts():
+    """Return all recorded chunk layouts."""
+    if not LAYOUT_PATH.exists():
+        return {}
+    with open(LAYOUT_PATH, "r", encoding="utf-8") as file:
+        layouts = json.load(file)
+    return layouts
+
+
+def chunk_layout(stem):
+    """Return the chunk layout for an index file.
+
+    Parameters
+    ----------
+    stem : str
+        Index file name without the extension (e.g. "pdsi_percentile").
+
+    Returns
+    -------
+    dict
+        Dictionary with a "disk" entry of chunk sizes for writing, or None
+        for the NetCDF default, and a "dask" entry of chunks for opening.
+    """
+    layout = chunk_layouts().get(stem, DEFAULT_LAYOUT)
+    return {**DEFAULT_LAYOUT, **layout}
+
+
+def disk_chunksizes(chunks, shape):
+    """Convert a chunk dictionary into NetCDF chunk sizes for a shape.
+
+    Parameters
+    ----------
+    chunks : dict | None
+        Dictionary of chunk sizes by dimension name, -1 spans the dimension.
+    shape : tuple
+        Length of the time, latitude, and longitude dimensions.
+
+    Returns
+    -------
+    list | None
+        Chunk sizes in dimension order or None if no chunks were given.
+    """
+    if not chunks:
+        return None
+    sizes = []
+    for dim, length in zip(DIMS, shape):
+        size = chunks.get(dim, -1)
+        if size == -1 or size > length:
+            size = length
+        sizes.append(max(int(size), 1))
+    return sizes
+
+
+def evict(path):
+    """Drop a file from the page cache so the next read comes from disk.
+
+    This only works where `os.posix_fadvise` is available, elsewhere the
+    next read may be served from memory.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def pack_array(array):
+    """Mask missing values in an array before writing it packed.
+
+    Parameters
+    ----------
+    array : np.ndarray | np.ma.core.MaskedArray
+        Values with NaNs or -9999 for missing values.
+
+    Returns
+    -------
+    np.ma.core.MaskedArray
+        Values with all missing values masked, so they are written as the
+        packed fill value.
+    """
+    array = np.ma.filled(np.ma.asarray(array, dtype="f4"), np.nan)
+    missing = ~np.isfinite(array) | (array == -9999)
+    return np.ma.masked_array(np.where(missing, 0, array), mask=missing)
+
+
+def pack_parameters(array):
+    """Return int16 packing attributes that span an array's value range.
+
+    Parameters
+    ----------
+    array : np.ndarray | np.ma.core.MaskedArray
+        Values to be packed, NaNs and -9999 are treated as missing.
+
+    Returns
+    -------
+    dict
+        The "scale_factor" and "add_offset" attributes for the packed
+        variable. Unpacked values are `packed * scale_factor + add_offset`.
+    """
+    values = pack_array(array).compressed()
+    if values.size:
+        minimum = float(values.min())
+        maximum = float(values.max())
+    else:
+        minimum = maximum = 0.0
+    scale = (maximum - minimum) / PACKED_STEPS or 1.0
+    offset = (maximum + minimum) / 2
+    return {"scale_factor": np.float32(scale), "add_offset": np.float32(offset)}
+
+
+def write_copy(src, array, chunks, dst, packing=None):
+    """Write array to a bare NetCDF file with an index file's coordinates.
+
+    Parameters
+    ----------
+    src : str | pathlib.PosixPath
+        Path to the index file to copy coordinates from.
+    array : np.ndarray | np.ma.core.MaskedArray
+        A 3D array of values ordered by time, latitude, and longitude.
+    chunks : dict | None
+        Dictionary of chunk sizes by dimension name, -1 spans the dimension.
+    dst : str | pathlib.PosixPath
+        Path to the new file.
+    packing : dict
+        Packing attributes from `pack_parameters`. Writes float32 values if
+        not given.
+    """
+    with netCDF4.Dataset(src) as data, \
+            netCDF4.Dataset(dst, mode="w", format="NETCDF4") as nco:
+        nco.createDimension("latitude", array.shape[1])
+        nco.createDimension("longitude", array.shape[2])
+        nco.createDimension("time", None)
+        for dim in DIMS:
+            var = nco.createVariable(dim, data[dim].dtype, (dim,))
+            var.setncatts(data[dim].__dict__)
+            var[:] = data[dim][:]
+        chunksizes = disk_chunksizes(chunks, array.shape)
+        if packing:
+            variable = nco.createVariable("value", "i2", DIMS,
+                                          fill_value=PACKED_FILL, zlib=True,
+                                          shuffle=True, chunksizes=chunksizes)
+            variable.setncatts(packing)
+            variable[:, :, :] = pack_array(array)
+        else:
+            variable = nco.createVariable("value", "f4", DIMS,
+                                          fill_value=-9999,
+                                          chunksizes=chunksizes)
+            variable[:, :, :] = array
+
+
+class Index_Benchmark(drip.Paths):
+    """Methods shared by the index file benchmarks."""
+
+    def __init__(self, index, percentile=False, repeats=3):
+        """Initialize Index_Benchmark object.
+
+        Parameters
+        ----------
+        index : str
+            DrIP key for target index.
+        percentile : boolean
+            Benchmark the percentile version of the index file.
+        repeats : int
+            Number of times to run each access pattern. The fastest run is
+            recorded.
+        """
+        self.index = index
+        self.percentile = percentile
+        self.repeats = repeats
+
+    def __repr__(self):
+        """Return representation string."""
+        address = hex(id(self))
+        name = str(self.__class__).replace(">", f" at {address}>")
+        attrs = [f"{key}='{attr}'" for key, attr in self.__dict__.items()]
+        attr_str = "\n  ".join(attrs)
+        msg = f"{name}\n  {attr_str}"
+        return msg
+
+    @property
+    def src(self):
+        """Return path to the index file being benchmarked."""
+        modifier = "_percentile" if self.percentile else ""
+        home = self.paths["indices"].joinpath(self.index)
+        return home.joinpath(f"{self.index}{modifier}.nc")
+
+    def _time(self, func, path=None):
+        """Return the fastest of several runs of a function in seconds.
+
+        If a path is given, it is evicted from the page cache before each
+        run, so every run reads it from disk.
+        """
+        times = []
+        for _ in range(self.repeats):
+            if path:
+                evict(path)
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+
+class Chunk_Tuner(Index_Benchmark):
+    """Methods for benchmarking chunk shapes for an index file."""
+
+    def __init__(self, index, percentile=False, candidates=None, repeats=3):
+        """Initialize Chunk_Tuner object.
+
+        Parameters
+        ----------
+        index : str
+            DrIP key for target index.
+        percentile : boolean
+            Benchmark the percentile version of the index file.
+        candidates : list
+            List of chunk dictionaries to test. Defaults to CANDIDATE_CHUNKS.
+        repeats : int
+            Number of times to run each access pattern. The fastest run is
+            recorded.
+        """
+        super().__init__(index, percentile, repeats)
+        self.candidates = candidates or CANDIDATE_CHUNKS
+
+    def benchmark(self):
+        """Time each access pattern for each disk and dask chunk shape.
+
+        Each candidate is written to a temporary copy of the index file
+        with that on-disk chunking, then opened with dask chunks matching
+        the disk chunks and with the previous default of 100.
+
+        Returns
+        -------
+        pd.DataFrame
+            A table of disk chunks, dask chunks, access pattern, and the
+            fastest time in seconds.
+        """
+        with netCDF4.Dataset(self.src) as data:
+            array = data["value"][:]
+
+        rows = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, disk in enumerate(self.candidates):
+                dst = os.path.join(tmp, f"{self.index}_{i}.nc")
+                write_copy(self.src, array, disk, dst)
+                for dask in [disk, DEFAULT_LAYOUT["dask"]]:
+                    timings = self._time_patterns(dst, dask)
+                    for pattern, seconds in timings.items():
+                        rows.append({
+                            "disk": json.dumps(disk),
+                            "dask": json.dumps(dask),
+                            "pattern": pattern,
+                            "seconds": seconds
+                        })
+                    logger.info("%s disk=%s dask=%s: %s", self.index, disk,
+                                dask, timings)
+
+        return pd.DataFrame(rows)
+
+    def tune(self, save=True):
+        """Benchmark candidates and record the fastest layout.
+
+        Parameters
+        ----------
+        save : boolean
+            Write the winning layout to the chunk layout table.
+
+        Returns
+        -------
+        dict
+            The winning layout with "disk", "dask", and "seconds" entries.
+        """
+        df = self.benchmark()
+        totals = df.groupby(["disk", "dask"])["seconds"].sum()
+        disk, dask = totals.idxmin()
+        layout = {
+            "disk": json.loads(disk),
+            "dask": json.loads(dask),
+            "seconds": round(float(totals.min()), 4),
+            "benchmarked": dt.datetime.today().strftime("%Y-%m-%d")
+        }
+
+        if save:
+            stem = self.src.stem
+            df.to_csv(self.src.parent.joinpath(f"{stem}_chunks.csv"),
+                      index=False)
+            layouts = dict(chunk_layouts())
+            layouts[stem] = layout
+            with open(LAYOUT_PATH, "w", encoding="utf-8") as file:
+                json.dump(layouts, file, indent=4)
+            chunk_layouts.cache_clear()
+
+        logger.info("Best layout for %s: %s", self.src.name, layout)
+
+        return layout
+
+    def _time_patterns(self, path, chunks):
+        """Time the app's access patterns on one file with one dask chunking.
+
+        These mirror `Index_Maps.getMean` over a date range, a month
+        filtered reduction, `Index_Maps.getSeries` at a single cell, and the
+        category counts in `Index_Maps.getArea`. The file is evicted from
+        the page cache and reopened for every run, so each pattern is timed
+        reading from disk as it would be on a worker's first request.
+        """
+        with xr.open_dataset(path) as data:
+            end = pd.Timestamp(data["time"].values[-1])
+
+            # Pick a cell with data near the center of the grid
+            first = np.isfinite(data["value"][-1].values)
+            ys, xs = np.where(first)
+            center = np.argmin((ys - ys.mean()) ** 2 + (xs - xs.mean()) ** 2)
+            y, x = ys[center], xs[center]
+        start = dt.datetime(end.year - 29, 1, 1)
+
+        def mean(values):
+            recent = values.sel(time=slice(start, end))
+            recent.mean(dim="time", skipna=True).compute()
+
+        def month_mean(values):
+            summer = values.sel(time=np.isin(values["time.month"], [6, 7, 8]))
+            summer.mean(dim="time", skipna=True).compute()
+
+        def series(values):
+            values[:, y, x].values
+
+        def area(values):
+            recent = values.sel(time=slice(start, end))
+            totals = recent.where(~np.isnan(recent)).count(
+                dim=("latitude", "longitude"))
+            counts = recent.where(recent < -0.5).count(
+                dim=("latitude", "longitude"))
+            (counts / totals).compute()
+
+        def cold(pattern):
+            def func():
+                with xr.open_dataset(path, chunks=chunks) as data:
+                    pattern(data["value"])
+            return self._time(func, path)
+
+        timings = {
+            "mean": cold(mean),
+            "month_mean": cold(month_mean),
+            "series": cold(series),
+            "area": cold(area)
+        }
+
+        return timings
+
+
+class Packing_Benchmark(Index_Benchmark):
+    """Methods for comparing float32 and packed int16 index files.
+
+    The mean and series patterns are timed warm, so the difference between
+    storage modes is the decode overhead rather than the read time.
+    """
+
+    def benchmark(self, save=True):
+        """Write float32 and packed copies of the index file and time them.
+
+        Parameters
+        ----------
+        save : boolean
+            Write the table next to the index file as <stem>_packing.csv.
+
+        Returns
+        -------
+        pd.DataFrame
+            A table with one row per storage mode with the file size in MB,
+            the cold read time of the full array, and the warm times of
+            the mean and series access patterns in seconds. The "decode"
+            columns are the packed times less the float32 times.
+        """
+        with netCDF4.Dataset(self.src) as data:
+            array = data["value"][:]
+        layout = chunk_layout(self.src.stem)
+        packing = pack_parameters(array)
+
+        rows = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in ["float32", "int16"]:
+                dst = os.path.join(tmp, f"{self.index}_{mode}.nc")
+                write_copy(self.src, array, layout["disk"], dst,
+                           packing=packing if mode == "int16" else None)
+                row = {
+                    "mode": mode,
+                    "size_mb": round(os.path.getsize(dst) / 1_000_000, 3),
+                    "cold_read": self._cold_read(dst),
+                    **self._time_patterns(dst, layout["dask"])
+                }
+                rows.append(row)
+                logger.info("%s %s: %s", self.src.name, mode, row)
+
+        df = pd.DataFrame(rows)
+        for pattern in ["mean", "series"]:
+            overhead = df[pattern].iloc[1] - df[pattern].iloc[0]
+            df[f"{pattern}_decode"] = [0, overhead]
+
+        if save:
+            dst = self.src.parent.joinpath(f"{self.src.stem}_packing.csv")
+            df.to_csv(dst, index=False)
+
+        return df
+
+    def _cold_read(self, path):
+        """Time a full read of the values after evicting the file."""
+        evict(path)
+        start = time.perf_counter()
+        with netCDF4.Dataset(path) as data:
+            data["value"][:]
+        return time.perf_counter() - start
+
+    def _time_patterns(self, path, chunks):
+        """Time `Index_Maps.getMean` and `Index_Maps.getSeries` patterns."""
+        with xr.open_dataset(path, chunks=chunks) as data:
+            values = data["value"]
+            end = pd.Timestamp(data["time"].values[-1])
+            start = dt.datetime(end.year - 29, 1, 1)
+            recent = values.sel(time=slice(start, end))
+
+            # A block of cells near the center of the grid
+            y = values.shape[1] // 2
+            x = values.shape[2] // 2
+
+            def mean():
+                recent.mean(dim="time", skipna=True).compute()
+
+            def series():
+                values[:, y - 5: y + 5, x - 5: x + 5].mean(
+                    dim=("latitude", "longitude"), skipna=True
+                ).compute()
+
+            timings = {
+                "mean": self._time(mean),
+                "series": self._time(series)
+            }
+
+        return timings
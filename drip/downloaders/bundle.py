@@ -0,0 +1,113 @@
+"""Array Bundles
+
+A single file holding several named arrays and a small JSON description of
+them, so that a set of arrays can be memory-mapped at once instead of read
+and rebuilt from rasters and tables.
+
+The file is an 8-byte magic string, the 8-byte little-endian length of a
+UTF-8 JSON header, the header, and then the raw bytes of each array, each
+aligned to BUNDLE_ALIGN bytes. The header holds the dtype, shape, and byte
+offset (from the end of the aligned header) of every array and any extra
+attributes.
+
+`Admin_Elements.buildBundle` compiles the administrative arrays and table the
+app needs at each resolution into data/rasters/admin_bundle_<res>.bin.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BUNDLE_ALIGN = 64  # Byte alignment of each array
+BUNDLE_MAGIC = b"DRIPBNDL"
+
+
+def _aligned(offset):
+    """Return the next aligned byte offset."""
+    return -(-offset // BUNDLE_ALIGN) * BUNDLE_ALIGN
+
+
+def write_bundle(path, arrays, attrs=None):
+    """Write named arrays and attributes to a bundle file.
+
+    The file is written next to its destination and then moved into place,
+    so readers never see a partial bundle.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Destination file path.
+    arrays : dict
+        Arrays by name. Object arrays (e.g. strings from a data frame) are
+        stored as fixed-width unicode, with missing values as empty strings
+        rather than "nan" or "None".
+    attrs : dict
+        JSON-serializable attributes.
+    """
+    arrays = {name: np.asarray(array) for name, array in arrays.items()}
+    for name, array in arrays.items():
+        if array.dtype == object:
+            arrays[name] = np.where(pd.isna(array), "", array).astype(str)
+
+    # Array offsets are from the start of the data, after the header
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset
+        }
+        offset = _aligned(offset + array.nbytes)
+    header = {"arrays": entries, "attrs": attrs or {}}
+    text = json.dumps(header).encode()
+    start = _aligned(len(BUNDLE_MAGIC) + 8 + len(text))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(BUNDLE_MAGIC)
+        file.write(len(text).to_bytes(8, "little"))
+        file.write(text)
+        for name, array in arrays.items():
+            file.seek(start + entries[name]["offset"])
+            file.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp, path)
+
+
+def read_bundle(path, mode="c"):
+    """Memory-map every array in a bundle file.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Bundle file path.
+    mode : str
+        np.memmap mode. The default, "c", is copy-on-write, so arrays can be
+        changed in memory without changing the file.
+
+    Returns
+    -------
+    tuple
+        A dictionary of memory-mapped arrays by name and the attributes.
+    """
+    with open(path, "rb") as file:
+        magic = file.read(len(BUNDLE_MAGIC))
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not an array bundle.")
+        size = int.from_bytes(file.read(8), "little")
+        header = json.loads(file.read(size).decode())
+    start = _aligned(len(BUNDLE_MAGIC) + 8 + size)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=entry["dtype"])
+            continue
+        arrays[name] = np.memmap(path, dtype=entry["dtype"], mode=mode,
+                                 offset=start + entry["offset"],
+                                 shape=shape)
+
+    return arrays, header["attrs"]
@@ -0,0 +1,271 @@
+"""Index Catalog
+
+A small table describing every index file, written when the files are built
+so the app never has to open a NetCDF file to answer questions like "what is
+the last month on record?"
+
+Entries are kept in data/tables/index_catalog.json, keyed by file stem (e.g.
+"pdsi" or "pdsi_percentile"), and hold the time range, value range, chunk
+layout, and modification time of each file, along with the mean, standard
+deviation, and number of missing values. `NetCDF._assemble` and
+`NetCDF.trim_dates` update them. The app keeps the table in memory and
+rereads it when an index file's modification time no longer matches its
+entry.
+"""
+import datetime as dt
+import functools
+import json
+import os
+import threading
+
+from pathlib import Path
+
+import netCDF4
+import numpy as np
+
+import drip
+
+from drip.downloaders.benchmarks import chunk_layout
+from drip.loggers import init_logger
+
+logger = init_logger(__name__)
+
+
+BASE_DATE = dt.datetime(1900, 1, 1)
+CATALOG_PATH = drip.Paths.paths["tables"].joinpath("index_catalog.json")
+LOCK = threading.Lock()
+STATS_CHUNK = 120  # Time steps per block when streaming value statistics
+
+
+class Value_Stats:
+    """Running value statistics over blocks of an index array."""
+
+    def __init__(self):
+        """Initialize Value_Stats object."""
+        self.count = 0
+        self.nan_count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def __repr__(self):
+        """Return representation string."""
+        address = hex(id(self))
+        name = str(self.__class__).replace(">", f" at {address}>")
+        attrs = [f"{key}='{attr}'" for key, attr in self.__dict__.items()]
+        attr_str = "\n  ".join(attrs)
+        msg = f"{name}\n  {attr_str}"
+        return msg
+
+    def update(self, block):
+        """Add a block of values to the statistics.
+
+        Parameters
+        ----------
+        block : np.ndarray | np.ma.core.MaskedArray
+            Any number of values. Masked values, NaNs, and the -9999 fill
+            value count as missing.
+        """
+        block = np.ma.filled(np.ma.asarray(block, dtype="f8"), np.nan)
+        values = block[np.isfinite(block) & (block != -9999)]
+        self.nan_count += block.size - values.size
+        if values.size:
+            self.count += values.size
+            self.total += values.sum()
+            self.squares += np.square(values).sum()
+            self.minimum = min(self.minimum, values.min())
+            self.maximum = max(self.maximum, values.max())
+
+    @property
+    def summary(self):
+        """Return the statistics as a catalog dictionary."""
+        if not self.count:
+            return {"value_min": None, "value_max": None,
+                    "value_mean": None, "value_std": None,
+                    "nan_count": int(self.nan_count)}
+        mean = self.total / self.count
+        variance = max(self.squares / self.count - mean ** 2, 0)
+        summary = {
+            "value_min": float(self.minimum),
+            "value_max": float(self.maximum),
+            "value_mean": float(mean),
+            "value_std": float(np.sqrt(variance)),
+            "nan_count": int(self.nan_count)
+        }
+        return summary
+
+
+@functools.lru_cache()
+def index_catalog():
+    """Return all catalog entries."""
+    if not CATALOG_PATH.exists():
+        return {}
+    with open(CATALOG_PATH, "r", encoding="utf-8") as file:
+        catalog = json.load(file)
+    return catalog
+
+
+def catalog_entry(stem):
+    """Return the catalog entry for an index file.
+
+    If the recorded entry is missing or older than the file, the table is
+    reread in case the file was recorded after it was loaded. If the entry
+    is still missing or out of date, one is built from the file's time and
+    crs variables, without value statistics, and kept in memory until the
+    file changes again.
+
+    Parameters
+    ----------
+    stem : str
+        Index file name without the extension (e.g. "pdsi_percentile").
+
+    Returns
+    -------
+    dict
+        Dictionary with the file's time range, value statistics, chunk
+        layout, and modification time. Value statistics are None if the
+        entry was built without them.
+    """
+    path = index_path(stem)
+    mtime = os.path.getmtime(path) if path.exists() else None
+    entry = index_catalog().get(stem)
+    if current(entry, mtime):
+        return entry
+
+    with LOCK:
+        index_catalog.cache_clear()
+        catalog = index_catalog()
+        entry = catalog.get(stem)
+        if not current(entry, mtime):
+            logger.info("Catalog entry for %s is missing or out of date, "
+                        "reading %s.", stem, path)
+            entry = describe(path, stats=Value_Stats())
+            catalog[stem] = entry
+
+    return entry
+
+
+def current(entry, mtime):
+    """Return whether a catalog entry matches a file modification time."""
+    if entry is None:
+        return False
+    return mtime is None or entry.get("mtime") == mtime
+
+
+def base_days(times):
+    """Return a NetCDF time variable's values as days since 1900-01-01.
+
+    Files rewritten by xarray may use another time base, so the values are
+    decoded with the variable's own units and calendar.
+
+    Parameters
+    ----------
+    times : netCDF4._netCDF4.Variable
+        An open time variable.
+
+    Returns
+    -------
+    np.ndarray
+        Days since 1900-01-01 of each time step.
+    """
+    calendar = getattr(times, "calendar", "standard")
+    dates = netCDF4.num2date(times[:], times.units, calendar)
+    return netCDF4.date2num(dates, "days since 1900-01-01", calendar)
+
+
+def describe(path, stats=None, time=None, transform=None):
+    """Build a catalog entry for an index file.
+
+    Parameters
+    ----------
+    path : str | pathlib.PosixPath
+        Path to the index NetCDF file.
+    stats : Value_Stats
+        Statistics of the values written to the file. Streamed from the
+        file if not given. An empty Value_Stats leaves them out.
+    time : np.ndarray
+        Days since 1900-01-01 written to the file. Read from the file if
+        not given.
+    transform : list
+        Geotransform of the file. Read from the file if not given.
+
+    Returns
+    -------
+    dict
+        A catalog entry.
+    """
+    path = Path(path)
+    if stats is None or time is None or transform is None:
+        with netCDF4.Dataset(path) as data:
+            if stats is None:
+                stats = Value_Stats()
+                values = data["value"]
+                for i in range(0, values.shape[0], STATS_CHUNK):
+                    stats.update(values[i: i + STATS_CHUNK])
+            if time is None:
+                time = base_days(data["time"])
+            if transform is None:
+                transform = data["crs"].GeoTransform
+
+    min_date = BASE_DATE + dt.timedelta(days=float(np.min(time)))
+    max_date = BASE_DATE + dt.timedelta(days=float(np.max(time)))
+
+    entry = {
+        "file": path.name,
+        "mtime": os.path.getmtime(path),
+        "time_steps": int(len(time)),
+        "min_date": min_date.strftime("%Y-%m-%d"),
+        "max_date": max_date.strftime("%Y-%m-%d"),
+        "min_year": min_date.year,
+        "max_year": max_date.year,
+        "max_month": max_date.month,
+        **stats.summary,
+        "transform": [float(value) for value in transform],
+        "chunks": chunk_layout(path.stem)
+    }
+
+    return entry
+
+
+def index_path(stem):
+    """Return the path to an index file from its stem."""
+    index = stem.split("_")[0]
+    return drip.Paths.paths["indices"].joinpath(index, f"{stem}.nc")
+
+
+def update_catalog(path, stats=None, time=None, transform=None):
+    """Record the catalog entry for a newly written index file.
+
+    Parameters
+    ----------
+    path : str | pathlib.PosixPath
+        Path to the index NetCDF file.
+    stats : Value_Stats
+        Statistics of the values written to the file. Streamed from the
+        file if not given.
+    time : np.ndarray
+        Days since 1900-01-01 written to the file. Read from the file if
+        not given.
+    transform : list
+        Geotransform of the file. Read from the file if not given.
+
+    Returns
+    -------
+    dict
+        The new catalog entry.
+    """
+    entry = describe(path, stats, time, transform)
+    stem = os.path.splitext(entry["file"])[0]
+
+    with LOCK:
+        index_catalog.cache_clear()
+        catalog = dict(index_catalog())
+        catalog[stem] = entry
+        tmp = CATALOG_PATH.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(catalog, file, indent=4)
+        os.replace(tmp, CATALOG_PATH)
+        index_catalog.cache_clear()
+
+    return entry
@@ -0,0 +1,175 @@
+"""Land Pixels
+
+Most of the 0.25 degree grid is ocean, Canada, or Mexico. These methods pack
+a (..., latitude, longitude) array down to the CONUS cells in the grid raster
+(rasters/grid_0_25.tif), giving a (..., pixel) array, and scatter results back
+onto the full grid for rendering.
+
+`NetCDF._assemble` writes a time-major (time, pixel) copy of each index file,
+<stem>_land.nc, and `Index_Maps` reduces that copy instead of the full
+rectangle.
+
+Area statistics weight each pixel by its area on the WGS84 ellipsoid, so
+drought coverage is equal-area without a projected copy of the data.
+"""
+import functools
+
+import numpy as np
+import rasterio as rio
+
+import drip
+
+
+WGS84_A = 6378137.0  # Semi-major axis in meters
+WGS84_F = 1 / 298.257223563  # Flattening
+
+
+def cell_areas(lats, resolution=None):
+    """Return the area of each row of cells in a regular lat/lon grid.
+
+    Areas are exact on the WGS84 ellipsoid, from the authalic latitude
+    function, rather than a cos(latitude) approximation.
+
+    Parameters
+    ----------
+    lats : np.ndarray
+        Latitude of the top edge of each row, as written to the index files.
+    resolution : float
+        Cell size in decimal degrees. Taken from the spacing of lats if not
+        given.
+
+    Returns
+    -------
+    np.ndarray
+        Area of one cell in each row in square kilometers.
+    """
+    lats = np.asarray(lats, dtype="f8")
+    if resolution is None:
+        resolution = abs(lats[1] - lats[0])
+    direction = np.sign(lats[-1] - lats[0]) if len(lats) > 1 else -1
+    step = direction * resolution
+
+    b2 = (WGS84_A * (1 - WGS84_F)) ** 2
+    e = np.sqrt(WGS84_F * (2 - WGS84_F))
+
+    def authalic(lat):
+        sin = np.sin(np.deg2rad(lat))
+        esin = e * sin
+        return (sin / (1 - esin ** 2)
+                + np.log((1 + esin) / (1 - esin)) / (2 * e))
+
+    edge1 = lats
+    edge2 = np.clip(lats + step, -90, 90)
+    dlon = np.deg2rad(resolution)
+    areas = b2 * dlon / 2 * np.abs(authalic(edge2) - authalic(edge1))
+
+    return areas / 1e6
+
+
+class Land_Pixels:
+    """Methods for packing grids to land pixels and scattering them back."""
+
+    def __init__(self, rows, cols, lats, lons):
+        """Initialize Land_Pixels object.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Row index of each land pixel in the full grid.
+        cols : np.ndarray
+            Column index of each land pixel in the full grid.
+        lats : np.ndarray
+            Latitude of each row in the full grid.
+        lons : np.ndarray
+            Longitude of each column in the full grid.
+        """
+        self.rows = np.asarray(rows, dtype="int64")
+        self.cols = np.asarray(cols, dtype="int64")
+        self.lats = np.asarray(lats)
+        self.lons = np.asarray(lons)
+
+    def __repr__(self):
+        """Return representation string."""
+        address = hex(id(self))
+        name = str(self.__class__).replace(">", f" at {address}>")
+        return f"{name}\n  size={self.size}\n  shape={self.shape}"
+
+    @classmethod
+    def from_grid(cls, resolution=0.25):
+        """Build from the package grid raster at a resolution.
+
+        Parameters
+        ----------
+        resolution : float
+            Resolution of the grid raster in decimal degrees.
+
+        Returns
+        -------
+        Land_Pixels
+            Land pixels of every cell with a grid id.
+        """
+        res_str = str(round(resolution, 3)).replace(".", "_")
+        path = drip.Paths.paths["rasters"].joinpath(f"grid_{res_str}.tif")
+        with rio.open(path) as src:
+            grid = src.read(1).astype("f8")
+            nodata = src.nodata
+            transform = src.transform
+        if nodata is not None:
+            grid[grid == nodata] = np.nan
+        grid[grid == -9999] = np.nan
+        rows, cols = np.where(np.isfinite(grid))
+        lats = transform[5] + transform[4] * np.arange(grid.shape[0])
+        lons = transform[2] + transform[0] * np.arange(grid.shape[1])
+        return cls(rows, cols, lats, lons)
+
+    @property
+    def shape(self):
+        """Return the shape of the full grid."""
+        return (len(self.lats), len(self.lons))
+
+    @property
+    def size(self):
+        """Return the number of land pixels."""
+        return len(self.rows)
+
+    def pack(self, array):
+        """Return the land pixels of an array.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            An array whose last two dimensions match the full grid.
+
+        Returns
+        -------
+        np.ndarray
+            An array with the last two dimensions replaced by one pixel
+            dimension.
+        """
+        return np.asanyarray(array)[..., self.rows, self.cols]
+
+    def scatter(self, array, fill=np.nan):
+        """Place packed values back onto the full grid.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            An array whose last dimension is the pixel dimension.
+        fill : float
+            Value for cells that are not land pixels.
+
+        Returns
+        -------
+        np.ndarray
+            An array with the pixel dimension replaced by the full grid.
+        """
+        array = np.asarray(array)
+        grid = np.full((*array.shape[:-1], *self.shape), fill, dtype="f8")
+        grid[..., self.rows, self.cols] = array
+        return grid
+
+    @functools.cached_property
+    def weights(self):
+        """Return the area of each land pixel in square kilometers."""
+        resolution = abs(self.lons[1] - self.lons[0])
+        return cell_areas(self.lats, resolution)[self.rows]
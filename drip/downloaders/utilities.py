@@ -39,7 +39,23 @@ from scipy.stats import rankdata
 import drip
 
 from drip.app.options.indices import INDEX_NAMES
+from drip.downloaders.area import category_edges, region_areas, region_grids
+from drip.downloaders.benchmarks import (
+    PACKED_FILL,
+    chunk_layout,
+    disk_chunksizes,
+    pack_array,
+    pack_parameters
+)
+from drip.downloaders.catalog import (
+    BASE_DATE,
+    STATS_CHUNK,
+    Value_Stats,
+    base_days,
+    update_catalog
+)
 from drip.downloaders.index_info import HOSTS, SPATIAL_REFERENCES
+from drip.downloaders.land import Land_Pixels
 from drip.loggers import init_logger, set_handler
 
 logger = init_logger(__name__)
@@ -163,7 +179,7 @@ class NetCDF(Adjustments):
     """Methods for building, combining, and warping netcdf files."""
 
     def __init__(self, index, resolution=0.25, directory=None,
-                 percentile=False, projected=False):
+                 percentile=False, packed=False):
         """Initialize NetCDF object.
 
         Parameters
@@ -176,8 +192,10 @@ class NetCDF(Adjustments):
             drip.app.options.indices.INDEX_NAMES.
         percentile : boolean
             Build netcdf as ranked percentiles relative to the full record.
-        projected : boolean
-            Build netcdf and project to EPSG:5070.
+        packed : boolean
+            Store values as zlib compressed int16 integers with a
+            scale_factor and add_offset spanning the index's value range,
+            instead of float32.
         """
         if not directory:
             home = self.paths["indices"]
@@ -189,7 +207,7 @@ class NetCDF(Adjustments):
         self.host = HOSTS[index]
         self.index = index
         self.percentile = percentile
-        self.projected = projected
+        self.packed = packed
         self.today = np.datetime64(dt.datetime.today())
         self._set_logger()
 
@@ -247,16 +265,13 @@ class NetCDF(Adjustments):
         """Return data home directory."""
         return self.paths["indices"].joinpath(self.index)
 
-    def final_path(self, percentile=False, projected=False):
+    def final_path(self, percentile=False):
         """Return final path for indexed NetCDF file."""
         if percentile:
             modifier = "_percentile"
         else:
             modifier = ""
 
-        if projected:
-            modifier += "_projected"
-
         return self.home.joinpath(f"{self.index}{modifier}.nc")
 
     def to_date(self, date_string):
@@ -278,6 +293,15 @@ class NetCDF(Adjustments):
             ds = ds.sel(time=slice(t1, t2))
         os.remove(file)
         ds.to_netcdf(file)
+        update_catalog(file)
+
+        # Rebuild the companion files on the trimmed time axis
+        percentile = Path(file) == self.final_path(percentile=True)
+        self.build_series(percentile=percentile)
+        self.build_prefix(percentile=percentile)
+        self.build_land(percentile=percentile)
+        if not percentile and category_edges(self.index):
+            self.build_area()
 
     def _add_crs_variable(self, nco, profile):
         """Build and return a spatial referencing variable."""
@@ -323,7 +347,6 @@ class NetCDF(Adjustments):
         """Assemble a new netcdf file with sorted data and time arrays."""
         # Get spatial geometry information
         profile = data[0].profile
-        crs = profile["crs"]
         width = profile["width"]
         height = profile["height"]
 
@@ -332,11 +355,17 @@ class NetCDF(Adjustments):
             sorted_array = self._get_percentiles(sorted_array)
 
         # Create Dataset
-        projected = crs.is_projected
-        dst = self.final_path(percentile=percentile, projected=projected)
+        dst = self.final_path(percentile=percentile)
         if os.path.exists(dst):
             os.remove(dst)
 
+        # Use the benchmarked chunk shape for this file if there is one
+        chunks = chunk_layout(dst.stem)["disk"]
+        chunksizes = disk_chunksizes(chunks, sorted_array.shape)
+
+        # Fit int16 packing to this file's values if requested
+        packing = pack_parameters(sorted_array) if self.packed else None
+
         # Build file
         with netCDF4.Dataset(dst, mode="w", format="NETCDF4") as nco:
 
@@ -349,11 +378,11 @@ class NetCDF(Adjustments):
             latitudes = nco.createVariable("latitude",  "f4", ("latitude",))
             longitudes = nco.createVariable("longitude",  "f4", ("longitude",))
             times = nco.createVariable("time", "f8", ("time",))
-            variable = nco.createVariable(
-                "value",
-                "f4",
+            variable = self._value_variable(
+                nco,
                 ("time", "latitude", "longitude"),
-                fill_value=-9999  # Inferfrom data
+                packing,
+                chunksizes=chunksizes
             )
             variable.standard_name = "data"
             variable.units = "unitless"
@@ -379,13 +408,514 @@ class NetCDF(Adjustments):
             xmin = transform[2]
             yres = transform[4]
             ymax = transform[5]
-            latitudes[:] = [ymax + (i * yres) for i in range(height)]
-            longitudes[:] = [xmin + (i * xres) for i in range(width)]
+            lats = [ymax + (i * yres) for i in range(height)]
+            lons = [xmin + (i * xres) for i in range(width)]
+            latitudes[:] = lats
+            longitudes[:] = lons
             times[:] = sorted_time
-            variable[:, :, :] = sorted_array
+
+            # Write in blocks of time, collecting value statistics as we go
+            stats = Value_Stats()
+            for i in range(0, sorted_array.shape[0], STATS_CHUNK):
+                block = sorted_array[i: i + STATS_CHUNK]
+                if packing:
+                    variable[i: i + STATS_CHUNK, :, :] = pack_array(block)
+                else:
+                    variable[i: i + STATS_CHUNK, :, :] = block
+                stats.update(block)
+
+        # Record the new file in the index catalog
+        update_catalog(dst, stats, sorted_time, list(profile["transform"]))
+
+        # Write pixel-major and land-pixel copies and prefix sums for the app
+        self._assemble_series(sorted_array, sorted_time, lats, lons, dst,
+                              packing=packing)
+        self._assemble_prefix(sorted_array, sorted_time, lats, lons, dst)
+        self._assemble_land(sorted_array, sorted_time, lats, lons, dst,
+                            resolution=xres, packing=packing)
+        if not percentile and category_edges(self.index):
+            self._assemble_area(sorted_array, sorted_time, lats, dst,
+                                resolution=xres)
 
         return dst
 
+    def _assemble_area(self, sorted_array, sorted_time, lats, dst,
+                       resolution=0.25):
+        """Write drought category areas for every standard region.
+
+        For CONUS, each state, and each county, this holds the area in each
+        non-inclusive drought category (D0 - D4) and the area with valid
+        values at each time step, so the app can report drought coverage
+        for those regions without reading the index grid. Data are stored
+        region-major, so one region's full record is a single read.
+
+        Parameters
+        ----------
+        sorted_array : np.ndarray | np.ma.core.MaskedArray
+            A 3D array of original values ordered by time, latitude, and
+            longitude.
+        sorted_time : np.ndarray
+            Days since 1900-01-01 for each time step in `sorted_array`.
+        lats : list
+            Latitude coordinates.
+        dst : str | pathlib.PosixPath
+            Path to the time-major file this is a companion to.
+        resolution : float
+            Resolution of the region rasters to use.
+
+        Returns
+        -------
+        pathlib.PosixPath | None
+            Path to the region area file, or None if the region rasters do
+            not match the index file.
+        """
+        dst = Path(dst)
+        area_dst = dst.parent.joinpath(f"{dst.stem}_area.nc")
+        if os.path.exists(area_dst):
+            os.remove(area_dst)
+
+        grids = region_grids(abs(resolution))
+        if grids[0].shape != sorted_array.shape[1:]:
+            logger.warning("Region raster shape %s does not match %s, "
+                           "skipping region area file.", grids[0].shape, dst)
+            return None
+
+        codes, areas, totals = region_areas(sorted_array, lats,
+                                            abs(resolution), grids,
+                                            self.index)
+
+        with netCDF4.Dataset(area_dst, mode="w", format="NETCDF4") as nco:
+
+            # Dimensions
+            nco.createDimension("region", len(codes))
+            nco.createDimension("time", len(sorted_time))
+            nco.createDimension("category", 5)
+
+            # Variables
+            regions = nco.createVariable("region", "i4", ("region",))
+            times = nco.createVariable("time", "f8", ("time",))
+            categories = nco.createVariable("category", "i1", ("category",))
+            area = nco.createVariable(
+                "area",
+                "f4",
+                ("region", "time", "category"),
+                zlib=True,
+                chunksizes=(1, len(sorted_time), 5)
+            )
+            total = nco.createVariable(
+                "total",
+                "f4",
+                ("region", "time"),
+                zlib=True,
+                chunksizes=(1, len(sorted_time))
+            )
+
+            # Variable Attrs
+            regions.long_name = ("0 for CONUS, state FIPS, or state FIPS * "
+                                 "1000 + county FIPS")
+            times.units = "days since 1900-01-01"
+            times.standard_name = "time"
+            times.calendar = "gregorian"
+            categories.long_name = "Drought category, D0 - D4"
+            area.units = "km2"
+            area.long_name = "Area in each non-inclusive drought category"
+            total.units = "km2"
+            total.long_name = "Area with valid values"
+
+            # Write
+            regions[:] = codes
+            times[:] = sorted_time
+            categories[:] = np.arange(5)
+            area[:] = areas
+            total[:] = totals
+
+        return area_dst
+
+    def _assemble_land(self, sorted_array, sorted_time, lats, lons, dst,
+                       resolution=0.25, packing=None):
+        """Write a time-major copy of the land pixels of an index file.
+
+        This holds only the cells with a grid id in the package grid raster
+        as a (time, pixel) array, along with each pixel's row and column in
+        the full grid. It is stored contiguously, so any run of time steps
+        is a single read.
+
+        Parameters
+        ----------
+        sorted_array : np.ndarray | np.ma.core.MaskedArray
+            A 3D array of values ordered by time, latitude, and longitude.
+        sorted_time : np.ndarray
+            Days since 1900-01-01 for each time step in `sorted_array`.
+        lats : list
+            Latitude coordinates.
+        lons : list
+            Longitude coordinates.
+        dst : str | pathlib.PosixPath
+            Path to the time-major file this is a companion to.
+        resolution : float
+            Resolution of the grid raster to take land pixels from.
+        packing : dict
+            Packing attributes from `pack_parameters`. Writes float32 values
+            if not given.
+
+        Returns
+        -------
+        pathlib.PosixPath | None
+            Path to the land-pixel file, or None if the grid raster does
+            not match the index file.
+        """
+        dst = Path(dst)
+        land_dst = dst.parent.joinpath(f"{dst.stem}_land.nc")
+        if os.path.exists(land_dst):
+            os.remove(land_dst)
+
+        land = Land_Pixels.from_grid(abs(resolution))
+        if land.shape != sorted_array.shape[1:]:
+            logger.warning("Grid raster shape %s does not match %s, skipping "
+                           "land-pixel file.", land.shape, dst)
+            return None
+
+        with netCDF4.Dataset(land_dst, mode="w", format="NETCDF4") as nco:
+
+            # Contiguous storage requires a fixed time dimension
+            nco.createDimension("time", len(sorted_time))
+            nco.createDimension("pixel", land.size)
+            nco.createDimension("latitude", len(lats))
+            nco.createDimension("longitude", len(lons))
+
+            # Variables
+            latitudes = nco.createVariable("latitude",  "f4", ("latitude",))
+            longitudes = nco.createVariable("longitude",  "f4", ("longitude",))
+            times = nco.createVariable("time", "f8", ("time",))
+            rows = nco.createVariable("row", "i4", ("pixel",))
+            cols = nco.createVariable("col", "i4", ("pixel",))
+            variable = self._value_variable(
+                nco,
+                ("time", "pixel"),
+                packing,
+                compress=False,
+                contiguous=True
+            )
+            variable.standard_name = "data"
+            variable.units = "unitless"
+            variable.long_name = "Index Value"
+            rows.long_name = "Row of each pixel in the full grid"
+            cols.long_name = "Column of each pixel in the full grid"
+
+            # Variable Attrs
+            times.units = "days since 1900-01-01"
+            times.standard_name = "time"
+            times.calendar = "gregorian"
+            latitudes.units = "degrees_south"
+            latitudes.standard_name = "latitude"
+            longitudes.units = "degrees_east"
+            longitudes.standard_name = "longitude"
+
+            # Write
+            latitudes[:] = lats
+            longitudes[:] = lons
+            times[:] = sorted_time
+            rows[:] = land.rows
+            cols[:] = land.cols
+            array = land.pack(sorted_array)
+            if packing:
+                array = pack_array(array)
+            variable[:, :] = array
+
+        return land_dst
+
+    def _assemble_prefix(self, sorted_array, sorted_time, lats, lons, dst):
+        """Write cumulative sums and counts by calendar month.
+
+        For each month, the value at year index k is the sum (or count of
+        non-missing values) over all years before `year[k]`. The sum over any
+        range of years for that month is then the difference of two slices,
+        so a mean over any date range and month filter reads at most two
+        slices per selected month, regardless of how many years it spans.
+
+        Parameters
+        ----------
+        sorted_array : np.ndarray | np.ma.core.MaskedArray
+            A 3D array of values ordered by time, latitude, and longitude.
+        sorted_time : np.ndarray
+            Days since 1900-01-01 for each time step in `sorted_array`.
+        lats : list
+            Latitude coordinates.
+        lons : list
+            Longitude coordinates.
+        dst : str | pathlib.PosixPath
+            Path to the time-major file this is a companion to.
+
+        Returns
+        -------
+        pathlib.PosixPath
+            Path to the prefix sum file.
+        """
+        dst = Path(dst)
+        prefix_dst = dst.parent.joinpath(f"{dst.stem}_prefix.nc")
+        if os.path.exists(prefix_dst):
+            os.remove(prefix_dst)
+
+        # Find the year and month of each time step
+        dates = pd.DatetimeIndex(
+            [BASE_DATE + dt.timedelta(days=int(day)) for day in sorted_time]
+        )
+        first = dates.year.min()
+        nyears = dates.year.max() - first + 1
+
+        with netCDF4.Dataset(prefix_dst, mode="w", format="NETCDF4") as nco:
+
+            # Dimensions
+            nco.createDimension("month", 12)
+            nco.createDimension("year", nyears + 1)
+            nco.createDimension("latitude", len(lats))
+            nco.createDimension("longitude", len(lons))
+
+            # Variables
+            months = nco.createVariable("month", "i2", ("month",))
+            years = nco.createVariable("year", "i2", ("year",))
+            latitudes = nco.createVariable("latitude",  "f4", ("latitude",))
+            longitudes = nco.createVariable("longitude",  "f4", ("longitude",))
+            dims = ("month", "year", "latitude", "longitude")
+            sums = nco.createVariable("sums", "f8", dims, zlib=True,
+                                      chunksizes=(1, 1, len(lats), len(lons)))
+            counts = nco.createVariable("counts", "i2", dims, zlib=True,
+                                        chunksizes=(1, 1, len(lats),
+                                                    len(lons)))
+            sums.long_name = "Sum of values in all prior years for this month"
+            counts.long_name = ("Count of non-missing values in all prior "
+                                "years for this month")
+
+            # Variable Attrs
+            years.long_name = "First year not included in the prefix"
+            latitudes.units = "degrees_south"
+            latitudes.standard_name = "latitude"
+            longitudes.units = "degrees_east"
+            longitudes.standard_name = "longitude"
+            latitudes[:] = lats
+            longitudes[:] = lons
+            months[:] = np.arange(1, 13)
+            years[:] = np.arange(first, first + nyears + 1)
+
+            # One calendar month at a time to limit memory use
+            for month in range(1, 13):
+                idx = np.where(dates.month == month)[0]
+                values = np.full((nyears, len(lats), len(lons)), np.nan)
+                array = np.ma.filled(sorted_array[idx].astype("f8"), np.nan)
+                array[array == -9999] = np.nan
+                values[np.asarray(dates.year[idx]) - first] = array
+
+                # Missing values add nothing to either sum
+                finite = np.isfinite(values)
+                values[~finite] = 0
+                cumsum = np.zeros((nyears + 1, len(lats), len(lons)))
+                cumcount = np.zeros((nyears + 1, len(lats), len(lons)),
+                                    dtype="i2")
+                cumsum[1:] = np.cumsum(values, axis=0)
+                cumcount[1:] = np.cumsum(finite, axis=0)
+
+                sums[month - 1] = cumsum
+                counts[month - 1] = cumcount
+
+        return prefix_dst
+
+    def _assemble_series(self, sorted_array, sorted_time, lats, lons, dst,
+                         packing=None):
+        """Write a pixel-major copy of an assembled index file.
+
+        The main file is laid out by time step, which suits maps but spreads a
+        single cell's record across the whole file. This writes the same
+        values with time as the fastest varying dimension and no chunking, so
+        each cell's full record is a single contiguous read.
+
+        Parameters
+        ----------
+        sorted_array : np.ndarray | np.ma.core.MaskedArray
+            A 3D array of values ordered by time, latitude, and longitude.
+        sorted_time : np.ndarray
+            Days since 1900-01-01 for each time step in `sorted_array`.
+        lats : list
+            Latitude coordinates.
+        lons : list
+            Longitude coordinates.
+        dst : str | pathlib.PosixPath
+            Path to the time-major file this is a companion to.
+        packing : dict
+            Packing attributes from `pack_parameters`. Writes float32 values
+            if not given. Packed values are not compressed here, since that
+            would break the contiguous layout.
+
+        Returns
+        -------
+        pathlib.PosixPath
+            Path to the pixel-major file.
+        """
+        dst = Path(dst)
+        series_dst = dst.parent.joinpath(f"{dst.stem}_series.nc")
+        if os.path.exists(series_dst):
+            os.remove(series_dst)
+
+        with netCDF4.Dataset(series_dst, mode="w", format="NETCDF4") as nco:
+
+            # Contiguous storage requires a fixed time dimension
+            nco.createDimension("latitude", len(lats))
+            nco.createDimension("longitude", len(lons))
+            nco.createDimension("time", len(sorted_time))
+
+            # Variables
+            latitudes = nco.createVariable("latitude",  "f4", ("latitude",))
+            longitudes = nco.createVariable("longitude",  "f4", ("longitude",))
+            times = nco.createVariable("time", "f8", ("time",))
+            variable = self._value_variable(
+                nco,
+                ("latitude", "longitude", "time"),
+                packing,
+                compress=False,
+                contiguous=True
+            )
+            variable.standard_name = "data"
+            variable.units = "unitless"
+            variable.long_name = "Index Value"
+
+            # Variable Attrs
+            times.units = "days since 1900-01-01"
+            times.standard_name = "time"
+            times.calendar = "gregorian"
+            latitudes.units = "degrees_south"
+            latitudes.standard_name = "latitude"
+            longitudes.units = "degrees_east"
+            longitudes.standard_name = "longitude"
+
+            # Write with time moved to the last axis
+            latitudes[:] = lats
+            longitudes[:] = lons
+            times[:] = sorted_time
+            array = np.moveaxis(sorted_array, 0, -1)
+            if packing:
+                array = pack_array(array)
+            variable[:, :, :] = array
+
+        return series_dst
+
+    def build_series(self, percentile=False):
+        """Write the pixel-major companion for an existing index file.
+
+        Parameters
+        ----------
+        percentile : boolean
+            Use the percentile version of the index file.
+
+        Returns
+        -------
+        pathlib.PosixPath
+            Path to the pixel-major file.
+        """
+        src = self.final_path(percentile=percentile)
+        with netCDF4.Dataset(src) as data:
+            array = data["value"][:]
+            time = base_days(data["time"])
+            lats = data["latitude"][:]
+            lons = data["longitude"][:]
+        packing = pack_parameters(array) if self.packed else None
+        return self._assemble_series(array, time, lats, lons, src,
+                                     packing=packing)
+
+    def build_land(self, percentile=False):
+        """Write the land-pixel companion for an existing index file.
+
+        Parameters
+        ----------
+        percentile : boolean
+            Use the percentile version of the index file.
+
+        Returns
+        -------
+        pathlib.PosixPath | None
+            Path to the land-pixel file.
+        """
+        src = self.final_path(percentile=percentile)
+        with netCDF4.Dataset(src) as data:
+            array = data["value"][:]
+            time = base_days(data["time"])
+            lats = data["latitude"][:]
+            lons = data["longitude"][:]
+            resolution = data["crs"].GeoTransform[0]
+        packing = pack_parameters(array) if self.packed else None
+        return self._assemble_land(array, time, lats, lons, src,
+                                   resolution=resolution, packing=packing)
+
+    def build_area(self):
+        """Write the region area companion for an existing index file.
+
+        Returns
+        -------
+        pathlib.PosixPath | None
+            Path to the region area file.
+        """
+        src = self.final_path(percentile=False)
+        with netCDF4.Dataset(src) as data:
+            array = data["value"][:]
+            time = base_days(data["time"])
+            lats = data["latitude"][:]
+            resolution = data["crs"].GeoTransform[0]
+        return self._assemble_area(array, time, lats, src,
+                                   resolution=resolution)
+
+    def build_prefix(self, percentile=False):
+        """Write the prefix sum companion for an existing index file.
+
+        Parameters
+        ----------
+        percentile : boolean
+            Use the percentile version of the index file.
+
+        Returns
+        -------
+        pathlib.PosixPath
+            Path to the prefix sum file.
+        """
+        src = self.final_path(percentile=percentile)
+        with netCDF4.Dataset(src) as data:
+            array = data["value"][:]
+            time = base_days(data["time"])
+            lats = data["latitude"][:]
+            lons = data["longitude"][:]
+        return self._assemble_prefix(array, time, lats, lons, src)
+
+    def _value_variable(self, nco, dims, packing=None, compress=True,
+                        **kwargs):
+        """Create the "value" variable as float32 or packed int16.
+
+        Parameters
+        ----------
+        nco : netCDF4._netCDF4.Dataset
+            An open, writable NetCDF dataset.
+        dims : tuple
+            Dimension names of the variable.
+        packing : dict
+            Packing attributes from `pack_parameters`. Creates a float32
+            variable if not given.
+        compress : boolean
+            Use zlib compression with byte shuffling for packed values.
+        **kwargs
+            Other keyword arguments for `createVariable` (e.g. chunksizes).
+
+        Returns
+        -------
+        netCDF4._netCDF4.Variable
+            The new variable. Packed variables scale floats on write.
+        """
+        if packing:
+            if compress:
+                kwargs.update({"zlib": True, "shuffle": True})
+            variable = nco.createVariable("value", "i2", dims,
+                                          fill_value=PACKED_FILL, **kwargs)
+            variable.setncatts(packing)
+        else:
+            variable = nco.createVariable("value", "f4", dims,
+                                          fill_value=-9999, **kwargs)
+        return variable
+
     def _get_geometry(self, data):
         """Get spatial geometric information from netcdf object or file.
 
@@ -502,7 +1032,7 @@ class NetCDF(Adjustments):
         set_handler(logger, filename)
 
     def _warp(self, src, dst, dst_srs="epsg:4326", xres=None, yres=None):
-        """Reproject array to epsg:5070.
+        """Warp a raster to a spatial reference and resolution.
 
         Adding ram will almost certainly increase the speed. That’s not at all the same as saying that it is worth it, or that the speed increase will be significant. Disks are the slowest part of the process.
         By default gdalwarp won't take much advantage of RAM. Using the flag "-wm 500" will operate on 500MB chunks at a time which is better than the default. To increase the io block cache size may also help. This can be done on the command like:
@@ -553,9 +1083,9 @@ class NetCDF(Adjustments):
 class EDDI(NetCDF):
     """Methods for retrieving EDDI files."""
 
-    def __init__(self, index):
+    def __init__(self, index, packed=False):
         """Initialize EDDI object."""
-        super().__init__(index)
+        super().__init__(index, packed=packed)
         self.period = int(index.replace("eddi", ""))
         self.target_dir = self.home.joinpath("originals")
         self.target_dir.mkdir(exist_ok=True, parents=True)
@@ -626,7 +1156,7 @@ class EDDI(NetCDF):
                     file.write(array[i], band)
                     file.update_tags(band, **meta)
 
-        # Reproject and resample
+        # Resample
         self._adjust_eddi()
 
     @property
@@ -653,29 +1183,19 @@ class EDDI(NetCDF):
         """Resample all downloaded monthly files to target resolution."""
         # Collect all needed arguments
         resample_list = []
-        reproject_list = []
         monthlies = list(self.home.joinpath("originals").glob("*tif"))
         monthlies.sort()
         for src in monthlies:
             rs_name = src.name.replace(".tif", "_resampled.tif")
-            rp_name = src.name.replace(".tif", "_reprojected.tif")
             rs_dst = src.parent.joinpath(rs_name)
-            rp_dst = src.parent.joinpath(rp_name)
             rs_args = [src, rs_dst, "epsg:4326", resolution, -resolution]
-            rp_args = [rs_dst, rp_dst, "epsg:5070", None, None]
             resample_list.append(rs_args)
-            reproject_list.append(rp_args)
 
         # Resample
         with ThreadPool(os.cpu_count() - 1) as pool:
             for _ in pool.starmap(self._warp, resample_list):
                 pass
 
-        # Reproject
-        with ThreadPool(os.cpu_count() - 1) as pool:
-            for _ in pool.starmap(self._warp, reproject_list):
-                pass
-
     def _get(self, path):
         """Download path from an FTP server. Add error handling/logging."""
         dst = str(self.target_dir.joinpath(path.name))
@@ -705,9 +1225,9 @@ class EDDI(NetCDF):
 class PRISM(NetCDF):
     """Methods for downloading and formatting PRISM datasets."""
 
-    def __init__(self, index):
+    def __init__(self, index, packed=False):
         """Initialize PRISM Object."""
-        super().__init__(index)
+        super().__init__(index, packed=packed)
         self.prism_ftp_args = [
             "prism.nacse.org",
             "anonymous"
@@ -772,7 +1292,7 @@ class PRISM(NetCDF):
                     file.write(array[i], band)
                     file.update_tags(band, **meta)
 
-        # Reproject and resample
+        # Resample
         self._adjust_prism()
 
     @property
@@ -808,30 +1328,20 @@ class PRISM(NetCDF):
         """Resample all downloaded monthly files to target resolution."""
         # Collect all needed arguments
         resample_list = []
-        reproject_list = []
         resolution = resolution
         monthlies = list(self.home.joinpath("originals").glob("*tif"))
         monthlies.sort()
         for src in monthlies:
             rs_name = src.name.replace(".tif", "_resampled.tif")
-            rp_name = src.name.replace(".tif", "_reprojected.tif")
             rs_dst = src.parent.joinpath(rs_name)
-            rp_dst = src.parent.joinpath(rp_name)
             rs_args = [src, rs_dst, "epsg:4326", resolution, -resolution]
-            rp_args = [rs_dst, rp_dst, "epsg:5070", None, None]
             resample_list.append(rs_args)
-            reproject_list.append(rp_args)
 
         # Resample
         with ThreadPool(os.cpu_count() - 1) as pool:
             for _ in pool.starmap(self._warp, resample_list):
                 pass
 
-        # Reproject
-        with ThreadPool(os.cpu_count() - 1) as pool:
-            for _ in pool.starmap(self._warp, reproject_list):
-                pass
-
     def _get(self, path):
         """Download path from an FTP server. Add error handling/logging."""
         dst = str(self.target_dir.joinpath(path.name))
@@ -859,7 +1369,7 @@ class PRISM(NetCDF):
 class Data_Builder(NetCDF):
     """Methods for downloading and formatting data from various sources."""
 
-    def __init__(self, index, resolution=0.25, template=None):
+    def __init__(self, index, resolution=0.25, template=None, packed=False):
         """Initialize Data_Builder object.
 
         Parameters
@@ -870,8 +1380,10 @@ class Data_Builder(NetCDF):
             Resolution of target drought index NetCDF4 file in decimal degrees.
         template : str
             Path to file to use as template for georeferencing.
+        packed : boolean
+            Store values as compressed, scaled int16 integers.
         """
-        super().__init__(index)
+        super().__init__(index, packed=packed)
         self.host = HOSTS[index]
         self.resolution = resolution
         self.template = template
@@ -889,10 +1401,8 @@ class Data_Builder(NetCDF):
     def build(self, overwrite=True):
         """Download and combine multiple NetCDF files from WWDT into one."""
         dsts = [
-            self.final_path(percentile=False, projected=False),
-            self.final_path(percentile=False, projected=True),
-            self.final_path(percentile=True, projected=False),
-            self.final_path(percentile=True, projected=True)
+            self.final_path(percentile=False),
+            self.final_path(percentile=True)
         ]
         if all(map(os.path.exists, dsts)) and not overwrite:
             logger.info("%s exists, skipping.", dsts[0])
@@ -902,11 +1412,11 @@ class Data_Builder(NetCDF):
 
             # Different download methods for different data sources
             if self.index.startswith("eddi"):
-                eddi = EDDI(self.index)
+                eddi = EDDI(self.index, packed=self.packed)
                 eddi.download_eddi()
                 eddi.format_eddi()
             elif "prism" in self.host:
-                prism = PRISM(self.index)
+                prism = PRISM(self.index, packed=self.packed)
                 prism.download_prism()
                 prism._unzip_prism()
                 prism.format_prism()
@@ -917,6 +1427,12 @@ class Data_Builder(NetCDF):
             # Combine into single files for each index
             self._combine()
 
+            # Area statistics are weighted by cell area now, so older
+            # equal-area projected copies are no longer needed
+            for old in self.home.glob("*_projected.nc"):
+                logger.info("Removing %s...", old)
+                os.remove(old)
+
             # Trim dates for WWDT
             if "wrcc.dri.edu" in self.host:
                 for dst in dsts:
@@ -951,35 +1467,23 @@ class Data_Builder(NetCDF):
         """Resample all downloaded monthly files to target resolution."""
         # Collect all needed arguments
         resample_list = []
-        reproject_list = []
         resolution = self.resolution
         for entry in self.download_paths:
             src = entry["local"]
             rs_name = src.name.replace(".nc", "_resampled.tif")
-            rp_name = src.name.replace(".nc", "_reprojected.tif")
             rs_dst = src.parent.joinpath(rs_name)
-            rp_dst = src.parent.joinpath(rp_name)
             rs_args = [src, rs_dst, "epsg:4326", resolution, -resolution]
-            rp_args = [rs_dst, rp_dst, "epsg:5070", None, None]
             resample_list.append(rs_args)
-            reproject_list.append(rp_args)
 
         # Resample
         with ThreadPool(os.cpu_count() - 1) as pool:
             for _ in pool.starmap(self._warp, resample_list):
                 pass
 
-        # Reproject
-        with ThreadPool(os.cpu_count() - 1) as pool:
-            for _ in pool.starmap(self._warp, reproject_list):
-                pass
-
     def _combine(self):
         """Combine all data into required data set."""
         main_paths = self.home.joinpath("originals").glob("*resampled.tif")
-        proj_paths = self.home.joinpath("originals").glob("*reprojected.tif")
         self.combine(main_paths)
-        self.combine(proj_paths)
 
     def _set_index(self, index):
         """Set the index key and index name.
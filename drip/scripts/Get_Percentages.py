@@ -52,7 +52,7 @@ resolution = 0.25
 admin = Admin_Elements(resolution)
 
 [state_array, county_array, grid, mask,
- source, albers_source, crdict, admin_df] = admin.getElements()
+ source, crdict, admin_df] = admin.getElements()
 
 # In[] Specifications
 year_range = [2000, 2017]
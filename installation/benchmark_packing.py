@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Compare float32 and packed int16 storage for each index file."""
+import sys
+
+import pandas as pd
+
+from drip import Paths
+from drip.app.options.options import INDEX_NAMES
+from drip.downloaders.benchmarks import Packing_Benchmark
+from drip.loggers import init_logger, set_handler
+
+logger = init_logger(__name__)
+set_handler(logger, Paths.home.joinpath("installation/benchmark_packing.log"))
+
+
+def main():
+    """Benchmark both storage modes for every built index file."""
+    dfs = []
+    for index in INDEX_NAMES:
+        for percentile in [False, True]:
+            bench = Packing_Benchmark(index, percentile=percentile)
+            if not bench.src.exists():
+                continue
+            print(f"Benchmarking {bench.src.name}...")
+            try:
+                df = bench.benchmark()
+                df.insert(0, "file", bench.src.name)
+                dfs.append(df)
+                print(df.to_string(index=False))
+            except Exception as error:
+                print(f" {bench.src.name} benchmark failed: {error}")
+                logger.error("%s benchmark failed: %s.", bench.src.name,
+                             error, stack_info=sys.exc_info(), stacklevel=1)
+
+    if dfs:
+        df = pd.concat(dfs)
+        sizes = df.groupby("mode")["size_mb"].sum()
+        print(f"Total size (MB):\n{sizes.to_string()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Compile the administrative element bundle for each app resolution."""
+import sys
+
+from drip import Paths
+from drip.app.old.functions import Admin_Elements
+from drip.loggers import init_logger, set_handler
+
+logger = init_logger(__name__)
+set_handler(logger, Paths.home.joinpath("installation/build_bundle.log"))
+
+
+RESOLUTIONS = [0.25, 0.125]
+
+
+def main():
+    """Write data/rasters/admin_bundle_<res>.bin for each resolution."""
+    for resolution in RESOLUTIONS:
+        admin = Admin_Elements(resolution)
+        print(f"Compiling {admin.bundle_path.name}...")
+        try:
+            admin.buildBundle()
+        except Exception as error:
+            print(f" {admin.bundle_path.name} failed: {error}")
+            logger.error("%s failed: %s.", admin.bundle_path.name, error,
+                         stack_info=sys.exc_info(), stacklevel=1)
+
+
+if __name__ == "__main__":
+    main()
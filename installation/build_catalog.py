@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Record catalog entries for existing index files."""
+import sys
+
+from drip import Paths
+from drip.app.options.options import INDEX_NAMES
+from drip.downloaders.catalog import index_path, update_catalog
+from drip.loggers import init_logger, set_handler
+
+logger = init_logger(__name__)
+set_handler(logger, Paths.home.joinpath("installation/build_catalog.log"))
+
+
+def main():
+    """Describe every built index file in the index catalog."""
+    for index in INDEX_NAMES:
+        for modifier in ["", "_percentile"]:
+            path = index_path(f"{index}{modifier}")
+            if not path.exists():
+                continue
+            print(f"Cataloging {path.name}...")
+            try:
+                update_catalog(path)
+            except Exception as error:
+                print(f" {path.name} catalog failed: {error}")
+                logger.error("%s catalog failed: %s.", path.name, error,
+                             stack_info=sys.exc_info(), stacklevel=1)
+
+
+if __name__ == "__main__":
+    main()
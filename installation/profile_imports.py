@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Report the import time of the app, by module and by package.
+
+Runs `python -X importtime -c "import drip.app.index"` (or another module
+given as the first argument) in a fresh interpreter and summarizes the
+cumulative import time of each module and the time spent in each top level
+package, so heavy imports on the worker boot path are easy to find.
+"""
+import subprocess
+import sys
+
+import pandas as pd
+
+from drip import Paths
+from drip.loggers import init_logger, set_handler
+
+logger = init_logger(__name__)
+set_handler(logger, Paths.home.joinpath("installation/profile_imports.log"))
+
+
+MODULE = "drip.app.index"
+TOP = 30  # Rows printed in each table
+
+
+def import_times(module=MODULE):
+    """Return a table of the import time of every module loaded by module.
+
+    Parameters
+    ----------
+    module : str
+        Module to import in a fresh interpreter.
+
+    Returns
+    -------
+    pd.DataFrame
+        The self and cumulative import time of each module in milliseconds,
+        with its top level package.
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    result = subprocess.run(cmd, capture_output=True, text=True,
+                            cwd=str(Paths.home))
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[12:].split("|")
+        name = name.rstrip()
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+        logger.error("Importing %s failed: %s", module, error)
+        print(f"Importing {module} failed: {error}")
+
+    df = pd.DataFrame(rows, columns=["module", "depth", "self_ms",
+                                     "cumulative_ms"])
+    df["package"] = df["module"].str.split(".").str[0]
+    return df
+
+
+def main():
+    """Print the slowest modules and packages to import."""
+    module = sys.argv[1] if len(sys.argv) > 1 else MODULE
+    df = import_times(module)
+    if df.empty:
+        return
+
+    total = df["self_ms"].sum()
+    print(f"Importing {module}: {total:,.0f} ms, {len(df)} modules\n")
+
+    modules = df.sort_values("cumulative_ms", ascending=False)
+    print(modules.head(TOP).to_string(index=False), "\n")
+
+    packages = df.groupby("package")["self_ms"].agg(["sum", "count"])
+    packages.columns = ["self_ms", "modules"]
+    packages = packages.sort_values("self_ms", ascending=False)
+    packages["share"] = (packages["self_ms"] / total * 100).round(1)
+    print(packages.head(TOP).to_string())
+
+
+if __name__ == "__main__":
+    main()
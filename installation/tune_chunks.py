@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Benchmark chunk shapes for each index file and record the fastest."""
+import sys
+
+from drip import Paths
+from drip.app.options.options import INDEX_NAMES
+from drip.downloaders.benchmarks import Chunk_Tuner
+from drip.loggers import init_logger, set_handler
+
+logger = init_logger(__name__)
+set_handler(logger, Paths.home.joinpath("installation/tune_chunks.log"))
+
+
+def main():
+    """Find the best chunk layout for every built index file."""
+    for index in INDEX_NAMES:
+        for percentile in [False, True]:
+            tuner = Chunk_Tuner(index, percentile=percentile)
+            if not tuner.src.exists():
+                continue
+            print(f"Benchmarking {tuner.src.name}...")
+            try:
+                layout = tuner.tune()
+                print(f"  {layout}")
+            except Exception as error:
+                print(f" {tuner.src.name} benchmark failed: {error}")
+                logger.error("%s benchmark failed: %s.", tuner.src.name, error,
+                             stack_info=sys.exc_info(), stacklevel=1)
+
+
+if __name__ == "__main__":
+    main()
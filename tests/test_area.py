@@ -0,0 +1,78 @@
+"""Tests for the drought category kernel in drip.downloaders.area."""
+import numpy as np
+import pytest
+
+pytest.importorskip("rasterio")
+
+from drip.downloaders.area import (  # noqa: E402
+    DROUGHT_CATEGORIES,
+    category_areas,
+    category_counts,
+    category_edges,
+    coverage
+)
+
+
+def catLoop(arrays, cats):
+    """Return coverage the way Index_Maps.getArea did, one category at a
+    time over a (time, pixel) array."""
+    totals = np.isfinite(arrays).sum(axis=1)
+    pnincs = []
+    for i in range(5):
+        d = cats[i]
+        with np.errstate(invalid="ignore"):
+            counts = ((arrays < d[0]) & (arrays >= d[1])).sum(axis=1)
+            pnincs.append(counts / totals * 100)
+    pnincs = np.array(pnincs)
+    pincs = [np.sum(pnincs[i:], axis=0) for i in range(len(pnincs))]
+    pnacc = np.array([pnincs[i] * (i + 1) for i in range(5)])
+    dsci = list(np.nansum(pnacc, axis=0))
+    return [list(a) for a in pincs], [list(p) for p in pnincs], dsci
+
+
+@pytest.mark.parametrize("index", ["pdsi", "spei6", "eddi1", "leri3"])
+def test_coverage(index):
+    """One-pass counts give the same coverage as the per-category loop."""
+    key = [key for key in DROUGHT_CATEGORIES if key in index][0]
+    cats = DROUGHT_CATEGORIES[key]
+    edges = category_edges(index)
+    rng = np.random.default_rng(0)
+    arrays = rng.normal(-1.5, 2, (12, 200))
+
+    # Missing values, every category edge, and values below the last edge
+    arrays[rng.random(arrays.shape) < 0.1] = np.nan
+    arrays[:, :len(edges)] = edges
+    arrays[0, -1] = -1500
+    arrays[1] = np.nan
+
+    expected = catLoop(arrays, cats)
+    areas, totals = category_areas(category_counts(arrays, edges))
+    result = coverage(areas, totals)
+
+    for values, expected_values in zip(result, expected):
+        np.testing.assert_allclose(values, expected_values)
+
+
+def test_weights_and_groups():
+    """Weighted and grouped counts match counting each group separately."""
+    edges = category_edges("pdsi")
+    rng = np.random.default_rng(1)
+    arrays = rng.normal(-2, 2, (6, 50))
+    arrays[rng.random(arrays.shape) < 0.1] = np.nan
+    weights = rng.random(50)
+    groups = rng.integers(0, 3, 50)
+
+    counts = category_counts(arrays, edges, weights, groups)
+    assert counts.shape == (6, 3, len(edges) + 1)
+    for group in range(3):
+        inside = groups == group
+        expected = category_counts(arrays[:, inside], edges, weights[inside])
+        np.testing.assert_allclose(counts[:, group], expected)
+
+    totals = category_counts(arrays, edges, weights).sum(axis=-1)
+    np.testing.assert_allclose(totals, np.isfinite(arrays) @ weights)
+
+
+def test_no_categories():
+    """Indices without drought categories have no edges."""
+    assert category_edges("tmax") is None
@@ -0,0 +1,32 @@
+"""Tests for array bundles in drip.downloaders.bundle."""
+import numpy as np
+import pandas as pd
+
+from drip.downloaders.bundle import read_bundle, write_bundle
+
+
+def test_round_trip(tmp_path):
+    """Arrays and attributes are read back as they were written."""
+    path = tmp_path.joinpath("bundle.bin")
+    arrays = {
+        "grid": np.arange(12, dtype="f8").reshape(3, 4),
+        "codes": np.array([6, 8, 41], dtype="i4"),
+        "empty": np.array([], dtype="f4")
+    }
+    write_bundle(path, arrays, {"resolution": 0.25})
+    result, attrs = read_bundle(path)
+
+    assert attrs == {"resolution": 0.25}
+    for name, array in arrays.items():
+        assert result[name].dtype == array.dtype
+        np.testing.assert_array_equal(result[name], array)
+
+
+def test_missing_text(tmp_path):
+    """Missing values in text columns are stored as empty strings."""
+    path = tmp_path.joinpath("bundle.bin")
+    places = pd.Series(["Boulder", None, np.nan, "Denver"], dtype=object)
+    write_bundle(path, {"place": places.values})
+    result, _ = read_bundle(path)
+
+    assert result["place"].tolist() == ["Boulder", "", "", "Denver"]
@@ -0,0 +1,77 @@
+"""Tests for the index catalog in drip.downloaders.catalog."""
+import os
+
+import netCDF4
+import numpy as np
+import pytest
+
+from drip.downloaders import catalog
+
+
+def writeIndex(path, ntime, mtime):
+    """Write a bare index file with ntime monthly values."""
+    with netCDF4.Dataset(path, "w") as data:
+        data.createDimension("time", None)
+        times = data.createVariable("time", "f8", ("time",))
+        times.units = "days since 1900-01-01"
+        times[:] = 30000 + np.arange(ntime) * 30
+        crs = data.createVariable("crs", "c")
+        crs.GeoTransform = [-130, 0.25, 0, 50, 0, -0.25]
+        values = data.createVariable("value", "f4", ("time",))
+        values[:] = np.arange(ntime)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    """Point the catalog at a temporary table and index file."""
+    path = tmp_path.joinpath("pdsi.nc")
+    monkeypatch.setattr(catalog, "CATALOG_PATH", tmp_path.joinpath("c.json"))
+    monkeypatch.setattr(catalog, "index_path", lambda stem: path)
+    catalog.index_catalog.cache_clear()
+    yield path
+    catalog.index_catalog.cache_clear()
+
+
+def test_missing_entry(index):
+    """A missing entry is built from the time and crs variables only."""
+    writeIndex(index, 10, 1_000_000)
+    entry = catalog.catalog_entry("pdsi")
+
+    assert entry["time_steps"] == 10
+    assert entry["value_std"] is None
+    assert catalog.catalog_entry("pdsi") is entry
+
+
+def test_rebuilt_file(index):
+    """An entry is refreshed when its file changes."""
+    writeIndex(index, 10, 1_000_000)
+    catalog.update_catalog(index)
+    assert catalog.catalog_entry("pdsi")["time_steps"] == 10
+
+    # Rebuilt but not yet recorded
+    writeIndex(index, 5, 2_000_000)
+    entry = catalog.catalog_entry("pdsi")
+    assert entry["time_steps"] == 5
+    assert entry["mtime"] == 2_000_000
+
+    # Recorded, with statistics
+    catalog.update_catalog(index)
+    entry = catalog.catalog_entry("pdsi")
+    assert entry["time_steps"] == 5
+    assert entry["value_std"] == pytest.approx(np.std(np.arange(5)))
+
+
+def test_base_days(tmp_path):
+    """Times in any units are returned as days since 1900-01-01."""
+    path = tmp_path.joinpath("times.nc")
+    with netCDF4.Dataset(path, "w") as data:
+        data.createDimension("time", None)
+        times = data.createVariable("time", "f8", ("time",))
+        times.units = "hours since 1950-01-01 00:00:00"
+        times.calendar = "gregorian"
+        times[:] = [0, 24 * 31]
+
+    with netCDF4.Dataset(path) as data:
+        days = catalog.base_days(data["time"])
+    np.testing.assert_allclose(days, [18262, 18293])
@@ -0,0 +1,52 @@
+"""Tests for the download helpers in drip.app.pages.main.export."""
+import io
+
+import numpy as np
+import pytest
+
+pytest.importorskip("rasterio")
+
+from drip.app.pages.main.export import clipMap, iterTables  # noqa: E402
+
+
+def test_clipMap():
+    """Maps are clipped to the mask's rows and columns."""
+    array = np.arange(20, dtype="f4").reshape(4, 5)
+    mask = np.zeros((4, 5))
+    mask[1, 2] = mask[2, 3] = 1
+    values, lats, lons = clipMap(array, mask, np.arange(4), np.arange(5))
+
+    np.testing.assert_array_equal(lats, [1, 2])
+    np.testing.assert_array_equal(lons, [2, 3])
+    np.testing.assert_array_equal(values, [[7, np.nan], [np.nan, 13]])
+
+
+def test_clipMap_empty():
+    """A mask without any cells has nothing to clip."""
+    array = np.ones((4, 5))
+    assert clipMap(array, np.zeros((4, 5)), np.arange(4), np.arange(5)) is None
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_iterTables(fmt):
+    """Each table is sent as it is written and the pieces make one file."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    header = ["month", "value", "function", "location", "index"]
+    tables = [{"month": ["2000-01", "2000-02"], "value": [1.0, np.nan],
+               "function": "omean", "location": "Boulder", "index": index}
+              for index in ["pdsi", "spi1", "spei1"]]
+    chunks = list(iterTables(iter(tables), header, fmt))
+    assert len(chunks) == len(tables) + 1
+    assert all(chunks[:-1])
+
+    data = b"".join(chunks)
+    if fmt == "parquet":
+        table = pq.read_table(io.BytesIO(data))
+    else:
+        table = pa.ipc.open_file(pa.BufferReader(data)).read_all()
+    assert table.column_names == header
+    assert table.column("index").to_pylist() == [
+        "pdsi", "pdsi", "spi1", "spi1", "spei1", "spei1"
+    ]
@@ -0,0 +1,185 @@
+"""Tests for the legacy data methods in drip.app.old.functions."""
+import datetime as dt
+import warnings
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+pytest.importorskip("rasterio")
+
+from drip.app.old import functions  # noqa: E402
+from drip.app.old.functions import Index_Maps, Mask_Registry  # noqa: E402
+
+
+def areaMaps(ntime=7, choice="pdsi", seed=0):
+    """Return an Index_Maps object over a small random grid, bypassing the
+    data set files, that will use the full-grid path of getArea."""
+    rng = np.random.default_rng(seed)
+    lats = np.arange(49.0, 46.0, -0.25)
+    lons = np.arange(-100.0, -97.0, 0.25)
+    values = rng.normal(-2, 2, (ntime, len(lats), len(lons)))
+    values[:, 0, 0] = np.nan
+    values[1, 2, :] = -3.0  # Exactly on a category edge
+    time = np.arange(ntime).astype("datetime64[M]").astype("datetime64[ns]")
+    coords = {"time": time, "latitude": lats, "longitude": lons}
+    dims = ("time", "latitude", "longitude")
+    mask = np.ones((len(lats), len(lons)))
+    mask[-1] = np.nan
+
+    maps = Index_Maps.__new__(Index_Maps)
+    maps.choice = choice
+    maps.empty = False
+    maps.dataset_interval = xr.Dataset({"value": (dims, values)}, coords)
+    maps.mask = xr.DataArray(mask, coords={"latitude": lats,
+                                           "longitude": lons},
+                             dims=dims[1:])
+    maps.getLandSelection = lambda: None
+    return maps
+
+
+@pytest.mark.parametrize("choice", ["pdsi", "eddi1"])
+def test_getArea_chunks(monkeypatch, choice):
+    """Binning in several blocks of time steps matches a single block."""
+    maps = areaMaps(choice=choice)
+    monkeypatch.setattr(functions, "AREA_CHUNK", 100)
+    expected = maps.getArea(None)
+
+    monkeypatch.setattr(functions, "AREA_CHUNK", 2)
+    result = maps.getArea(None)
+
+    for values, expected_values in zip(result, expected):
+        np.testing.assert_allclose(values, expected_values)
+    assert len(result[2]) == 7
+
+
+def prefixMaps(tmp_path, seed=0):
+    """Write monthly prefix sums of a small random data set and return the
+    values, their dates, and an Index_Maps object that reads the sums."""
+    utilities = pytest.importorskip("drip.downloaders.utilities")
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1990-01-01", "1999-12-01", freq="MS")
+    lats = np.arange(49.0, 48.0, -0.25)
+    lons = np.arange(-100.0, -98.75, 0.25)
+    array = rng.normal(0, 2, (len(dates), len(lats), len(lons)))
+    array[rng.random(array.shape) < 0.1] = np.nan
+    array[:, 0, 0] = np.nan
+    array[3, 1, 1] = -9999
+    days = (dates - dt.datetime(1900, 1, 1)).days.values
+
+    dst = tmp_path.joinpath("pdsi.nc")
+    builder = utilities.NetCDF.__new__(utilities.NetCDF)
+    builder._assemble_prefix(array, days, lats, lons, dst)
+
+    maps = Index_Maps.__new__(Index_Maps)
+    maps.choice = "pdsi"
+    maps.choice_type = "original"
+    maps.empty = False
+    maps.file_path = dst
+    array[array == -9999] = np.nan
+    coords = {"latitude": lats, "longitude": lons}
+    return maps, array, dates, coords
+
+
+def selectDates(dates, year1, year2, month1, month2, months):
+    """Return the indices of dates selected as Index_Maps.time_data does."""
+    d1 = pd.Timestamp(year1, month1, 1)
+    d2 = pd.Timestamp(year2, month2, 1)
+    keep = (dates >= d1) & (dates <= d2) & np.isin(dates.month, months)
+    return np.where(keep)[0]
+
+
+def test_getPrefixMean(monkeypatch, tmp_path):
+    """Means from prefix sums match np.nanmean over random selections."""
+    monkeypatch.setattr(functions, "DATASET_POOL", functions.Dataset_Pool())
+    maps, array, dates, coords = prefixMaps(tmp_path)
+    rng = np.random.default_rng(1)
+    selections = [(1990, 1999, 1, 12, list(range(1, 13))),
+                  (1990, 1990, 1, 1, [1]),
+                  (1999, 1999, 12, 12, [12]),
+                  (1990, 1999, 1, 12, [1, 12])]
+    for _ in range(20):
+        year1, year2 = np.sort(rng.integers(1990, 2000, 2))
+        month1, month2 = rng.integers(1, 13, 2)
+        months = list(rng.choice(np.arange(1, 13), rng.integers(1, 13),
+                                 replace=False))
+        selections.append((year1, year2, month1, month2, months))
+
+    for selection in selections:
+        idx = selectDates(dates, *selection)
+        if not len(idx):
+            continue
+        maps.dataset_interval = xr.Dataset(
+            {"value": (("time", "latitude", "longitude"), array[idx])},
+            {"time": dates[idx], **coords}
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            expected = np.nanmean(array[idx], axis=0)
+        result = maps.getPrefixMean()
+        assert result is not None, selection
+        np.testing.assert_allclose(result.values, expected, err_msg=str(selection))
+
+
+def test_correlationField():
+    """Streamed coefficients match np.corrcoef on each cell's shared values,
+    with NaN for an all-missing cell and a constant cell."""
+    rng = np.random.default_rng(0)
+    ntime = functions.CORR_CHUNK * 2 + 17
+    ts = rng.normal(size=ntime)
+    ts[[0, 50, ntime - 1]] = np.nan
+    data = 0.5 * ts[:, np.newaxis] + rng.normal(size=(ntime, 40))
+    data[rng.random(data.shape) < 0.1] = np.nan
+    data[:, 0] = np.nan
+    data[:, 1] = 3.0
+
+    field = functions.correlationField(
+        ts, lambda start, stop: data[start:stop], ntime, workers=2
+    )
+
+    assert np.isnan(field[:2]).all()
+    for i in range(2, data.shape[1]):
+        valid = np.isfinite(ts) & np.isfinite(data[:, i])
+        expected = np.corrcoef(ts[valid], data[valid, i])[0, 1]
+        assert field[i] == pytest.approx(expected)
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """Return a Mask_Registry over a small grid with missing cells that
+    saves shape masks to a temporary directory."""
+    grid = np.arange(30, dtype="f8").reshape(5, 6)
+    grid[0, :3] = np.nan
+    grid[4, 5] = np.nan
+    states = np.where(np.isfinite(grid), 8, np.nan)
+    monkeypatch.setattr(Mask_Registry, "directory",
+                        property(lambda self: tmp_path))
+    return Mask_Registry(SimpleNamespace(grid=grid), states, states)
+
+
+def test_mask_registry_land(registry):
+    """Every kind of mask only selects cells of the grid."""
+    land = np.isfinite(registry.crdict.grid)
+    shape = np.ones(registry.shape)
+    mask_id = registry.register("shape", shape)
+    assert (registry.mask(mask_id) == 1).sum() == land.sum()
+
+    assert len(registry.cells(registry.gridId(0, 0))) == 0
+    assert len(registry.cells(registry.gridId(1, 0))) == 1
+    assert len(registry.cells(registry.bboxId(0, 2, 0, 6))) == 9
+    assert len(registry.cells(registry.gridsId([0, 0], [2, 3]))) == 1
+    assert len(registry.cells(registry.stateId([8]))) == land.sum()
+    assert len(registry.cells("all")) == land.sum()
+
+
+def test_mask_registry_saved_shape(registry):
+    """Shape masks saved before they were limited to the grid are limited
+    when they are read."""
+    cells = np.arange(30)
+    np.save(registry.directory.joinpath("shape_old.npy"), cells)
+    selected = registry.cells("shape:old")
+    land = np.isfinite(registry.crdict.grid).ravel()
+    np.testing.assert_array_equal(selected, cells[land])
@@ -0,0 +1,42 @@
+"""Tests for packing grids to land pixels in drip.downloaders.land."""
+import numpy as np
+import pytest
+
+pytest.importorskip("rasterio")
+
+from drip.downloaders.land import Land_Pixels  # noqa: E402
+
+
+@pytest.fixture
+def land():
+    """Return a grid with random land cells and its land pixels."""
+    rng = np.random.default_rng(0)
+    lats = np.arange(49.0, 46.0, -0.25)
+    lons = np.arange(-100.0, -96.0, 0.25)
+    is_land = rng.random((len(lats), len(lons))) < 0.6
+    rows, cols = np.where(is_land)
+    return is_land, Land_Pixels(rows, cols, lats, lons)
+
+
+def test_round_trip(land):
+    """Scattering packed values restores land cells and fills the rest."""
+    is_land, pixels = land
+    rng = np.random.default_rng(1)
+    array = rng.normal(size=(3, *pixels.shape))
+    grid = pixels.scatter(pixels.pack(array))
+
+    assert pixels.pack(array).shape == (3, pixels.size)
+    assert grid.shape == array.shape
+    np.testing.assert_array_equal(grid[:, is_land], array[:, is_land])
+    assert np.isnan(grid[:, ~is_land]).all()
+
+
+def test_scatter_2d(land):
+    """A single packed vector scatters to one grid with a given fill."""
+    is_land, pixels = land
+    array = np.arange(pixels.size, dtype="f8")
+    grid = pixels.scatter(array, fill=-9999)
+
+    assert grid.shape == pixels.shape
+    np.testing.assert_array_equal(pixels.pack(grid), array)
+    assert (grid[~is_land] == -9999).all()